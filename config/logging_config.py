@@ -1,46 +1,111 @@
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
+import random
 
-def setup_logging(name, log_file='logs/bot.log'):
+try:
+    from pythonjsonlogger.json import JsonFormatter
+except ImportError:  # python-json-logger < 3
+    from pythonjsonlogger.jsonlogger import JsonFormatter
+
+_listener = None
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records tagged with a high-volume ``event``"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        rate = self.rates.get(getattr(record, 'event', None))
+        if rate is None or rate >= 1:
+            return True
+        if random.random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread"""
+
+    def prepare(self, record):
+        return record
+
+
+def parse_sample_rates(spec):
+    """Parse ``event=rate,event=rate`` into a dict"""
+    rates = {}
+    for item in spec.split(','):
+        if '=' not in item:
+            continue
+        event, rate = item.split('=', 1)
+        rates[event.strip()] = float(rate)
+    return rates
+
+
+def setup_logging(name, log_file=None):
     """Setup logging configuration for the application"""
-    
-    # Create logs directory if it doesn't exist
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
-    
-    # Create logger
+    global _listener
+
+    level = getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO)
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    # Remove any existing handlers
-    logger.handlers = []
-    
-    # Create handlers
-    # File handler with rotation
-    file_handler = logging.handlers.RotatingFileHandler(
-        log_file,
-        maxBytes=1024 * 1024,  # 1MB
-        backupCount=5,
-        encoding='utf-8'
-    )
-    file_handler.setLevel(logging.INFO)
-    
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    
-    # Create formatters and add it to the handlers
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-    
-    # Add the handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    # Test log rotation
-    logger.info("Logging system initialized")
-    
-    return logger 
\ No newline at end of file
+    logger.setLevel(level)
+
+    # The pipeline lives on the root logger and is built once per process
+    if _listener is None:
+        log_file = log_file or os.getenv('LOG_FILE', 'logs/bot.log')
+
+        # Create logs directory if it doesn't exist
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+
+        formatter = JsonFormatter(
+            '%(asctime)s %(name)s %(levelname)s %(message)s',
+            rename_fields={'levelname': 'level', 'asctime': 'time'}
+        )
+
+        # File handler with rotation
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024))),
+            backupCount=int(os.getenv('LOG_BACKUP_COUNT', '5')),
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(formatter)
+
+        # Console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+
+        # Handlers run on the listener thread; the caller only enqueues the record
+        log_queue = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(parse_sample_rates(
+            os.getenv('LOG_SAMPLE_RATES', 'message_received=0.1,broadcast_sent=0.1')
+        )))
+
+        root = logging.getLogger()
+        root.handlers = [queue_handler]
+        root.setLevel(level)
+        # httpx logs every Bot API request at INFO
+        logging.getLogger('httpx').setLevel(logging.WARNING)
+
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+        _listener.start()
+        atexit.register(stop_logging)
+
+        logger.info("Logging system initialized")
+
+    return logger
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
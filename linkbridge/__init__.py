@@ -0,0 +1 @@
+"""Supporting subsystems for the LinkedIn profile sharing bot"""
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import platform
+import time
+from datetime import datetime, timezone
+
+import telegram.error
+from telegram import Update
+from telegram.ext import Application, JobQueue
+
+from config.logging_config import setup_logging
+from linkbridge import services, settings
+from linkbridge.handlers import register_handlers
+from linkbridge.handlers.jobs import (
+    archive_inactive_profiles, flush_traffic_recording, flush_user_activity, probe_databases, rebuild_similarity_index,
+    roll_up_daily_growth, start_metrics_endpoint
+)
+from linkbridge.http_client import build_request
+from linkbridge.lifecycle import run_until_signalled
+from linkbridge.metrics import HANDLER_IN_FLIGHT
+from linkbridge.migrations import run_migrations
+from linkbridge.outbound import OutboundScheduler
+from linkbridge.profiler import LoopStallMonitor
+
+logger = logging.getLogger(__name__)
+
+
+def reset_event_loop():
+    """Reset the event loop for Windows platform"""
+    if platform.system() == 'Windows':
+        try:
+            loop = asyncio.get_event_loop()
+            if loop.is_closed():
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+        except Exception as e:
+            logger.error(f"Error resetting event loop: {str(e)}")
+
+
+def run_now_and_every(job_queue: JobQueue, callback, interval: float, name: str) -> None:
+    """Run a job once right away and then every interval seconds
+
+    run_repeating(first=0) is not enough here: added before the job queue starts, its
+    first run is already in the past by then and gets skipped until a whole interval later.
+    """
+    job_queue.run_once(callback, 0, name=name)
+    job_queue.run_repeating(callback, interval=interval, first=interval, name=name)
+
+
+async def post_init(application: Application) -> None:
+    """Start background services once the application is initialized
+
+    Anything slow runs as a job, which starts together with polling instead of before it.
+    """
+    run_now_and_every(application.job_queue, probe_databases, settings.DB_PROBE_INTERVAL, 'db_probe')
+    run_now_and_every(
+        application.job_queue, rebuild_similarity_index, settings.SUGGEST_REBUILD_INTERVAL, 'suggest_rebuild'
+    )
+    rollup_time = datetime.strptime(settings.ROLLUP_TIME, '%H:%M').time().replace(tzinfo=timezone.utc)
+    application.job_queue.run_daily(roll_up_daily_growth, rollup_time, name='daily_rollup')
+    # Catch up on nights the bot was down, once startup has settled
+    application.job_queue.run_once(roll_up_daily_growth, 60, name='daily_rollup')
+    application.job_queue.run_repeating(
+        flush_user_activity, interval=settings.ACTIVITY_FLUSH_INTERVAL, name='user_activity_flush'
+    )
+    archive_time = datetime.strptime(settings.ARCHIVE_TIME, '%H:%M').time().replace(tzinfo=timezone.utc)
+    application.job_queue.run_daily(archive_inactive_profiles, archive_time, name='profile_archive')
+    application.job_queue.run_once(archive_inactive_profiles, 120, name='profile_archive')
+    if services.traffic_recorder:
+        application.job_queue.run_repeating(
+            flush_traffic_recording, interval=settings.TRAFFIC_FLUSH_INTERVAL, name='traffic_recording_flush'
+        )
+    if settings.METRICS_PORT:
+        application.job_queue.run_once(start_metrics_endpoint, 0, name='metrics_endpoint')
+    if services.change_listener:
+        services.change_listener.start()
+    services.overload.start(lambda: application.update_queue.qsize() + int(HANDLER_IN_FLIGHT.total()))
+    if settings.LOOP_STALL_THRESHOLD_MS:
+        stall_monitor = LoopStallMonitor(settings.LOOP_STALL_THRESHOLD_MS / 1000)
+        stall_monitor.start()
+        application.bot_data['stall_monitor'] = stall_monitor
+
+
+async def post_shutdown(application: Application) -> None:
+    """Stop background services started in post_init"""
+    await services.overload.stop()
+    if services.change_listener:
+        await services.change_listener.stop()
+    runner = application.bot_data.pop('metrics_runner', None)
+    if runner:
+        await runner.cleanup()
+    stall_monitor = application.bot_data.pop('stall_monitor', None)
+    if stall_monitor:
+        await stall_monitor.stop()
+    # Jobs have stopped; write what the last interval queued
+    await flush_user_activity(None)
+    if services.traffic_recorder:
+        await flush_traffic_recording(None)
+
+
+def build_application() -> Application:
+    builder = Application.builder()
+    if settings.OUTBOUND_RATE:
+        builder.rate_limiter(OutboundScheduler(
+            settings.OUTBOUND_RATE, settings.OUTBOUND_WEIGHTS, settings.OUTBOUND_MAX_RETRIES
+        ))
+    application = (
+        builder
+        .token(settings.TELEGRAM_BOT_TOKEN)
+        .base_url(settings.TELEGRAM_API_BASE_URL)
+        .base_file_url(settings.TELEGRAM_API_BASE_FILE_URL)
+        .request(build_request(
+            'send',
+            http_version=settings.TELEGRAM_HTTP_VERSION,
+            connection_pool_size=settings.TELEGRAM_POOL_SIZE,
+            keepalive_connections=settings.TELEGRAM_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.TELEGRAM_KEEPALIVE_EXPIRY,
+            connect_timeout=settings.CONNECT_TIMEOUT,
+            read_timeout=settings.READ_TIMEOUT,
+            write_timeout=settings.WRITE_TIMEOUT,
+            pool_timeout=settings.TELEGRAM_POOL_TIMEOUT
+        ))
+        # getUpdates is sequential: one connection, never shared with sends
+        .get_updates_request(build_request(
+            'updates',
+            http_version=settings.TELEGRAM_HTTP_VERSION,
+            keepalive_expiry=settings.TELEGRAM_KEEPALIVE_EXPIRY,
+            connect_timeout=settings.CONNECT_TIMEOUT,
+            read_timeout=settings.READ_TIMEOUT,
+            pool_timeout=settings.TELEGRAM_POOL_TIMEOUT
+        ))
+        .updater(None)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
+
+    # Add handlers
+    logger.info("Setting up command handlers...")
+    register_handlers(application)
+    return application
+
+
+def main():
+    setup_logging('linkbridge')
+    logger.info("Starting bot...")
+    logger.info(f"Environment variables loaded: {settings.summary()}")
+    settings.validate()
+    services.init()
+    if settings.AUTO_MIGRATE:
+        run_migrations(services.engine)
+    retry_delay = 5  # seconds
+
+    while True:  # Keep the bot running indefinitely
+        try:
+            # Reset event loop
+            reset_event_loop()
+
+            # Create new application instance
+            application = build_application()
+
+            logger.info("Bot is ready to start polling")
+
+            # Resume from the last handled update; SIGTERM drains in-flight work before exiting
+            asyncio.run(run_until_signalled(
+                application,
+                services.update_offsets,
+                settings.SHUTDOWN_DRAIN_TIMEOUT,
+                allowed_updates=Update.ALL_TYPES
+            ))
+            logger.info("Bot stopped")
+            break
+
+        except telegram.error.NetworkError as e:
+            logger.error(f"Network error occurred: {str(e)}")
+            time.sleep(retry_delay)
+            continue
+
+        except telegram.error.TimedOut:
+            logger.warning(f"Connection timed out. Retrying in {retry_delay} seconds...")
+            time.sleep(retry_delay)
+            continue
+
+        except telegram.error.Conflict as e:
+            logger.error(f"Conflict error: {str(e)}")
+            time.sleep(retry_delay * 2)  # Wait longer for conflicts
+            continue
+
+        except Exception as e:
+            logger.error("Failed to start bot:", exc_info=True)
+            time.sleep(retry_delay)
+            continue
@@ -0,0 +1,212 @@
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+
+from sqlalchemy import func, or_, select
+
+from linkbridge.database import dialect_insert
+from linkbridge.events import ARCHIVED, RESTORED, event_row, write_events
+from linkbridge.invalidation import notify_profile_change
+from linkbridge.metrics import PROFILES_ARCHIVED, PROFILES_RESTORED, PROFILES_STORED
+from linkbridge.repository import Profile
+from linkbridge.schema import linkedin_table, profile_archive_table
+
+logger = logging.getLogger(__name__)
+
+INACTIVE = 'inactive'
+UNREACHABLE = 'unreachable'
+
+# Columns a profile keeps while archived; the row id is not kept, a restored profile gets a new one
+ARCHIVED_COLUMNS = [column.name for column in profile_archive_table.columns if column.name in linkedin_table.c]
+
+ArchiveReport = namedtuple('ArchiveReport', ['archived', 'hot_before', 'hot_after', 'archive_size', 'finished_at'])
+
+
+class ProfileArchive:
+    """Keeps user_linkedin to the profiles of users still around
+
+    archive() moves profiles whose owner has not been seen for inactive_days, or that
+    broadcasts found unreachable for unreachable_days, to user_linkedin_archive in
+    batches of batch_size rows per transaction; 0 days turns a rule off. seen() notes
+    that a user interacted: the first time after each archive run it returns True and
+    the caller restores the user's archived profile, if any, before handling the update.
+    The users seen are written to last_seen_at by flush_activity(), so a user costs one
+    archive lookup and one row update per archive run at most.
+    """
+
+    def __init__(self, engine, inactive_days: int, unreachable_days: int, batch_size: int = 500, read_engine=None):
+        self.engine = engine
+        self.read_engine = read_engine or engine
+        self.inactive_days = inactive_days
+        self.unreachable_days = unreachable_days
+        self.batch_size = batch_size
+        self.last_report: Optional[ArchiveReport] = None
+        self._seen: Set[int] = set()
+        self._pending: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def seen(self, user_id: int) -> bool:
+        """Note that the user interacted; True if their archived profile may need restoring"""
+        with self._lock:
+            if user_id in self._seen:
+                return False
+            self._seen.add(user_id)
+            self._pending.add(user_id)
+        return True
+
+    def forget(self, user_id: int) -> None:
+        """Check the user again on their next update, e.g. after their restore failed"""
+        with self._lock:
+            self._seen.discard(user_id)
+
+    def flush_activity(self) -> int:
+        """Write last_seen_at for the users seen since the last flush; blocking"""
+        with self._lock:
+            batch, self._pending = self._pending, set()
+        if not batch:
+            return 0
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(linkedin_table.update().where(
+                    linkedin_table.c.telegram_user_id.in_(list(batch))
+                ).values(last_seen_at=datetime.utcnow(), updated_at=linkedin_table.c.updated_at))
+        except Exception:
+            with self._lock:
+                self._pending |= batch
+            raise
+        return len(batch)
+
+    def restore(self, user_id: int, reachable: bool = False) -> Optional[Profile]:
+        """Move the user's archived profile back, returning it, or None if there was none; blocking
+
+        reachable tells that the user just wrote to the bot in private, so broadcasts resume.
+        """
+        # Almost nobody has an archived profile; only they take the write lock
+        with self.read_engine.connect() as conn:
+            if conn.execute(select(profile_archive_table.c.telegram_user_id).where(
+                profile_archive_table.c.telegram_user_id == user_id
+            )).first() is None:
+                return None
+        with self.engine.begin() as conn:
+            archived = conn.execute(
+                select(*(profile_archive_table.c[name] for name in ARCHIVED_COLUMNS))
+                .where(profile_archive_table.c.telegram_user_id == user_id)
+            ).first()
+            if archived is None:
+                return None
+            values = dict(archived._mapping, last_seen_at=datetime.utcnow())
+            if reachable:
+                values.update(unreachable_since=None, delivery_failures=0)
+            owner = conn.execute(select(linkedin_table.c.telegram_user_id).where(or_(
+                linkedin_table.c.telegram_user_id == user_id,
+                linkedin_table.c.linkedin_slug == values['linkedin_slug'],
+                linkedin_table.c.linkedin_url == values['linkedin_url']
+            ))).scalar()
+            if owner is not None and owner != user_id:
+                # Someone else registered the same LinkedIn profile while it was archived
+                logger.warning(f"Cannot restore the profile of user {user_id}, its LinkedIn URL is taken")
+                return None
+            conn.execute(profile_archive_table.delete().where(profile_archive_table.c.telegram_user_id == user_id))
+            if owner is not None:
+                # Registered again meanwhile, e.g. by a bulk import; the archived copy is stale
+                logger.info(f"Dropped the archived profile of user {user_id}, they have registered again")
+                return None
+            row = conn.execute(
+                linkedin_table.insert().values(**values).returning(*linkedin_table.c)
+            ).first()
+            write_events(conn, [event_row(
+                RESTORED, user_id, values['community_id'],
+                current_company=values['current_company'], location=values['location']
+            )])
+            notify_profile_change(conn, RESTORED, user_id, values['community_id'])
+        PROFILES_RESTORED.inc()
+        logger.info(f"Restored the archived profile of returning user {user_id}")
+        return Profile(*row)
+
+    def _conditions(self, now: datetime) -> list:
+        columns = linkedin_table.c
+        conditions = []
+        if self.inactive_days:
+            cutoff = now - timedelta(days=self.inactive_days)
+            conditions.append(func.coalesce(columns.last_seen_at, columns.created_at) < cutoff)
+        if self.unreachable_days:
+            conditions.append(columns.unreachable_since < now - timedelta(days=self.unreachable_days))
+        return conditions
+
+    def _reason(self, row, now: datetime) -> str:
+        if self.unreachable_days and row.unreachable_since is not None and \
+                row.unreachable_since < now - timedelta(days=self.unreachable_days):
+            return UNREACHABLE
+        return INACTIVE
+
+    def _count(self, conn, table) -> int:
+        return conn.execute(select(func.count()).select_from(table)).scalar()
+
+    def archive(self) -> ArchiveReport:
+        """Move the profiles matching the rules to the archive; blocking, returns what it did"""
+        # Users seen lately must not be archived on a last_seen_at that is still in memory
+        self.flush_activity()
+        with self._lock:
+            self._seen.clear()
+        now = datetime.utcnow()
+        with self.engine.connect() as conn:
+            hot_before = self._count(conn, linkedin_table)
+        archived: Dict[str, int] = {INACTIVE: 0, UNREACHABLE: 0}
+        conditions = self._conditions(now)
+        after = 0
+        while conditions:
+            with self.engine.begin() as conn:
+                ids = conn.execute(
+                    select(linkedin_table.c.id, linkedin_table.c.telegram_user_id)
+                    .where(or_(*conditions), linkedin_table.c.id > after)
+                    .order_by(linkedin_table.c.id)
+                    .limit(self.batch_size)
+                ).all()
+                if not ids:
+                    break
+                after = ids[-1].id
+                with self._lock:
+                    # Seen since the run started: their restore check may already have passed
+                    ids = [row.id for row in ids if row.telegram_user_id not in self._seen]
+                if not ids:
+                    continue
+                # Conditions again: a concurrent flush may have made some of them active
+                moved = conn.execute(
+                    linkedin_table.delete()
+                    .where(linkedin_table.c.id.in_(ids), or_(*conditions))
+                    .returning(*(linkedin_table.c[name] for name in ARCHIVED_COLUMNS))
+                ).all()
+                if not moved:
+                    continue
+                rows = [dict(row._mapping, archive_reason=self._reason(row, now), archived_at=now) for row in moved]
+                statement = dialect_insert(self.engine, profile_archive_table).values(rows)
+                # A copy left from an earlier archival the user never came back from is replaced
+                statement = statement.on_conflict_do_update(
+                    index_elements=[profile_archive_table.c.telegram_user_id],
+                    set_={name: statement.excluded[name] for name in rows[0] if name != 'telegram_user_id'}
+                )
+                conn.execute(statement)
+                write_events(conn, [
+                    event_row(
+                        ARCHIVED, row['telegram_user_id'], row['community_id'], reason=row['archive_reason'],
+                        current_company=row['current_company'], location=row['location']
+                    )
+                    for row in rows
+                ])
+                for row in rows:
+                    notify_profile_change(conn, ARCHIVED, row['telegram_user_id'], row['community_id'])
+            for row in rows:
+                archived[row['archive_reason']] += 1
+                PROFILES_ARCHIVED.inc(reason=row['archive_reason'])
+            with self._lock:
+                # Seen again during the batch: their next update restores them
+                self._seen.difference_update(row['telegram_user_id'] for row in rows)
+        with self.engine.connect() as conn:
+            hot_after = self._count(conn, linkedin_table)
+            archive_size = self._count(conn, profile_archive_table)
+        PROFILES_STORED.set(hot_after, tier='hot')
+        PROFILES_STORED.set(archive_size, tier='archive')
+        self.last_report = ArchiveReport(archived, hot_before, hot_after, archive_size, datetime.utcnow())
+        return self.last_report
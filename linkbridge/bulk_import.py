@@ -0,0 +1,254 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import select, text
+
+from linkbridge.delivery import DeliveryReport
+from linkbridge.events import CREATED, event_row, write_events
+from linkbridge.invalidation import notify_profile_change
+from linkbridge.metrics import BROADCAST_QUEUE_DEPTH
+from linkbridge.schema import linkedin_table
+from linkbridge.urls import canonical_slug, normalize_linkedin_url
+
+logger = logging.getLogger(__name__)
+
+IMPORT_COLUMNS = (
+    'telegram_user_id', 'linkedin_url', 'full_name', 'headline',
+    'location', 'current_company', 'summary', 'profile_picture_url', 'community_id'
+)
+
+# Columns written to the staging table; the slug is derived, never read from the file
+LOAD_COLUMNS = IMPORT_COLUMNS + ('linkedin_slug',)
+
+MAX_DIGEST_ENTRIES = 10
+
+
+class ImportReport:
+    """Outcome of a bulk import"""
+
+    def __init__(self):
+        self.total = 0
+        self.invalid: List[Tuple[int, str]] = []
+        self.duplicates_in_file = 0
+        self.already_registered = 0
+        self.inserted: List[Dict[str, Any]] = []
+
+    def summary(self) -> str:
+        lines = [
+            f"Rows read: {self.total}",
+            f"Imported: {len(self.inserted)}",
+            f"Already registered: {self.already_registered}",
+            f"Duplicates in file: {self.duplicates_in_file}",
+            f"Invalid: {len(self.invalid)}",
+        ]
+        for line_number, reason in self.invalid[:10]:
+            lines.append(f"  line {line_number}: {reason}")
+        if len(self.invalid) > 10:
+            lines.append(f"  ... and {len(self.invalid) - 10} more")
+        return '\n'.join(lines)
+
+
+def parse_rows(data: bytes, filename: str = '') -> Iterable[Tuple[int, Any]]:
+    """Yield (line number, row) pairs from CSV or JSONL content; a malformed JSONL line yields its ValueError"""
+    content = data.decode('utf-8-sig')
+    if filename.lower().endswith(('.jsonl', '.json')) or content.lstrip().startswith('{'):
+        for line_number, line in enumerate(content.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                # Left to validate_rows, so one bad line is reported instead of ending the import
+                row = e
+            yield line_number, row
+    else:
+        reader = csv.DictReader(io.StringIO(content))
+        for line_number, row in enumerate(reader, start=2):
+            yield line_number, row
+
+
+def validate_rows(rows: Iterable[Tuple[int, Any]], report: ImportReport,
+                  default_community_id: int = 0) -> List[Dict[str, Any]]:
+    """Normalize URLs and drop invalid rows and in-file duplicates; rows without a community get the default"""
+    valid = []
+    seen_slugs = set()
+    seen_users = set()
+    for line_number, row in rows:
+        report.total += 1
+        if isinstance(row, ValueError):
+            report.invalid.append((line_number, f"invalid JSON: {row}"))
+            continue
+        if not isinstance(row, dict):
+            report.invalid.append((line_number, "not a JSON object"))
+            continue
+        url = normalize_linkedin_url(str(row.get('linkedin_url') or ''))
+        if not url:
+            report.invalid.append((line_number, "invalid linkedin_url"))
+            continue
+        try:
+            user_id = int(row.get('telegram_user_id'))
+        except (TypeError, ValueError):
+            report.invalid.append((line_number, "invalid telegram_user_id"))
+            continue
+        try:
+            community_id = int(row.get('community_id') or default_community_id)
+        except (TypeError, ValueError):
+            report.invalid.append((line_number, "invalid community_id"))
+            continue
+        slug = canonical_slug(url)
+        if slug in seen_slugs or user_id in seen_users:
+            report.duplicates_in_file += 1
+            continue
+        seen_slugs.add(slug)
+        seen_users.add(user_id)
+
+        record = {column: (row.get(column) or None) for column in IMPORT_COLUMNS}
+        record['linkedin_url'] = url
+        record['telegram_user_id'] = user_id
+        record['community_id'] = community_id
+        record['linkedin_slug'] = slug
+        valid.append(record)
+    return valid
+
+
+def _copy_into_staging(conn, rows: List[Dict[str, Any]]) -> None:
+    """Stream rows into the staging table with COPY"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['' if row[column] is None else row[column] for column in LOAD_COLUMNS])
+    buffer.seek(0)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY profile_import_staging ({', '.join(LOAD_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+def load_rows(engine, rows: List[Dict[str, Any]], report: ImportReport) -> None:
+    """Load validated rows through a staging table and one INSERT ... ON CONFLICT"""
+    if not rows:
+        return
+    columns = ', '.join(LOAD_COLUMNS)
+    with engine.begin() as conn:
+        if conn.dialect.name == 'postgresql':
+            conn.execute(text(
+                "CREATE TEMP TABLE profile_import_staging ON COMMIT DROP "
+                f"AS SELECT {columns} FROM user_linkedin LIMIT 0"
+            ))
+            _copy_into_staging(conn, rows)
+        else:
+            conn.execute(text(
+                f"CREATE TEMP TABLE profile_import_staging AS SELECT {columns} FROM user_linkedin LIMIT 0"
+            ))
+            conn.execute(
+                text(f"INSERT INTO profile_import_staging ({columns}) "
+                     f"VALUES ({', '.join(':' + column for column in LOAD_COLUMNS)})"),
+                rows
+            )
+
+        # Existing users and URLs hit the unique indexes and are skipped
+        result = conn.execute(
+            text(
+                f"INSERT INTO user_linkedin ({columns}, created_at, updated_at) "
+                f"SELECT {columns}, :now, :now FROM profile_import_staging WHERE true "
+                "ON CONFLICT DO NOTHING "
+                "RETURNING telegram_user_id, community_id, linkedin_url, full_name, headline, current_company, location"
+            ),
+            {'now': datetime.utcnow()}
+        )
+        report.inserted = [dict(row._mapping) for row in result]
+        write_events(conn, [
+            event_row(CREATED, profile['telegram_user_id'], profile['community_id'], **{
+                column: value for column, value in profile.items() if column not in ('telegram_user_id', 'community_id')
+            })
+            for profile in report.inserted
+        ])
+        for community_id in sorted({profile['community_id'] for profile in report.inserted}):
+            notify_profile_change(conn, CREATED, None, community_id)
+
+        if conn.dialect.name != 'postgresql':
+            conn.execute(text("DROP TABLE profile_import_staging"))
+
+    report.already_registered = len(rows) - len(report.inserted)
+    logger.info(f"Bulk import inserted {len(report.inserted)} of {len(rows)} valid rows")
+
+
+def import_profiles(engine, data: bytes, filename: str = '', default_community_id: int = 0) -> ImportReport:
+    """Parse, validate and load a CSV or JSONL export; blocking, run it off the event loop"""
+    report = ImportReport()
+    rows = validate_rows(parse_rows(data, filename), report, default_community_id)
+    load_rows(engine, rows, report)
+    return report
+
+
+def format_import_digest(inserted: List[Dict[str, Any]]) -> str:
+    """One notification summarizing every imported profile"""
+    count = len(inserted)
+    lines = [f"🎉 *{count} new professional{'s' if count > 1 else ''} joined the network!*\n"]
+    for row in inserted[:MAX_DIGEST_ENTRIES]:
+        name = row.get('full_name') or 'New Professional'
+        headline = f" - {row['headline']}" if row.get('headline') else ''
+        lines.append(f"👤 [{name}]({row['linkedin_url']}){headline}")
+    if count > MAX_DIGEST_ENTRIES:
+        lines.append(f"...and {count - MAX_DIGEST_ENTRIES} more")
+    lines.append("\nUse 👥 View Users to browse everyone.")
+    return '\n'.join(lines)
+
+
+async def send_import_digest(bot, engine, inserted: List[Dict[str, Any]]) -> int:
+    """Send each community's previously registered users one digest of its new profiles"""
+    if not inserted:
+        return 0
+    new_user_ids = {row['telegram_user_id'] for row in inserted}
+    by_community: Dict[int, List[Dict[str, Any]]] = {}
+    for row in inserted:
+        by_community.setdefault(row['community_id'], []).append(row)
+    with engine.connect() as conn:
+        members = conn.execute(
+            select(linkedin_table.c.telegram_user_id, linkedin_table.c.community_id).where(
+                linkedin_table.c.community_id.in_(list(by_community)),
+                linkedin_table.c.unreachable_since.is_(None)
+            )
+        ).fetchall()
+    digests = {community_id: format_import_digest(rows) for community_id, rows in by_community.items()}
+    recipients = [
+        (user_id, digests[community_id]) for user_id, community_id in members
+        if user_id not in new_user_ids
+    ]
+
+    deliveries = DeliveryReport()
+    remaining = len(recipients)
+    BROADCAST_QUEUE_DEPTH.inc(remaining)
+    try:
+        for user_id, digest in recipients:
+            BROADCAST_QUEUE_DEPTH.dec()
+            remaining -= 1
+            try:
+                await bot.send_message(
+                    chat_id=user_id,
+                    text=digest,
+                    parse_mode='Markdown',
+                    disable_web_page_preview=True
+                )
+                deliveries.sent(user_id)
+            except Exception as e:
+                deliveries.failure(user_id, e)
+                logger.error(f"Failed to send import digest to user {user_id}: {e}")
+    finally:
+        if remaining:
+            BROADCAST_QUEUE_DEPTH.dec(remaining)
+        try:
+            deliveries.save(engine)
+        except Exception as e:
+            logger.error(f"Could not record import digest delivery outcomes: {str(e)}")
+    sent = len(deliveries.delivered)
+    logger.info(f"Sent import digest to {sent} of {len(recipients)} users")
+    return sent
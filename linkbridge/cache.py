@@ -0,0 +1,91 @@
+import collections
+import logging
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from linkbridge.metrics import QUERY_CACHE_ENTRIES, QUERY_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """LRU cache of per-community query results that profile writes invalidate
+
+    Entries remember the data generation they were loaded at, both the global one and
+    their community's; bump() starts a new generation, so older entries miss from then
+    on and age out of the LRU. A result loaded while a write was in flight is stored
+    under the generation read before the load, so it can never outlive that write.
+    max_age bounds how long a result read from a lagging replica can be served.
+    """
+
+    def __init__(self, maxsize: int = 1024, max_age: Optional[float] = 300):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._community_generations: Dict[int, int] = {}
+        self._entries: 'collections.OrderedDict[tuple, tuple]' = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _stamp(self, community_id: int) -> Tuple[int, int]:
+        return self.generation, self._community_generations.get(community_id, 0)
+
+    def bump(self, community_id: Optional[int] = None) -> None:
+        """Invalidate the community's cached results, or every result when no community is given"""
+        if community_id is None:
+            self.generation += 1
+        else:
+            self._community_generations[community_id] = self._community_generations.get(community_id, 0) + 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        QUERY_CACHE_ENTRIES.set(0)
+
+    def get(self, namespace: str, community_id: int, key: Hashable) -> Any:
+        """The cached value, or None when it is missing, stale or expired"""
+        entry_key = (namespace, community_id, key)
+        entry = self._entries.get(entry_key)
+        if entry is not None:
+            stamp, loaded_at, value = entry
+            if stamp == self._stamp(community_id) and (
+                self.max_age is None or time.monotonic() - loaded_at < self.max_age
+            ):
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                QUERY_CACHE_REQUESTS.inc(namespace=namespace, result='hit')
+                return value
+            del self._entries[entry_key]
+            QUERY_CACHE_ENTRIES.set(len(self._entries))
+        self.misses += 1
+        QUERY_CACHE_REQUESTS.inc(namespace=namespace, result='miss')
+        return None
+
+    def put(self, namespace: str, community_id: int, key: Hashable, value: Any,
+            stamp: Optional[Tuple[int, int]] = None) -> None:
+        current = self._stamp(community_id)
+        if stamp is not None and stamp != current:
+            # Loaded before a write that has since bumped the generation
+            return
+        entry_key = (namespace, community_id, key)
+        self._entries[entry_key] = (current, time.monotonic(), value)
+        self._entries.move_to_end(entry_key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        QUERY_CACHE_ENTRIES.set(len(self._entries))
+
+    def fetch(self, namespace: str, community_id: int, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Cached value of the key, calling load() on a miss; None results are not cached"""
+        value = self.get(namespace, community_id, key)
+        if value is None:
+            stamp = self._stamp(community_id)
+            value = load()
+            if value is not None:
+                self.put(namespace, community_id, key, value, stamp)
+        return value
+
+    def hit_ratio(self) -> Optional[float]:
+        total = self.hits + self.misses
+        return self.hits / total if total else None
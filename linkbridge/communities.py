@@ -0,0 +1,65 @@
+import logging
+from typing import List, Optional
+
+from sqlalchemy import select
+from telegram import Chat, ChatMember, Update
+from telegram.error import TelegramError
+
+from linkbridge.schema import linkedin_table
+
+logger = logging.getLogger(__name__)
+
+# /start payload selecting a community, e.g. t.me/<bot>?start=c-1001234567890
+DEEP_LINK_PREFIX = 'c'
+
+
+def community_from_start_args(args: Optional[List[str]]) -> Optional[int]:
+    """Community id carried by a /start deep link, or None"""
+    if not args or not args[0].startswith(DEEP_LINK_PREFIX):
+        return None
+    try:
+        return int(args[0][len(DEEP_LINK_PREFIX):])
+    except ValueError:
+        return None
+
+
+async def is_member(bot, chat_id: int, user_id: int) -> bool:
+    """Whether the user belongs to the group; False if the group is gone or the bot is not in it"""
+    try:
+        member = await bot.get_chat_member(chat_id, user_id)
+    except TelegramError as e:
+        logger.info(f"Could not check whether user {user_id} is in chat {chat_id}: {str(e)}")
+        return False
+    if member.status == ChatMember.RESTRICTED:
+        return member.is_member
+    return member.status in (ChatMember.OWNER, ChatMember.ADMINISTRATOR, ChatMember.MEMBER)
+
+
+def invite_link(bot_username: str, community_id: int) -> str:
+    return f"https://t.me/{bot_username}?start={DEEP_LINK_PREFIX}{community_id}"
+
+
+def resolve_community(engine, update: Update, user_data: dict, default: int) -> int:
+    """Community an update acts on
+
+    A group chat is its own community. In private chats it is the community chosen
+    through a deep link, else the one the user's profile belongs to, else the default.
+    """
+    chat = update.effective_chat
+    if chat and chat.type in (Chat.GROUP, Chat.SUPERGROUP):
+        return chat.id
+
+    community_id = user_data.get('community_id')
+    if community_id is not None:
+        return community_id
+
+    user = update.effective_user
+    if user:
+        with engine.connect() as conn:
+            community_id = conn.execute(
+                select(linkedin_table.c.community_id).where(linkedin_table.c.telegram_user_id == user.id)
+            ).scalar()
+        if community_id is not None:
+            user_data['community_id'] = community_id
+            return community_id
+    return default
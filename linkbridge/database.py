@@ -0,0 +1,183 @@
+import logging
+import os
+import re
+import time
+from typing import Optional, Tuple
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+
+from linkbridge.deadlines import expired, remaining
+from linkbridge.metrics import DB_POOL_CHECKED_OUT, DB_PROBE_LATENCY, DB_UP, instrument_engine
+
+logger = logging.getLogger(__name__)
+
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': '-20000',
+    'mmap_size': '268435456',
+    'busy_timeout': '5000',
+    'foreign_keys': 'ON',
+}
+
+# SQLite VM instructions between checks of the handler deadline; a statement past it is interrupted
+SQLITE_DEADLINE_CHECK_STEPS = 10000
+
+
+def is_sqlite(engine: Engine) -> bool:
+    return engine.dialect.name == 'sqlite'
+
+
+def create_sqlite_engine(url: str, writer: bool = False) -> Engine:
+    """SQLite engine in WAL mode; the writer gets one dedicated connection so writes never contend"""
+    database = make_url(url).database
+    if database and database != ':memory:':
+        os.makedirs(os.path.dirname(os.path.abspath(database)), exist_ok=True)
+
+    engine = create_engine(
+        url,
+        connect_args={'check_same_thread': False},
+        pool_size=1 if writer else int(os.getenv('DB_POOL_SIZE', '5')),
+        max_overflow=0 if writer else int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        pool_timeout=float(os.getenv('DB_POOL_TIMEOUT', '30'))
+    )
+
+    @event.listens_for(engine, 'connect')
+    def _configure_connection(dbapi_connection, connection_record):
+        # Let SQLAlchemy, not pysqlite, decide when transactions begin
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+        cursor.close()
+        dbapi_connection.set_progress_handler(expired, SQLITE_DEADLINE_CHECK_STEPS)
+
+    @event.listens_for(engine, 'begin')
+    def _begin(conn):
+        if conn.get_execution_options().get('isolation_level') == 'AUTOCOMMIT':
+            return
+        # Take the write lock up front instead of failing on a read-to-write upgrade
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if writer else "BEGIN")
+
+    instrument_engine(engine)
+    return engine
+
+
+def create_engines(url: str, replica_url: Optional[str] = None) -> Tuple[Engine, Engine]:
+    """Return (write engine, read engine) for the configured backend"""
+    if make_url(url).get_backend_name() == 'sqlite':
+        return create_sqlite_engine(url, writer=True), create_sqlite_engine(url)
+    engine = create_db_engine(url)
+    return engine, create_db_engine(replica_url) if replica_url else engine
+
+
+def dialect_insert(engine: Engine, table):
+    """INSERT supporting ON CONFLICT clauses for the engine's dialect"""
+    if is_sqlite(engine):
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(table)
+
+
+def insert_ignoring_conflicts(engine: Engine, table):
+    """INSERT ... ON CONFLICT DO NOTHING for the engine's dialect"""
+    return dialect_insert(engine, table).on_conflict_do_nothing()
+
+
+def fts_match_query(search_query: str) -> Optional[str]:
+    """FTS5 query matching every search term as a prefix, or None if there are no terms"""
+    terms = re.findall(r'\w+', search_query)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def create_db_engine(url: str) -> Engine:
+    """Create an instrumented engine with pre-ping and configurable pool sizing"""
+    connect_args = {}
+    statement_timeout = float(os.getenv('DB_STATEMENT_TIMEOUT', '0'))
+    if statement_timeout:
+        # Set once per connection, in the startup packet; no deadline needs a statement to go below it
+        connect_args['options'] = f"-c statement_timeout={int(statement_timeout * 1000)}"
+    engine = create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=int(os.getenv('DB_POOL_SIZE', '5')),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        pool_timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+        # Recycle before hosted Postgres drops idle connections
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        connect_args=connect_args
+    )
+
+    @event.listens_for(engine, 'connect')
+    def _connect(dbapi_connection, connection_record):
+        # The connection's own statement_timeout in ms, 0 for none, whether it comes from the server,
+        # the role or DB_STATEMENT_TIMEOUT
+        cursor = dbapi_connection.cursor()
+        cursor.execute("SELECT setting::int FROM pg_settings WHERE name = 'statement_timeout'")
+        connection_record.info['statement_timeout'] = cursor.fetchone()[0]
+        cursor.close()
+        dbapi_connection.rollback()
+
+    @event.listens_for(engine, 'begin')
+    def _begin(conn):
+        # Inside a handler, statements may only use the time its deadline leaves; SET LOCAL ends with the
+        # transaction. It costs a round trip, so only a deadline closer than the connection's own timeout sends it
+        left = remaining()
+        if left is None:
+            return
+        timeout = max(int(left * 1000), 1)
+        default = conn.info.get('statement_timeout', 0)
+        if not default or timeout < default:
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout}")
+
+    instrument_engine(engine)
+    return engine
+
+
+class LatencyProbe:
+    """Measures round-trip latency to a database with a trivial query"""
+
+    def __init__(self, engine: Engine, target: str):
+        self.engine = engine
+        self.target = target
+        self.latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.checked_at is not None and self.last_error is None
+
+    def run(self) -> None:
+        """Blocking probe; run it off the event loop"""
+        start_time = time.perf_counter()
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            self.latency = time.perf_counter() - start_time
+            if self.last_error:
+                logger.info(f"Database {self.target} is reachable again")
+            self.last_error = None
+            DB_PROBE_LATENCY.set(self.latency, target=self.target)
+            DB_UP.set(1, target=self.target)
+        except Exception as e:
+            self.latency = None
+            self.last_error = str(e)
+            DB_UP.set(0, target=self.target)
+            logger.warning(f"Database {self.target} probe failed: {str(e)}")
+        finally:
+            self.checked_at = time.time()
+            DB_POOL_CHECKED_OUT.set(self.engine.pool.checkedout(), target=self.target)
+
+    def describe(self) -> str:
+        if self.checked_at is None:
+            return "Checking..."
+        if self.last_error:
+            return "Unreachable"
+        return f"Connected ({self.latency * 1000:.0f} ms)"
@@ -0,0 +1,105 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
+import logging
+import time
+from typing import Callable, Optional
+
+from telegram import Update
+
+from linkbridge.metrics import HANDLER_TIMEOUTS
+from linkbridge.settings import HANDLER_DEADLINE
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT_REPLY = "⏳ That took longer than it should. Please try again in a moment."
+
+# Absolute time.monotonic() by which the current handler must be done; tasks inherit it
+_deadline: contextvars.ContextVar = contextvars.ContextVar('deadline', default=None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left until the current deadline, or None outside of one"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    deadline = _deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def cap_timeout(timeout: Optional[float]) -> Optional[float]:
+    """The timeout shortened to what is left of the current deadline; None means no timeout"""
+    left = remaining()
+    if left is None:
+        return timeout
+    left = max(left, 0)
+    return left if timeout is None else min(timeout, left)
+
+
+def run_in_executor(func: Callable, *args) -> asyncio.Future:
+    """Run blocking func in the default executor within a copy of the caller's context
+
+    loop.run_in_executor does not carry context variables over to the thread, so database
+    work offloaded from a handler would run without its deadline and statement timeout.
+    """
+    return asyncio.get_running_loop().run_in_executor(None, contextvars.copy_context().run, func, *args)
+
+
+def budget(seconds: Optional[float]) -> Callable:
+    """Declare how long a handler may run; None or 0 runs it without a deadline"""
+    def decorator(callback: Callable) -> Callable:
+        callback.deadline_budget = seconds
+        return callback
+    return decorator
+
+
+@contextlib.contextmanager
+def detached():
+    """Tasks created inside run without the current deadline, for background work a handler starts"""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def with_deadline(callback: Callable, name: Optional[str] = None) -> Callable:
+    """Cancel a handler that overruns its budget and ask the user to try again
+
+    The handler runs as its own task with the deadline in its context, so database
+    statements and Bot API requests it makes get the remaining time as their timeout.
+    """
+    handler_name = name or callback.__name__
+    seconds = getattr(callback, 'deadline_budget', HANDLER_DEADLINE)
+
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        if not seconds:
+            return await callback(update, context)
+        deadline = time.monotonic() + seconds
+        outer = _deadline.get()
+        if outer is not None:
+            deadline = min(deadline, outer)
+        token = _deadline.set(deadline)
+        try:
+            task = asyncio.ensure_future(callback(update, context))
+        finally:
+            _deadline.reset(token)
+        try:
+            return await asyncio.wait_for(task, max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            if not task.cancelled():
+                raise
+        HANDLER_TIMEOUTS.inc(handler=handler_name)
+        logger.warning(f"Handler {handler_name} exceeded its {seconds}s budget and was cancelled")
+        message = update.effective_message if isinstance(update, Update) else None
+        if message:
+            try:
+                await message.reply_text(TIMEOUT_REPLY)
+            except Exception as e:
+                logger.error(f"Could not send the timeout reply: {str(e)}")
+
+    return wrapper
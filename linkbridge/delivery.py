@@ -0,0 +1,91 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Set
+
+import telegram.error
+from sqlalchemy import update
+
+from linkbridge.metrics import BROADCAST_DELIVERIES
+from linkbridge.schema import linkedin_table
+
+logger = logging.getLogger(__name__)
+
+# BadRequest messages meaning the chat is gone rather than the message being wrong
+PERMANENT_FAILURE_MESSAGES = (
+    'chat not found',
+    'user is deactivated',
+    'peer_id_invalid',
+    "bot can't initiate conversation",
+)
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    """Whether retrying the send can never succeed until the user talks to the bot again"""
+    if isinstance(error, telegram.error.Forbidden):
+        return True
+    return isinstance(error, telegram.error.BadRequest) and any(
+        message in str(error).lower() for message in PERMANENT_FAILURE_MESSAGES
+    )
+
+
+class DeliveryReport:
+    """Per-recipient outcomes of one fan-out, written back in a single pass by save()"""
+
+    def __init__(self):
+        self.delivered: Set[int] = set()
+        self.failed: Set[int] = set()
+        self.unreachable: Dict[int, str] = {}
+
+    def sent(self, user_id: int) -> None:
+        self.delivered.add(user_id)
+        BROADCAST_DELIVERIES.inc(outcome='delivered')
+
+    def failure(self, user_id: int, error: Exception) -> None:
+        if is_permanent_failure(error):
+            self.unreachable[user_id] = str(error)
+            BROADCAST_DELIVERIES.inc(outcome='unreachable')
+        else:
+            self.failed.add(user_id)
+            BROADCAST_DELIVERIES.inc(outcome='failed')
+
+    def save(self, engine) -> None:
+        """Mark unreachable recipients and keep the consecutive failure counts current"""
+        columns = linkedin_table.c
+        with engine.begin() as conn:
+            if self.unreachable:
+                conn.execute(update(linkedin_table).where(
+                    columns.telegram_user_id.in_(list(self.unreachable)),
+                    columns.unreachable_since.is_(None)
+                ).values(unreachable_since=datetime.utcnow(), delivery_failures=columns.delivery_failures + 1))
+            if self.failed:
+                conn.execute(update(linkedin_table).where(
+                    columns.telegram_user_id.in_(list(self.failed))
+                ).values(delivery_failures=columns.delivery_failures + 1))
+            if self.delivered:
+                # Only rows that had failed before, so a healthy broadcast writes nothing
+                conn.execute(update(linkedin_table).where(
+                    columns.telegram_user_id.in_(list(self.delivered)),
+                    columns.delivery_failures > 0
+                ).values(delivery_failures=0))
+        for user_id, reason in self.unreachable.items():
+            logger.info(f"User {user_id} is unreachable and left out of broadcasts: {reason}")
+
+
+def mark_unreachable(engine, user_ids: Iterable[int]) -> None:
+    with engine.begin() as conn:
+        conn.execute(update(linkedin_table).where(
+            linkedin_table.c.telegram_user_id.in_(list(user_ids)),
+            linkedin_table.c.unreachable_since.is_(None)
+        ).values(unreachable_since=datetime.utcnow()))
+
+
+def mark_reachable(engine, user_id: int) -> bool:
+    """Put a user back on broadcasts; True if they had been marked unreachable"""
+    with engine.begin() as conn:
+        result = conn.execute(update(linkedin_table).where(
+            linkedin_table.c.telegram_user_id == user_id,
+            linkedin_table.c.unreachable_since.isnot(None)
+        ).values(unreachable_since=None, delivery_failures=0))
+    if result.rowcount:
+        logger.info(f"User {user_id} is reachable again")
+    return bool(result.rowcount)
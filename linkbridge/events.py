@@ -0,0 +1,97 @@
+import json
+import logging
+from collections import namedtuple
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, text
+
+from linkbridge.database import dialect_insert
+from linkbridge.metrics import PROFILE_EVENTS_WRITTEN
+from linkbridge.schema import event_consumers_table, profile_events_table
+
+logger = logging.getLogger(__name__)
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+ENRICHED = 'enriched'
+ARCHIVED = 'archived'
+RESTORED = 'restored'
+
+# Serializes appends across processes so ids commit in order and consumers never skip one
+EVENT_LOG_LOCK_ID = 724_301_118
+
+ProfileEvent = namedtuple('ProfileEvent', [column.name for column in profile_events_table.columns])
+
+
+def event_row(event_type: str, telegram_user_id: int, community_id: int, **data: Any) -> Dict[str, Any]:
+    return {
+        'event_type': event_type,
+        'telegram_user_id': telegram_user_id,
+        'community_id': community_id,
+        'data': json.dumps(data, default=str) if data else None,
+        'created_at': datetime.utcnow()
+    }
+
+
+def write_events(conn, rows: List[Dict[str, Any]]) -> None:
+    """Append event rows within conn's transaction, e.g. the one making the change"""
+    if not rows:
+        return
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {'id': EVENT_LOG_LOCK_ID})
+    conn.execute(profile_events_table.insert(), rows)
+    for row in rows:
+        PROFILE_EVENTS_WRITTEN.inc(event_type=row['event_type'])
+
+
+class EventConsumer:
+    """Reads the event log from the last offset this named consumer committed
+
+    A derived structure polls, applies the events, then commits the id of the last one
+    it applied; after a restart it resumes from there instead of re-scanning user_linkedin.
+    """
+
+    def __init__(self, engine, name: str):
+        self.engine = engine
+        self.name = name
+
+    def position(self, conn=None) -> int:
+        """Id of the last event committed, 0 before the first commit"""
+        query = select(event_consumers_table.c.last_event_id).where(event_consumers_table.c.name == self.name)
+        if conn is not None:
+            return conn.execute(query).scalar() or 0
+        with self.engine.connect() as conn:
+            return conn.execute(query).scalar() or 0
+
+    def poll(self, limit: int = 500, after: Optional[int] = None) -> List[ProfileEvent]:
+        """Up to limit events following the committed position, or following after when given"""
+        if after is None:
+            after = self.position()
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(profile_events_table)
+                .where(profile_events_table.c.id > after)
+                .order_by(profile_events_table.c.id)
+                .limit(limit)
+            ).all()
+        return [
+            ProfileEvent(**row._mapping)._replace(data=json.loads(row.data) if row.data else {})
+            for row in rows
+        ]
+
+    def commit(self, last_event_id: int, conn=None) -> None:
+        """Store the new offset; pass conn to commit it atomically with what the events were applied to"""
+        statement = dialect_insert(self.engine, event_consumers_table).values(
+            name=self.name, last_event_id=last_event_id, updated_at=datetime.utcnow()
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[event_consumers_table.c.name],
+            set_={'last_event_id': statement.excluded.last_event_id, 'updated_at': statement.excluded.updated_at}
+        )
+        if conn is not None:
+            conn.execute(statement)
+            return
+        with self.engine.begin() as conn:
+            conn.execute(statement)
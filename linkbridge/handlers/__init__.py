@@ -0,0 +1,57 @@
+"""Telegram update handlers and job callbacks of the bot"""
+from telegram import Update
+from telegram.ext import (
+    Application, CallbackQueryHandler, ChatMemberHandler, CommandHandler, MessageHandler, TypeHandler, filters
+)
+
+from linkbridge.handlers.admin import (
+    admin_stats, bulk_import_command, export_profiles, profile_command, test_linkedin, trend_command
+)
+from linkbridge.handlers.common import error_handler
+from linkbridge.handlers.discovery import profile_stats, search_profiles, suggest_profiles
+from linkbridge.handlers.info import help_command, status
+from linkbridge.handlers.profiles import (
+    button_callback, delete_profile, handle_message, invite_command, restore_archived_profile, start,
+    track_private_chat_member, update_profile
+)
+from linkbridge import services
+from linkbridge.deadlines import with_deadline
+from linkbridge.idempotency import drop_duplicate_updates
+from linkbridge.metrics import instrument_handler
+
+
+def handle(callback):
+    """Instrumented handler callback running under its deadline"""
+    return instrument_handler(with_deadline(callback))
+
+
+def register_handlers(application: Application) -> None:
+    if services.traffic_recorder:
+        application.add_handler(TypeHandler(Update, services.traffic_recorder.record), group=-3)
+    application.add_handler(TypeHandler(Update, drop_duplicate_updates), group=-2)
+    application.add_handler(TypeHandler(Update, restore_archived_profile), group=-1)
+    application.add_handler(CommandHandler("start", handle(start)))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle(handle_message)))
+    application.add_handler(CommandHandler("delete", handle(delete_profile)))
+    application.add_handler(CommandHandler("update", handle(update_profile)))
+    application.add_handler(CommandHandler("help", handle(help_command)))
+    application.add_handler(CommandHandler("test_linkedin", handle(test_linkedin)))
+    application.add_handler(CommandHandler("status", handle(status)))
+    application.add_handler(CommandHandler("search", handle(search_profiles)))
+    application.add_handler(CommandHandler("suggest", handle(suggest_profiles)))
+    application.add_handler(CommandHandler("invite", handle(invite_command)))
+    application.add_handler(CommandHandler("stats", handle(profile_stats)))
+    application.add_handler(CommandHandler("export", handle(export_profiles)))
+    application.add_handler(CommandHandler("admin_stats", handle(admin_stats)))
+    application.add_handler(CommandHandler("trend", handle(trend_command)))
+    application.add_handler(CommandHandler("profile", handle(profile_command)))
+    application.add_handler(CommandHandler("import", handle(bulk_import_command)))
+    application.add_handler(MessageHandler(
+        filters.Document.ALL & filters.CaptionRegex(r'^/import\b'),
+        handle(bulk_import_command)
+    ))
+    application.add_handler(CallbackQueryHandler(handle(button_callback)))
+    application.add_handler(ChatMemberHandler(
+        handle(track_private_chat_member), ChatMemberHandler.MY_CHAT_MEMBER
+    ))
+    application.add_error_handler(error_handler)
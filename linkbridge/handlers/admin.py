@@ -0,0 +1,263 @@
+import csv
+import logging
+from datetime import datetime
+from io import BytesIO, StringIO
+
+from telegram import InputFile, Update
+from telegram.ext import CallbackContext
+
+from linkbridge import repository, rollups, services
+from linkbridge.bulk_import import IMPORT_COLUMNS, import_profiles, send_import_digest
+from linkbridge.deadlines import budget, detached, run_in_executor
+from linkbridge.handlers.broadcasts import postpone_while_overloaded
+from linkbridge.handlers.common import current_community
+from linkbridge.handlers.jobs import rebuild_similarity_index
+from linkbridge.metrics import LOAD_SHED
+from linkbridge.outbound import BULK, priority
+from linkbridge.profiler import profile_for
+from linkbridge.settings import (
+    ADMIN_IDS, MAX_PROFILE_SECONDS, MAX_TREND_DAYS, NOTIFY_POSTPONE_SECONDS, PROFILER_INTERVAL_MS
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def admin_stats(update: Update, context: CallbackContext) -> None:
+    """Admin command counting the profiles of every community, and those broadcasts skip"""
+    if update.message.from_user.id not in ADMIN_IDS:
+        return
+    
+    with services.read_engine.connect() as conn:
+        total_users = repository.count_profiles(conn)
+        unreachable = repository.count_unreachable(conn)
+    await update.message.reply_text(
+        f"Total registered users: {total_users}\n"
+        f"Unreachable (skipped by broadcasts): {unreachable}"
+    )
+
+
+async def trend_command(update: Update, context: CallbackContext) -> None:
+    """Admin command showing network growth over the last days from the daily rollups"""
+    if update.message.from_user.id not in ADMIN_IDS:
+        await update.message.reply_text("This command is only available to administrators.")
+        return
+    
+    try:
+        days = int(context.args[0]) if context.args else 28
+    except ValueError:
+        await update.message.reply_text(f"Usage: /trend [days, up to {MAX_TREND_DAYS}]")
+        return
+    days = max(7, min(days, MAX_TREND_DAYS))
+    
+    try:
+        with services.read_engine.connect() as conn:
+            series = rollups.daily_series(conn, None, days)
+            since = series[0].day
+            top_companies = rollups.top_changes(conn, None, 'current_company', since)
+            top_locations = rollups.top_changes(conn, None, 'location', since)
+        
+        if not any(day.active_profiles or day.new_profiles for day in series):
+            await update.message.reply_text("No growth data yet, the first rollup runs tonight.")
+            return
+        
+        weeks = [rollups.net_growth(series[end - 7:end]) for end in range(len(series), 6, -7)]
+        first, last = series[0].active_profiles, series[-1].active_profiles
+        trend_text = (
+            f"📈 *Growth, last {days} days* (until {series[-1].day.isoformat()})\n\n"
+            f"👥 Profiles: {first} → *{last}* ({last - first:+d})\n"
+            f"➕ New: {sum(day.new_profiles for day in series)} · "
+            f"➖ Deleted: {sum(day.deleted_profiles for day in series)}\n\n"
+            f"Profiles `{rollups.sparkline([day.active_profiles for day in series])}`\n"
+            f"New/day  `{rollups.sparkline([day.new_profiles for day in series])}`\n\n"
+            "*Week over week:*\n"
+        )
+        for index, growth in enumerate(weeks[:4]):
+            previous = weeks[index + 1] if index + 1 < len(weeks) else 0
+            label = 'This week' if index == 0 else f'{index} week{"s" if index > 1 else ""} ago'
+            trend_text += f"• {label}: {rollups.format_change(growth, previous)}\n"
+        
+        for title, changes in (
+            ("🏢 *Growing companies:*", top_companies),
+            ("📍 *Growing locations:*", top_locations)
+        ):
+            if changes:
+                trend_text += f"\n{title}\n" + ''.join(f"• {value}: +{delta}\n" for value, delta in changes)
+        
+        await update.message.reply_text(trend_text, parse_mode='Markdown')
+    
+    except Exception as e:
+        logger.error(f"Error in trend command: {str(e)}", exc_info=True)
+        await update.message.reply_text("Sorry, an error occurred while computing the trend.")
+
+
+@budget(90)  # a login retries with backoff
+async def test_linkedin(update: Update, context: CallbackContext) -> None:
+    """Admin command to test LinkedIn API connection"""
+    if update.message.from_user.id not in ADMIN_IDS:
+        return
+        
+    try:
+        logger.info("Testing LinkedIn API connection...")
+        # Logs in on first use
+        api = await services.linkedin.get()
+        if api is None:
+            await update.message.reply_text(f"LinkedIn API not initialized! ({services.linkedin.describe()})")
+            return
+            
+        # Try to fetch a test profile
+        test_profile = await services.linkedin.call(api.get_profile, 'williamhgates', max_retries=1)
+        if test_profile:
+            await update.message.reply_text("LinkedIn API connection successful!")
+            logger.info("LinkedIn API test successful")
+        else:
+            await update.message.reply_text("LinkedIn API connected but returned no data")
+            logger.warning("LinkedIn API test returned no data")
+            
+    except Exception as e:
+        error_message = f"LinkedIn API test failed: {str(e)}"
+        logger.error(error_message, exc_info=True)
+        await update.message.reply_text(f"Error: {error_message}")
+
+
+@budget(60)
+async def export_profiles(update: Update, context: CallbackContext) -> None:
+    """Export profiles to CSV"""
+    user_id = update.message.from_user.id
+    
+    if user_id not in ADMIN_IDS:
+        await update.message.reply_text("This command is only available to administrators.")
+        return
+    
+    if services.overload.overloaded:
+        LOAD_SHED.inc(action='export')
+        await update.message.reply_text(
+            "⏳ The bot is under heavy load right now, so exports are paused.\n"
+            f"Please try /export again in about {NOTIFY_POSTPONE_SECONDS} seconds."
+        )
+        return
+        
+    try:
+        with services.read_engine.connect() as conn:
+            profiles = repository.export_rows(conn)
+            
+        if not profiles:
+            await update.message.reply_text("No profiles to export.")
+            return
+            
+        # Create CSV in memory; csv writes text, the document is sent as UTF-8
+        text_output = StringIO()
+        writer = csv.writer(text_output)
+        writer.writerow(['Full Name', 'LinkedIn URL', 'Headline', 'Company', 'Location'])
+        
+        for profile in profiles:
+            writer.writerow([
+                profile.full_name,
+                profile.linkedin_url,
+                profile.headline,
+                profile.current_company,
+                profile.location
+            ])
+            
+        output = BytesIO(text_output.getvalue().encode('utf-8'))
+        await update.message.reply_document(
+            document=InputFile(output, filename='linkedin_profiles.csv'),
+            caption="Here are all the LinkedIn profiles in CSV format."
+        )
+        
+    except Exception as e:
+        logger.error(f"Error in export_profiles: {str(e)}", exc_info=True)
+        await update.message.reply_text("Sorry, an error occurred while exporting profiles.")
+
+
+async def profile_command(update: Update, context: CallbackContext) -> None:
+    """Admin command to sample the running bot for N seconds"""
+    user_id = update.message.from_user.id
+    
+    if user_id not in ADMIN_IDS:
+        await update.message.reply_text("This command is only available to administrators.")
+        return
+    
+    if context.bot_data.get('profiling'):
+        await update.message.reply_text("A profiling session is already running.")
+        return
+    
+    try:
+        seconds = int(context.args[0]) if context.args else 30
+    except ValueError:
+        await update.message.reply_text("Usage: /profile [seconds]")
+        return
+    seconds = max(1, min(seconds, MAX_PROFILE_SECONDS))
+    
+    context.bot_data['profiling'] = True
+    await update.message.reply_text(f"⏱ Profiling for {seconds}s, the report will follow.")
+    # Run in the background so updates keep flowing while we sample them
+    with detached():
+        context.application.create_task(send_profile_report(update, context, seconds), update=update)
+
+
+async def send_profile_report(update: Update, context: CallbackContext, seconds: int) -> None:
+    """Collect a profile and send the report plus collapsed stacks to the admin"""
+    try:
+        profiler = await profile_for(seconds, PROFILER_INTERVAL_MS / 1000)
+        logger.info(f"Profiling session finished with {profiler.sample_count} samples")
+        
+        await update.message.reply_text(f"```\n{profiler.report()}\n```", parse_mode='Markdown')
+        
+        output = BytesIO(profiler.collapsed().encode('utf-8'))
+        await update.message.reply_document(
+            document=InputFile(output, filename=f"profile-{datetime.utcnow():%Y%m%d-%H%M%S}.collapsed"),
+            caption="Collapsed stacks, open with speedscope or flamegraph.pl"
+        )
+    except Exception as e:
+        logger.error(f"Error in profile command: {str(e)}", exc_info=True)
+        await update.message.reply_text("Sorry, an error occurred while profiling.")
+    finally:
+        context.bot_data.pop('profiling', None)
+
+
+@budget(None)  # the import commits in an executor thread, which cannot be cancelled
+async def bulk_import_command(update: Update, context: CallbackContext) -> None:
+    """Admin command to import profiles from an uploaded CSV or JSONL file"""
+    user_id = update.message.from_user.id
+    
+    if user_id not in ADMIN_IDS:
+        await update.message.reply_text("This command is only available to administrators.")
+        return
+    
+    document = update.message.document
+    if not document:
+        await update.message.reply_text(
+            "Send a CSV or JSONL file with the caption /import.\n"
+            f"Columns: {', '.join(IMPORT_COLUMNS)}"
+        )
+        return
+    
+    try:
+        file = await document.get_file()
+        data = bytes(await file.download_as_bytearray())
+        
+        # Parsing, COPY and the upsert are blocking, keep them off the event loop
+        community_id = current_community(update, context)
+        report = await run_in_executor(
+            import_profiles, services.engine, data, document.file_name or '', community_id
+        )
+        logger.info(f"Bulk import by admin {user_id}: {len(report.inserted)} profiles imported")
+        if report.inserted:
+            for imported_community in {profile['community_id'] for profile in report.inserted}:
+                services.query_cache.bump(imported_community)
+        
+        await update.message.reply_text(f"📥 Import finished\n\n{report.summary()}")
+        
+        # One digest for the whole batch instead of a broadcast per profile
+        if report.inserted:
+            async def digest(job_context: CallbackContext) -> None:
+                await send_import_digest(job_context.bot, services.engine, report.inserted)
+            
+            if not postpone_while_overloaded(context, 'import_digest', digest):
+                with priority(BULK):
+                    context.application.create_task(digest(context))
+            context.application.create_task(rebuild_similarity_index(context))
+    
+    except Exception as e:
+        logger.error(f"Error in bulk import: {str(e)}", exc_info=True)
+        await update.message.reply_text("Sorry, an error occurred while importing profiles.")
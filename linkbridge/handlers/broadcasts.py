@@ -0,0 +1,114 @@
+import logging
+
+from telegram.ext import CallbackContext
+
+from linkbridge import repository, services
+from linkbridge.delivery import DeliveryReport, is_permanent_failure
+from linkbridge.metrics import BROADCAST_QUEUE_DEPTH, LOAD_SHED
+from linkbridge.outbound import BULK, priority
+from linkbridge.settings import NOTIFY_POSTPONE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+async def notify_users_of_new_profile(context: CallbackContext, linkedin_url: str, new_user_id: int,
+                                      community_id: int) -> None:
+    """Notify the community's existing users about new profile with structured information"""
+    remaining = 0
+    deliveries = DeliveryReport()
+    try:
+        with services.engine.connect() as conn:
+            # Get the new user's profile information
+            new_profile = repository.get_card(conn, new_user_id)
+            
+            if not new_profile:
+                logger.error(f"Could not find profile for new user {new_user_id}")
+                return
+                
+            # Get all other reachable users of the community
+            registered_users = repository.other_user_ids(conn, community_id, new_user_id)
+        # Not held while sending: on SQLite it is the only connection writes can use
+
+        # Create notification message
+        notification_text = (
+            "🎉 *New Connection Alert!*\n\n"
+            f"👤 *{new_profile.full_name or 'New Professional'}*\n"
+            f"{'✨ ' + new_profile.headline + chr(10) if new_profile.headline else ''}"
+            f"{'🏢 ' + new_profile.current_company + chr(10) if new_profile.current_company else ''}"
+            f"{'📍 ' + new_profile.location + chr(10) if new_profile.location else ''}"
+            f"\n🔗 [View Full Profile]({linkedin_url})\n\n"
+            "Connect and expand your professional network! ✨"
+        )
+
+        # Notify each user
+        remaining = len(registered_users)
+        BROADCAST_QUEUE_DEPTH.inc(remaining)
+        for user_id in registered_users:
+            BROADCAST_QUEUE_DEPTH.dec()
+            remaining -= 1
+            try:
+                if new_profile.profile_picture_url and services.overload.degraded:
+                    LOAD_SHED.inc(action='text_only_card')
+                if new_profile.profile_picture_url and not services.overload.degraded:
+                    try:
+                        await context.bot.send_photo(
+                            chat_id=user_id,
+                            photo=new_profile.profile_picture_url,
+                            caption=notification_text,
+                            parse_mode='Markdown'
+                        )
+                    except Exception as photo_error:
+                        if is_permanent_failure(photo_error):
+                            raise
+                        # Fallback to text-only if photo fails
+                        await context.bot.send_message(
+                            chat_id=user_id,
+                            text=notification_text,
+                            parse_mode='Markdown',
+                            disable_web_page_preview=True
+                        )
+                else:
+                    await context.bot.send_message(
+                        chat_id=user_id,
+                        text=notification_text,
+                        parse_mode='Markdown',
+                        disable_web_page_preview=True
+                    )
+                deliveries.sent(user_id)
+                logger.info(f"Notified user {user_id} about new profile", extra={'event': 'broadcast_sent'})
+            except Exception as e:
+                deliveries.failure(user_id, e)
+                logger.error(f"Failed to notify user {user_id}: {e}")
+                
+    except Exception as e:
+        logger.error(f"Error in notify_users_of_new_profile: {str(e)}", exc_info=True)
+    finally:
+        # Release whatever an aborted broadcast left in the queue gauge
+        if remaining:
+            BROADCAST_QUEUE_DEPTH.dec(remaining)
+        try:
+            deliveries.save(services.engine)
+        except Exception as e:
+            logger.error(f"Could not record broadcast delivery outcomes: {str(e)}")
+
+
+async def run_postponed(context: CallbackContext) -> None:
+    """Job running work postponed by overload, unless the bot is still overloaded"""
+    job = context.job
+    if services.overload.overloaded:
+        context.job_queue.run_once(run_postponed, NOTIFY_POSTPONE_SECONDS, data=job.data, name=job.name)
+        return
+    logger.info(f"Running postponed {job.name}")
+    # Only notifications are postponed
+    with priority(BULK):
+        await job.data(context)
+
+
+def postpone_while_overloaded(context: CallbackContext, name: str, work) -> bool:
+    """Schedule work(context) for when the overload has passed; False if the bot is not overloaded"""
+    if not services.overload.overloaded:
+        return False
+    LOAD_SHED.inc(action=name)
+    logger.info(f"Overloaded, postponing {name} by {NOTIFY_POSTPONE_SECONDS}s")
+    context.job_queue.run_once(run_postponed, NOTIFY_POSTPONE_SECONDS, data=work, name=name)
+    return True
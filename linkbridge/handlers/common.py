@@ -0,0 +1,103 @@
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from telegram import KeyboardButton, ReplyKeyboardMarkup, Update
+from telegram.ext import CallbackContext
+
+from linkbridge import services
+from linkbridge.communities import resolve_community
+from linkbridge.metrics import RATE_LIMIT_REJECTIONS
+from linkbridge.settings import DEFAULT_COMMUNITY_ID
+
+logger = logging.getLogger(__name__)
+
+message_timestamps = defaultdict(list)
+
+
+async def get_main_keyboard():
+    """Get the main keyboard markup"""
+    keyboard = [
+        [KeyboardButton("➕ Add Profile")],
+        [KeyboardButton("📚 Help"), KeyboardButton("ℹ️ Status")],
+        [KeyboardButton("❌ Delete Profile"), KeyboardButton("🔄 Update Profile")],
+        [KeyboardButton("👥 View Users")]
+    ]
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
+
+def current_community(update: Update, context: CallbackContext) -> int:
+    return resolve_community(services.engine, update, context.user_data, DEFAULT_COMMUNITY_ID)
+
+
+async def rate_limit_check(user_id: int, limit: int = 5, window: int = 60) -> bool:
+    current_time = datetime.now()
+    timestamps = message_timestamps[user_id]
+    
+    # Remove timestamps older than the window
+    timestamps = [ts for ts in timestamps if (current_time - ts).total_seconds() < window]
+    message_timestamps[user_id] = timestamps
+    
+    # Check if user has exceeded rate limit
+    if len(timestamps) >= limit:
+        RATE_LIMIT_REJECTIONS.inc()
+        return False
+    
+    # Add new timestamp
+    timestamps.append(current_time)
+    return True
+
+
+def format_latency(seconds: Optional[float]) -> str:
+    """Format a latency reading for status messages"""
+    if seconds is None:
+        return "n/a"
+    return f"{seconds * 1000:.0f} ms"
+
+
+async def format_profile_info(profile_data: dict) -> str:
+    """Format profile information into a readable message"""
+    sections = []
+    
+    # Header with name and headline
+    header = []
+    if profile_data.get('full_name'):
+        header.append(f"👤 *{profile_data['full_name']}*")
+    if profile_data.get('headline'):
+        header.append(f"✨ _{profile_data['headline']}_")
+    if header:
+        sections.append("\n".join(header))
+    
+    # Professional Info
+    prof_info = []
+    if profile_data.get('current_company'):
+        prof_info.append(f"🏢 *Current Company:*\n   {profile_data['current_company']}")
+    if profile_data.get('location'):
+        prof_info.append(f"📍 *Location:*\n   {profile_data['location']}")
+    if prof_info:
+        sections.append("\n".join(prof_info))
+    
+    # Summary/About
+    if profile_data.get('summary'):
+        summary = (f"📝 *About:*\n"
+                  f"_{profile_data['summary'][:300]}{'...' if len(profile_data['summary']) > 300 else ''}_")
+        sections.append(summary)
+    
+    # Profile Link
+    if profile_data.get('linkedin_url'):
+        sections.append(f"🔗 [View Complete LinkedIn Profile]({profile_data['linkedin_url']})")
+    
+    # Footer
+    sections.append("\n━━━━━━━━━━━━━━━━━━━━━")
+    
+    return "\n\n".join(sections)
+
+
+async def error_handler(update: object, context: CallbackContext) -> None:
+    logger.error("Exception while handling an update:", exc_info=context.error)
+    if update and hasattr(update, 'effective_chat'):
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text="Sorry, an error occurred while processing your request."
+        )
@@ -0,0 +1,160 @@
+import logging
+
+from telegram import Update
+from telegram.ext import CallbackContext
+
+from linkbridge import repository, rollups, services
+from linkbridge.deadlines import run_in_executor
+from linkbridge.handlers.common import current_community
+from linkbridge.metrics import LOAD_SHED
+from linkbridge.settings import DEGRADED_SEARCH_RESULTS, MAX_SEARCH_RESULTS, MAX_SUGGESTIONS, STATS_TREND_DAYS
+
+logger = logging.getLogger(__name__)
+
+
+async def search_profiles(update: Update, context: CallbackContext) -> None:
+    """Search for profiles based on keywords"""
+    search_query = ' '.join(context.args).lower()
+    
+    if not search_query:
+        await update.message.reply_text(
+            "Please provide search terms.\n"
+            "Example: /search software engineer"
+        )
+        return
+        
+    try:
+        community_id = current_community(update, context)
+
+        def load():
+            with services.read_engine.connect() as conn:
+                return repository.search(conn, community_id, search_query)
+
+        results = services.query_cache.fetch('search', community_id, ' '.join(search_query.split()), load)
+            
+        if not results:
+            await update.message.reply_text("No profiles found matching your search.")
+            return
+            
+        limit = DEGRADED_SEARCH_RESULTS if services.overload.degraded else MAX_SEARCH_RESULTS
+        if services.overload.degraded and len(results) > limit:
+            LOAD_SHED.inc(action='search_results')
+        response = "🔍 *Search Results:*\n\n"
+        for profile in results[:limit]:
+            response += (
+                f"👤 *{profile.full_name or 'Name not available'}*\n"
+                f"📝 {profile.headline or 'No headline'}\n"
+                f"🔗 {profile.linkedin_url}\n\n"
+            )
+        if len(results) > limit:
+            response += f"…and {len(results) - limit} more. Try more specific search terms."
+            
+        await update.message.reply_text(
+            response,
+            parse_mode='Markdown',
+            disable_web_page_preview=True
+        )
+        
+    except Exception as e:
+        logger.error(f"Error in search: {str(e)}", exc_info=True)
+        await update.message.reply_text("Sorry, an error occurred while searching.")
+
+
+async def suggest_profiles(update: Update, context: CallbackContext) -> None:
+    """Recommend the profiles most similar to the caller's"""
+    user_id = update.message.from_user.id
+    try:
+        limit = min(int(context.args[0]), MAX_SUGGESTIONS) if context.args else 5
+    except ValueError:
+        await update.message.reply_text("Usage: /suggest [count]")
+        return
+    
+    # The first call imports numpy; keep that off the event loop
+    index = await run_in_executor(services.similarity_index)
+    if not index.ready:
+        await update.message.reply_text("Recommendations are still being prepared, please try again in a minute.")
+        return
+    
+    try:
+        matches = index.most_similar(user_id, limit)
+        if not matches:
+            if user_id not in index:
+                await update.message.reply_text("Share your LinkedIn profile first to get recommendations.")
+            else:
+                await update.message.reply_text("No similar profiles found yet.")
+            return
+        
+        with services.read_engine.connect() as conn:
+            cards = repository.cards_by_user(conn, [match_id for match_id, _ in matches])
+        
+        response = "🤝 *Profiles similar to yours:*\n\n"
+        for match_id, score in matches:
+            profile = cards.get(match_id)
+            if not profile:
+                continue
+            response += (
+                f"👤 *{profile.full_name or 'Name not available'}*\n"
+                f"{'✨ ' + profile.headline + chr(10) if profile.headline else ''}"
+                f"{'🏢 ' + profile.current_company + chr(10) if profile.current_company else ''}"
+                f"🔗 {profile.linkedin_url}\n\n"
+            )
+        
+        await update.message.reply_text(
+            response,
+            parse_mode='Markdown',
+            disable_web_page_preview=True
+        )
+    
+    except Exception as e:
+        logger.error(f"Error in suggest: {str(e)}", exc_info=True)
+        await update.message.reply_text("Sorry, an error occurred while finding similar profiles.")
+
+
+async def profile_stats(update: Update, context: CallbackContext) -> None:
+    """Show profile statistics"""
+    try:
+        community_id = current_community(update, context)
+
+        def load():
+            with services.read_engine.connect() as conn:
+                # Get total profiles
+                total = repository.count_profiles(conn, community_id)
+
+                # Get most common companies and locations
+                top_companies = repository.top_values(conn, community_id, 'current_company')
+                top_locations = repository.top_values(conn, community_id, 'location')
+
+                # Growth comes from the nightly rollups, a fixed number of rows however big the network
+                trend = rollups.daily_series(conn, community_id, STATS_TREND_DAYS)
+            return total, top_companies, top_locations, trend
+
+        total, top_companies, top_locations, trend = services.query_cache.fetch('stats', community_id, None, load)
+            
+        stats_text = (
+            "📊 *Network Statistics*\n\n"
+            f"👥 Total Profiles: *{total}*\n\n"
+            "🏢 *Top Companies:*\n"
+        )
+        
+        for company, count in top_companies:
+            if company:
+                stats_text += f"• {company}: {count}\n"
+                
+        stats_text += "\n📍 *Top Locations:*\n"
+        for location, count in top_locations:
+            if location:
+                stats_text += f"• {location}: {count}\n"
+
+        if any(day.active_profiles or day.new_profiles for day in trend):
+            this_week, last_week = rollups.net_growth(trend[-7:]), rollups.net_growth(trend[-14:-7])
+            stats_text += (
+                "\n📈 *Growth:*\n"
+                f"• This week: {rollups.format_change(this_week, last_week)}\n"
+                f"• New per day: `{rollups.sparkline([day.new_profiles for day in trend])}`\n"
+            )
+                
+        await update.message.reply_text(stats_text, parse_mode='Markdown')
+        
+    except Exception as e:
+        logger.error(f"Error in profile_stats: {str(e)}", exc_info=True)
+        await update.message.reply_text("Sorry, an error occurred while fetching statistics.")
@@ -0,0 +1,113 @@
+import logging
+import time
+from datetime import timedelta
+
+from telegram import Update
+from telegram.ext import CallbackContext
+
+from linkbridge import services
+from linkbridge.handlers.common import format_latency, get_main_keyboard
+from linkbridge.metrics import (
+    REGISTRY, HANDLER_LATENCY, HANDLER_ERRORS, TELEGRAM_API_LATENCY, DB_QUERY_LATENCY,
+    TELEGRAM_POOL_WAIT, RATE_LIMIT_REJECTIONS, OUTBOUND_QUEUE_WAIT
+)
+from linkbridge.outbound import BULK, INTERACTIVE
+
+logger = logging.getLogger(__name__)
+
+
+async def help_command(update: Update, context: CallbackContext) -> None:
+    """Show help information"""
+    try:
+        user_id = update.message.from_user.id
+        logger.info(f"Help command requested by user {user_id}")
+        
+        help_text = (
+            "🌟 *LinkedIn Profile Sharing Bot Help*\n\n"
+            "*Basic Commands:*\n"
+            "• Click '➕ Add Profile' to share your LinkedIn profile\n"
+            "• Use '👥 View Users' to see other profiles\n"
+            "• Use '🔄 Update Profile' to update your info\n"
+            "• Use '❌ Delete Profile' to remove your profile\n\n"
+            "*Additional Commands:*\n"
+            "• /start \\- Start the bot\n"
+            "• /help \\- Show this help message\n"
+            "• /status \\- Check bot status\n"
+            "• /search \\- Search profiles\n"
+            "• /suggest \\- Find profiles similar to yours\n"
+            "• /invite \\- Get a group's invite link\n"
+            "• /stats \\- View network statistics\n\n"
+            "*Tips:*\n"
+            "• Keep your profile up to date\n"
+            "• Use professional profile pictures\n"
+            "• Fill out your LinkedIn headline\n"
+            "• Engage with other professionals\n\n"
+            "Need help? Contact @alphityy"
+        )
+        
+        logger.info("Sending help message...")
+        await update.message.reply_text(
+            help_text,
+            parse_mode='MarkdownV2',  # Use MarkdownV2 for better compatibility
+            reply_markup=await get_main_keyboard()
+        )
+        logger.info(f"Help message sent successfully to user {user_id}")
+        
+    except Exception as e:
+        logger.error(f"Error in help command: {str(e)}", exc_info=True)
+        await update.message.reply_text(
+            "Sorry, there was an error showing the help message. Please try /help again.",
+            reply_markup=await get_main_keyboard()
+        )
+
+
+async def status(update: Update, context: CallbackContext) -> None:
+    """Check bot status"""
+    try:
+        uptime = timedelta(seconds=int(time.time() - REGISTRY.started_at))
+        handled = HANDLER_LATENCY.count()
+        errors = int(HANDLER_ERRORS.total())
+        db_status = f"🗄️ Database: *{services.db_probes['primary'].describe()}*\n"
+        if 'replica' in services.db_probes:
+            db_status += f"🗄️ Read Replica: *{services.db_probes['replica'].describe()}*\n"
+        all_healthy = all(probe.healthy for probe in services.db_probes.values())
+        archive_report = services.profile_archive.last_report
+        archive_status = ""
+        if archive_report:
+            archive_status = (
+                f"🧊 Profiles: *{archive_report.hot_after} active*, {archive_report.archive_size} archived "
+                f"({archive_report.hot_before - archive_report.hot_after} moved on "
+                f"{archive_report.finished_at:%Y-%m-%d})\n"
+            )
+        hit_ratio = services.query_cache.hit_ratio()
+        cache_hits = f"{hit_ratio:.0%} hits" if hit_ratio is not None else "no lookups yet"
+        status_text = (
+            "🤖 *Bot Status Report*\n\n"
+            f"🟢 Bot Service: *Active* (up {uptime})\n"
+            f"{db_status}"
+            f"🔗 LinkedIn API: *{services.linkedin.describe()}*\n\n"
+            f"⚡️ Response Time: *p50 {format_latency(HANDLER_LATENCY.quantile(0.5))}, "
+            f"p95 {format_latency(HANDLER_LATENCY.quantile(0.95))}*\n"
+            f"📨 Requests Handled: *{handled}* ({errors} failed)\n"
+            f"🗄️ DB Query Time: *avg {format_latency(DB_QUERY_LATENCY.mean())}*\n"
+            f"{archive_status}"
+            f"🗃️ Query Cache: *{cache_hits}* ({len(services.query_cache)} results)\n"
+            f"📡 Telegram API: *p95 {format_latency(TELEGRAM_API_LATENCY.quantile(0.95))}* "
+            f"(pool wait p95 {format_latency(TELEGRAM_POOL_WAIT.quantile(0.95, pool='send'))})\n"
+            f"📤 Send Queue Wait: *p95 {format_latency(OUTBOUND_QUEUE_WAIT.quantile(0.95, priority=INTERACTIVE))}* "
+            f"(bulk p95 {format_latency(OUTBOUND_QUEUE_WAIT.quantile(0.95, priority=BULK))})\n"
+            f"🚦 Rate-limited Messages: *{int(RATE_LIMIT_REJECTIONS.total())}*\n"
+            f"🏋️ Load: *{services.overload.describe()}* (backlog {services.overload.backlog}, "
+            f"loop lag {format_latency(services.overload.lag)})\n"
+            f"🔐 Security: *Enabled*\n\n"
+            f"{'All systems operational! ✨' if all_healthy else '⚠️ Some systems are degraded.'}"
+        )
+        await update.message.reply_text(status_text, parse_mode='Markdown')
+        logger.info(f"Status check by user {update.message.from_user.id}")
+    except Exception as e:
+        logger.error(f"Error in status command: {str(e)}", exc_info=True)
+        await update.message.reply_text(
+            "⚠️ *Error checking status*\n"
+            "Please try again later.",
+            parse_mode='Markdown'
+        )
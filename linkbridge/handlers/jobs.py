@@ -0,0 +1,86 @@
+import asyncio
+import logging
+
+from telegram.ext import CallbackContext
+
+from linkbridge import repository, services
+from linkbridge.archive import INACTIVE, UNREACHABLE
+from linkbridge.rollups import roll_up
+from linkbridge.metrics import start_metrics_server
+from linkbridge.settings import METRICS_HOST, METRICS_PORT
+
+logger = logging.getLogger(__name__)
+
+
+async def probe_databases(context: CallbackContext) -> None:
+    """Measure database round-trip latency without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    for probe in services.db_probes.values():
+        await loop.run_in_executor(None, probe.run)
+
+
+async def rebuild_similarity_index(context: CallbackContext) -> None:
+    """Recompute the /suggest index from the read database"""
+    def load_documents():
+        with services.read_engine.connect() as conn:
+            return repository.similarity_documents(conn)
+    
+    try:
+        # The first call imports numpy; keep that off the event loop
+        index = await asyncio.get_running_loop().run_in_executor(None, services.similarity_index)
+        await index.rebuild(load_documents)
+    except Exception as e:
+        logger.error(f"Error rebuilding similarity index: {str(e)}", exc_info=True)
+
+
+async def flush_traffic_recording(context: CallbackContext) -> None:
+    """Append the updates recorded since the last flush to the traffic recording"""
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, services.traffic_recorder.flush)
+    except Exception as e:
+        logger.error(f"Could not write the traffic recording, retrying with the next batch: {str(e)}")
+
+
+async def flush_user_activity(context: CallbackContext) -> None:
+    """Write last_seen_at for the users seen since the last flush"""
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, services.profile_archive.flush_activity)
+    except Exception as e:
+        logger.error(f"Could not write user activity, retrying with the next batch: {str(e)}")
+
+
+async def archive_inactive_profiles(context: CallbackContext) -> None:
+    """Move long inactive and unreachable profiles out of user_linkedin"""
+    try:
+        report = await asyncio.get_running_loop().run_in_executor(None, services.profile_archive.archive)
+    except Exception as e:
+        logger.error(f"Error archiving inactive profiles: {str(e)}", exc_info=True)
+        return
+    moved = sum(report.archived.values())
+    shrink = (report.hot_before - report.hot_after) / report.hot_before if report.hot_before else 0
+    logger.info(
+        f"Archived {moved} profiles ({report.archived[INACTIVE]} inactive, "
+        f"{report.archived[UNREACHABLE]} unreachable); user_linkedin went from {report.hot_before} "
+        f"to {report.hot_after} rows ({shrink:.1%} smaller), {report.archive_size} archived in total"
+    )
+    if moved:
+        services.query_cache.bump()
+        await rebuild_similarity_index(context)
+
+
+async def roll_up_daily_growth(context: CallbackContext) -> None:
+    """Fold the profile events of completed days into the growth rollups"""
+    try:
+        if await asyncio.get_running_loop().run_in_executor(None, roll_up, services.engine):
+            # /stats caches its growth section
+            services.query_cache.bump()
+    except Exception as e:
+        logger.error(f"Error rolling up daily growth: {str(e)}", exc_info=True)
+
+
+async def start_metrics_endpoint(context: CallbackContext) -> None:
+    """Serve /metrics; a job so that importing aiohttp stays off the startup path"""
+    try:
+        context.bot_data['metrics_runner'] = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+    except OSError as e:
+        logger.error(f"Could not start metrics endpoint on {METRICS_HOST}:{METRICS_PORT}: {str(e)}")
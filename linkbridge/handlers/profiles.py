@@ -0,0 +1,617 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup, Update
+from telegram.ext import CallbackContext
+
+from linkbridge import events, repository, services
+from linkbridge.communities import community_from_start_args, invite_link, is_member
+from linkbridge.database import insert_ignoring_conflicts
+from linkbridge.deadlines import detached, run_in_executor
+from linkbridge.delivery import mark_reachable, mark_unreachable
+from linkbridge.handlers.broadcasts import notify_users_of_new_profile, postpone_while_overloaded
+from linkbridge.handlers.common import current_community, get_main_keyboard, rate_limit_check
+from linkbridge.handlers.info import help_command, status
+from linkbridge.invalidation import notify_profile_change
+from linkbridge.metrics import LOAD_SHED
+from linkbridge.outbound import BULK, priority
+from linkbridge.schema import linkedin_table
+from linkbridge.settings import DEFAULT_COMMUNITY_ID, DEGRADED_PROFILE_CARDS, DEGRADED_USERS_PER_PAGE, USERS_PER_PAGE
+from linkbridge.urls import canonical_slug, is_valid_linkedin_url, normalize_linkedin_url
+
+logger = logging.getLogger(__name__)
+
+
+async def start(update: Update, context: CallbackContext) -> None:
+    try:
+        user_id = update.message.from_user.id
+        username = update.message.from_user.username
+        logger.info(f"New user {user_id} (@{username}) started the bot")
+        
+        # Invite links carry the community to join, see /invite; only the group's members may join it
+        community_id = community_from_start_args(context.args)
+        if community_id is not None:
+            if community_id == DEFAULT_COMMUNITY_ID or await is_member(context.bot, community_id, user_id):
+                context.user_data['community_id'] = community_id
+                logger.info(f"User {user_id} joined community {community_id}")
+            else:
+                logger.warning(f"User {user_id} is not a member of community {community_id}, ignoring its invite link")
+                await update.message.reply_text(
+                    "This invite link belongs to a group you are not a member of. "
+                    "Join the group first, then open the link again."
+                )
+        
+        # Talking to the bot again proves the chat works; resume broadcasts to it
+        if update.effective_chat.type == update.effective_chat.PRIVATE:
+            mark_reachable(services.engine, user_id)
+        
+        reply_markup = await get_main_keyboard()
+        
+        welcome_text = (
+            "🌟 *Welcome to the LinkedIn Profile Sharing Bot!* 🌟\n\n"
+            "Connect with professionals and share your LinkedIn profile easily.\n\n"
+            "📝 *How to use:*\n"
+            "• Share your LinkedIn profile URL\n"
+            "• View other professionals' profiles\n"
+            "• Get notified about new connections\n\n"
+            "🔗 *Share your profile by sending a URL like:*\n"
+            "`https://www.linkedin.com/in/username`\n\n"
+            "Use the buttons below to navigate! 👇"
+        )
+        
+        await update.message.reply_text(
+            welcome_text, 
+            parse_mode='Markdown',
+            reply_markup=reply_markup
+        )
+        
+    except Exception as e:
+        logger.error(f"Error in start command: {str(e)}", exc_info=True)
+        await update.message.reply_text("Sorry, an error occurred. Please try again later.")
+
+
+async def track_private_chat_member(update: Update, context: CallbackContext) -> None:
+    """Follow users blocking and unblocking the bot in private chats"""
+    member_update = update.my_chat_member
+    if member_update.chat.type != member_update.chat.PRIVATE:
+        return
+    user_id = member_update.chat.id
+    if member_update.new_chat_member.status == member_update.new_chat_member.BANNED:
+        logger.info(f"User {user_id} blocked the bot")
+        mark_unreachable(services.engine, [user_id])
+    elif member_update.new_chat_member.status == member_update.new_chat_member.MEMBER:
+        mark_reachable(services.engine, user_id)
+
+
+async def restore_archived_profile(update: Update, context: CallbackContext) -> None:
+    """Bring an archived profile back before any handler looks for it; register in group -1"""
+    user = update.effective_user
+    member_update = update.my_chat_member
+    if user is None or (member_update and member_update.new_chat_member.status == member_update.new_chat_member.BANNED):
+        return
+    if not services.profile_archive.seen(user.id):
+        return
+    chat = update.effective_chat
+    private = chat is not None and chat.type == chat.PRIVATE
+    try:
+        profile = await run_in_executor(services.profile_archive.restore, user.id, private)
+    except Exception as e:
+        services.profile_archive.forget(user.id)
+        logger.error(f"Could not restore the archived profile of user {user.id}: {str(e)}", exc_info=True)
+        return
+    if profile is None:
+        return
+    services.query_cache.bump(profile.community_id)
+    # The first call imports numpy; keep that off the event loop
+    index = await run_in_executor(services.similarity_index)
+    index.upsert(repository.SimilarityDocument(
+        profile.telegram_user_id, profile.community_id, profile.headline, profile.current_company,
+        profile.location, profile.summary
+    ))
+
+
+async def invite_command(update: Update, context: CallbackContext) -> None:
+    """Reply with the link that registers profiles into this group's community"""
+    chat = update.effective_chat
+    if chat.type == chat.PRIVATE:
+        await update.message.reply_text("Use /invite in a group to get a link for its members.")
+        return
+    await update.message.reply_text(
+        "Share your LinkedIn profile with this group's network:\n"
+        f"{invite_link(context.bot.username, chat.id)}",
+        disable_web_page_preview=True
+    )
+
+
+async def handle_message(update: Update, context: CallbackContext) -> None:
+    user_id = update.message.from_user.id
+    user_message = update.message.text
+    logger.info(f"Received message from user {user_id}", extra={'event': 'message_received', 'length': len(user_message)})
+    
+    # Handle button presses first
+    if user_message in ["➕ Add Profile", "📚 Help", "ℹ️ Status", "❌ Delete Profile", "🔄 Update Profile", "👥 View Users"]:
+        try:
+            if user_message == "➕ Add Profile":
+                await update.message.reply_text(
+                    "Please send your LinkedIn profile URL.\n"
+                    "Example: https://www.linkedin.com/in/username",
+                    reply_markup=await get_main_keyboard()
+                )
+            elif user_message == "📚 Help":
+                logger.info(f"Help button pressed by user {user_id}")
+                await help_command(update, context)
+            elif user_message == "ℹ️ Status":
+                await status(update, context)
+            elif user_message == "❌ Delete Profile":
+                await delete_profile(update, context)
+            elif user_message == "🔄 Update Profile":
+                await update_profile(update, context)
+            elif user_message == "👥 View Users":
+                await show_user_list(update, context)
+            return
+        except Exception as e:
+            logger.error(f"Error handling button press '{user_message}': {str(e)}", exc_info=True)
+            await update.message.reply_text(
+                "Sorry, there was an error processing your request.",
+                reply_markup=await get_main_keyboard()
+            )
+            return
+
+    # Handle delete confirmation
+    if context.user_data.get('awaiting_delete_confirmation'):
+        if user_message.lower() in ["yes", "✅ yes, delete my profile"]:
+            try:
+                with services.engine.begin() as conn:
+                    deleted = conn.execute(
+                        linkedin_table.delete()
+                        .where(linkedin_table.c.telegram_user_id == user_id)
+                        .returning(
+                            linkedin_table.c.community_id,
+                            linkedin_table.c.current_company,
+                            linkedin_table.c.location
+                        )
+                    ).first()
+                    if deleted:
+                        # In the same transaction, so the log never misses a committed delete
+                        events.write_events(conn, [events.event_row(
+                            events.DELETED, user_id, deleted.community_id,
+                            current_company=deleted.current_company, location=deleted.location
+                        )])
+                        notify_profile_change(conn, events.DELETED, user_id, deleted.community_id)
+                # Invalidate only once committed, so a concurrent read cannot re-cache the deleted row
+                if deleted:
+                    logger.info(f"Successfully deleted profile for user {user_id}")
+                    services.query_cache.bump(deleted.community_id)
+                    index = await run_in_executor(services.similarity_index)
+                    index.remove(user_id)
+                    # Reset to default keyboard
+                    keyboard = [
+                        [KeyboardButton("📚 Help"), KeyboardButton("ℹ️ Status")],
+                        [KeyboardButton("❌ Delete Profile"), KeyboardButton("🔄 Update Profile")]
+                    ]
+                    reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+                    await update.message.reply_text(
+                        "Your profile has been deleted.",
+                        reply_markup=reply_markup
+                    )
+                else:
+                    logger.warning(f"No profile found to delete for user {user_id}")
+                    await update.message.reply_text("No profile found to delete.")
+            except Exception as e:
+                logger.error(f"Error deleting profile for user {user_id}: {str(e)}", exc_info=True)
+                await update.message.reply_text("Sorry, there was an error deleting your profile.")
+        elif user_message.lower() in ["no", "❌ no, keep my profile"]:
+            # Reset to default keyboard
+            keyboard = [
+                [KeyboardButton("📚 Help"), KeyboardButton("ℹ️ Status")],
+                [KeyboardButton("❌ Delete Profile"), KeyboardButton("🔄 Update Profile")]
+            ]
+            reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+            await update.message.reply_text(
+                "Profile deletion cancelled.",
+                reply_markup=reply_markup
+            )
+        # Clear the awaiting confirmation state
+        context.user_data.pop('awaiting_delete_confirmation', None)
+        return
+
+    # Handle LinkedIn URL processing
+    if is_valid_linkedin_url(user_message):
+        await process_linkedin_url(update, context, user_message)
+    else:
+        logger.warning(f"Invalid message received from user {user_id}",
+                       extra={'event': 'invalid_message', 'length': len(user_message)})
+        # Don't show the error message for button presses
+        if not user_message.startswith(('📚', 'ℹ️', '❌', '🔄', '✅')):
+            await update.message.reply_text(
+                "Please send a valid LinkedIn profile URL or use the buttons below.\n"
+                "Example URL: https://www.linkedin.com/in/username"
+            )
+
+
+async def process_linkedin_url(update: Update, context: CallbackContext, url: str) -> None:
+    """Process LinkedIn URL submission"""
+    user_id = update.message.from_user.id
+    
+    # Check rate limit
+    if not await rate_limit_check(user_id):
+        logger.warning(f"Rate limit exceeded for user {user_id}")
+        await update.message.reply_text("You're sending too many messages. Please wait a moment.")
+        return
+
+    slug = canonical_slug(url)
+    url = normalize_linkedin_url(url)
+    community_id = current_community(update, context)
+
+    try:
+        profile_info = await fetch_linkedin_profile(url)
+        
+        insert_data = {
+            'linkedin_url': url,
+            'telegram_user_id': user_id,
+            'created_at': datetime.utcnow()
+        }
+        if profile_info:
+            insert_data.update(profile_info)
+        insert_data['linkedin_slug'] = slug
+        insert_data['community_id'] = community_id
+        
+        # A single atomic upsert: retries and double taps hit the unique indexes and insert nothing
+        with services.engine.begin() as conn:
+            created = conn.execute(
+                insert_ignoring_conflicts(services.engine, linkedin_table)
+                .values(**insert_data)
+                .returning(linkedin_table.c.id)
+            ).first()
+            
+            if created:
+                events.write_events(conn, [events.event_row(events.CREATED, user_id, community_id, **{
+                    column: value for column, value in insert_data.items()
+                    if column not in ('telegram_user_id', 'community_id', 'created_at')
+                })])
+                notify_profile_change(conn, events.CREATED, user_id, community_id)
+            else:
+                existing_profile = conn.execute(
+                    select(linkedin_table.c.telegram_user_id, linkedin_table.c.community_id).where(
+                        or_(
+                            linkedin_table.c.telegram_user_id == user_id,
+                            linkedin_table.c.linkedin_slug == slug
+                        )
+                    )
+                ).first()
+        
+        if not created:
+            if existing_profile and existing_profile.telegram_user_id != user_id:
+                logger.warning(f"LinkedIn profile '{slug}' already registered by another user")
+                await update.message.reply_text("This LinkedIn profile has already been registered.")
+            elif existing_profile and existing_profile.community_id != community_id:
+                # telegram_user_id is unique, so a user's profile belongs to one community at a time
+                logger.warning(f"User {user_id} already has a profile in community {existing_profile.community_id}")
+                await update.message.reply_text(
+                    "Your LinkedIn profile is already shared with another community.\n"
+                    "A profile belongs to one community at a time: use /delete first to share it here instead."
+                )
+            else:
+                logger.warning(f"Duplicate LinkedIn URL from user {user_id}")
+                await update.message.reply_text(
+                    "You have already registered a LinkedIn profile.\n"
+                    "Use /delete to remove your current profile first, or\n"
+                    "Use /update to update your existing profile."
+                )
+            return
+        
+        logger.info(f"Saved LinkedIn URL for user {user_id}")
+        services.query_cache.bump(community_id)
+        context.user_data['community_id'] = community_id
+        # The first call imports numpy; keep that off the event loop
+        index = await run_in_executor(services.similarity_index)
+        index.upsert(repository.SimilarityDocument(
+            user_id,
+            community_id,
+            insert_data.get('headline'),
+            insert_data.get('current_company'),
+            insert_data.get('location'),
+            insert_data.get('summary')
+        ))
+        await update.message.reply_text("Your LinkedIn profile URL has been saved!")
+        
+        # Only the request that created the row fans out, in the background, without the handler's deadline
+        # and behind interactive replies
+        with detached(), priority(BULK):
+            context.application.create_task(send_linkedin_profiles(update, url, community_id), update=update)
+            if not postpone_while_overloaded(
+                context, 'new_profile_notification',
+                lambda job_context: notify_users_of_new_profile(job_context, url, user_id, community_id)
+            ):
+                context.application.create_task(
+                    notify_users_of_new_profile(context, url, user_id, community_id), update=update
+                )
+        
+    except IntegrityError:
+        logger.warning(f"Duplicate LinkedIn URL from user {user_id}")
+        await update.message.reply_text("This LinkedIn profile has already been registered.")
+    except Exception as e:
+        logger.error(f"Error processing LinkedIn URL: {str(e)}", exc_info=True)
+        await update.message.reply_text("Sorry, there was an error processing your LinkedIn URL.")
+
+
+async def send_linkedin_profiles(update: Update, user_message: str, community_id: int) -> None:
+    """Send the other LinkedIn profiles of the community to the user in a structured format"""
+    user_id = update.message.from_user.id
+    logger.info(f"Fetching LinkedIn profiles for user {user_id}")
+    
+    try:
+        with services.engine.connect() as conn:
+            profiles = repository.other_cards(conn, community_id, user_id)
+        
+        if not profiles:
+            logger.info(f"No other profiles to show to user {user_id}")
+            await update.message.reply_text(
+                "You're the first one here! 🎉\n"
+                "Share your profile with others to grow the network."
+            )
+            return
+        
+        total_profiles = len(profiles)
+        if services.overload.degraded and total_profiles > DEGRADED_PROFILE_CARDS:
+            LOAD_SHED.inc(action='profile_cards')
+            profiles = profiles[:DEGRADED_PROFILE_CARDS]
+        logger.info(f"Sending {len(profiles)} of {total_profiles} profiles to user {user_id}")
+        
+        # Send profiles one by one with formatted information
+        for profile in profiles:
+            profile_text = (
+                f"👤 *{profile.full_name or 'Name not available'}*\n"
+                f"{'✨ ' + profile.headline + chr(10) if profile.headline else ''}"
+                f"{'🏢 ' + profile.current_company + chr(10) if profile.current_company else ''}"
+                f"{'📍 ' + profile.location + chr(10) if profile.location else ''}"
+                f"\n🔗 [View Full Profile]({profile.linkedin_url})\n"
+                f"{'━' * 30}"
+            )
+            
+            try:
+                await update.message.reply_text(
+                    profile_text,
+                    parse_mode='Markdown',
+                    disable_web_page_preview=True
+                )
+            except Exception as e:
+                logger.error(f"Error sending profile {profile.linkedin_url}: {str(e)}")
+                continue
+            
+        # Send summary message
+        shown = (f"{len(profiles)} of {total_profiles} professionals" if len(profiles) < total_profiles
+                 else f"{len(profiles)} professional{'s' if len(profiles) > 1 else ''}")
+        await update.message.reply_text(
+            f"✨ Showing {shown} in your network.\n\n"
+            "💡 Use /search to find specific profiles\n"
+            "📊 Use /stats to see network statistics",
+            parse_mode='Markdown'
+        )
+            
+    except Exception as e:
+        logger.error(f"Error fetching profiles for user {user_id}: {str(e)}", exc_info=True)
+        await update.message.reply_text(
+            "Sorry, there was an error fetching other profiles."
+        )
+
+
+async def fetch_linkedin_profile(url: str) -> Dict[str, Any]:
+    """Fetch profile data from LinkedIn"""
+    logger.info("LinkedIn API disabled, storing basic profile info")
+    # Extract username from URL
+    username = url.split('/in/')[-1].strip('/')
+    return {
+        'linkedin_url': url,
+        'full_name': f'LinkedIn User ({username})',  # Use username from URL
+        'headline': '',
+        'location': '',
+        'current_company': '',
+        'summary': '',
+        'profile_picture_url': None
+    }
+
+
+async def delete_profile(update: Update, context: CallbackContext) -> None:
+    """Delete user's LinkedIn profile with confirmation"""
+    user_id = update.message.from_user.id
+    logger.info(f"Delete profile request from user {user_id}")
+    
+    try:
+        # First check if user has a profile
+        with services.engine.connect() as conn:
+            has_profile = repository.has_profile(conn, user_id)
+        if not has_profile:
+            logger.warning(f"No profile found to delete for user {user_id}")
+            await update.message.reply_text("You don't have a registered profile.")
+            return
+        
+        # Create confirmation keyboard
+        keyboard = [
+            [KeyboardButton("✅ Yes, delete my profile")],
+            [KeyboardButton("❌ No, keep my profile")]
+        ]
+        reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
+        
+        # Ask for confirmation
+        await update.message.reply_text(
+            "⚠️ *Are you sure you want to delete your LinkedIn profile?*\n"
+            "This action cannot be undone.",
+            parse_mode='Markdown',
+            reply_markup=reply_markup
+        )
+        
+        # Set user state to await confirmation
+        context.user_data['awaiting_delete_confirmation'] = True
+        
+    except Exception as e:
+        logger.error(f"Error in delete profile command: {str(e)}", exc_info=True)
+        await update.message.reply_text("Sorry, there was an error processing your request.")
+
+
+async def update_profile(update: Update, context: CallbackContext) -> None:
+    """Update user's LinkedIn profile"""
+    user_id = update.message.from_user.id
+    logger.info(f"Profile update requested by user {user_id}")
+    
+    try:
+        # Check if user has a profile
+        with services.engine.connect() as conn:
+            result = repository.get_card(conn, user_id)
+        
+        if not result:
+            await update.message.reply_text(
+                "You don't have a registered profile yet.\n"
+                "Send your LinkedIn profile URL to register."
+            )
+            return
+        
+        # Show current profile and request new URL
+        current_profile = (
+            "Your current profile:\n\n"
+            f"Name: {result.full_name or 'Not available'}\n"
+            f"Headline: {result.headline or 'Not available'}\n"
+            f"Company: {result.current_company or 'Not available'}\n"
+            f"Location: {result.location or 'Not available'}\n\n"
+            "To update your profile, send your LinkedIn URL again."
+        )
+        
+        await update.message.reply_text(current_profile)
+        
+    except Exception as e:
+        logger.error(f"Error in update profile command: {str(e)}", exc_info=True)
+        await update.message.reply_text(
+            "Sorry, there was an error processing your request."
+        )
+
+
+async def show_user_list(update: Update, context: CallbackContext, offset: int = 0,
+                         community_id: Optional[int] = None) -> None:
+    """Show paginated list of the community's registered users"""
+    try:
+        # Pages shrink under load; buttons carry offsets so they stay valid when the size changes
+        per_page = DEGRADED_USERS_PER_PAGE if services.overload.degraded else USERS_PER_PAGE
+        if services.overload.degraded:
+            LOAD_SHED.inc(action='small_page')
+        if community_id is None:
+            community_id = current_community(update, context)
+        
+        def load():
+            with services.read_engine.connect() as conn:
+                # Get total count and users
+                total_count = repository.count_profiles(conn, community_id)
+
+                # Get paginated users, fetching only the columns the cards show
+                users = repository.list_page(conn, community_id, offset, per_page)
+            return total_count, users
+
+        total_count, users = services.query_cache.fetch('user_list', community_id, (offset, per_page), load)
+            
+        if not users:
+            if offset == 0:
+                await update.message.reply_text(
+                    "No users registered yet! 😊\n"
+                    "Be the first one to share your LinkedIn profile!",
+                    reply_markup=await get_main_keyboard()
+                )
+            else:
+                await update.message.reply_text(
+                    "No more users to show.",
+                    reply_markup=await get_main_keyboard()
+                )
+            return
+
+        # Send profiles one by one
+        for user in users:
+            try:
+                # Create profile card
+                profile_text = (
+                    f"👤 *{user.full_name or 'Name not available'}*" + "\n" +
+                    (f"✨ {user.headline}" + "\n" if user.headline else "") +
+                    (f"🏢 {user.current_company}" + "\n" if user.current_company else "") +
+                    (f"📍 {user.location}" + "\n" if user.location else "") +
+                    (f"📝 {user.summary}" + "\n\n" if user.summary else "\n") +
+                    f"🔗 [View Full Profile]({user.linkedin_url})" + "\n" +
+                    ("━" * 30)
+                )
+
+                # Only try to access profile_picture_url if it exists; photos are skipped under load
+                if user.profile_picture_url and services.overload.degraded:
+                    LOAD_SHED.inc(action='text_only_card')
+                if user.profile_picture_url and not services.overload.degraded:
+                    try:
+                        await update.message.reply_photo(
+                            photo=user.profile_picture_url,
+                            caption=profile_text,
+                            parse_mode='Markdown'
+                        )
+                    except Exception as photo_error:
+                        logger.error(f"Error sending photo: {str(photo_error)}")
+                        await update.message.reply_text(
+                            profile_text,
+                            parse_mode='Markdown',
+                            disable_web_page_preview=True
+                        )
+                else:
+                    await update.message.reply_text(
+                        profile_text,
+                        parse_mode='Markdown',
+                        disable_web_page_preview=True
+                    )
+
+            except Exception as e:
+                logger.error(f"Error sending profile: {str(e)}")
+                continue
+
+        # Add pagination controls
+        shown_until = offset + len(users)
+        
+        # Only show pagination if there are multiple pages
+        if total_count > len(users):
+            keyboard = []
+            if offset > 0:
+                keyboard.append(InlineKeyboardButton(
+                    "⬅️ Previous", callback_data=f"users_from_{max(offset - per_page, 0)}"
+                ))
+            if shown_until < total_count:
+                keyboard.append(InlineKeyboardButton("Next ➡️", callback_data=f"users_from_{shown_until}"))
+            
+            if keyboard:  # Only show pagination controls if there are buttons to show
+                pagination_text = f"\nShowing {offset + 1}-{shown_until} of {total_count}"
+                await update.message.reply_text(
+                    pagination_text,
+                    reply_markup=InlineKeyboardMarkup([keyboard])
+                )
+
+    except Exception as e:
+        logger.error(f"Error showing user list: {str(e)}", exc_info=True)
+        await update.message.reply_text(
+            "Sorry, there was an error fetching the user list.",
+            reply_markup=await get_main_keyboard()
+        )
+
+
+async def button_callback(update: Update, context: CallbackContext) -> None:
+    """Handle button callbacks"""
+    query = update.callback_query
+    await query.answer()
+    
+    try:
+        if query.data.startswith(("users_from_", "users_page_")):
+            offset = int(query.data.split("_")[-1])
+            if query.data.startswith("users_page_"):
+                # Buttons sent before pagination switched to offsets
+                offset *= USERS_PER_PAGE
+            # Create a new update object with the message
+            new_update = Update(update.update_id, message=query.message)
+            await show_user_list(new_update, context, offset, current_community(update, context))
+            
+    except Exception as e:
+        logger.error(f"Error in button callback: {str(e)}", exc_info=True)
+        await query.message.reply_text(
+            "Sorry, there was an error processing your request.",
+            reply_markup=await get_main_keyboard()
+        )
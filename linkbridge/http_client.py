@@ -0,0 +1,116 @@
+import asyncio
+import functools
+import logging
+import ssl
+import time
+from typing import Optional, Tuple
+
+import httpx
+from telegram._utils.defaultvalue import DefaultValue
+from telegram.error import TimedOut
+from telegram.request import BaseRequest, RequestData
+
+from linkbridge.deadlines import cap_timeout, remaining
+from linkbridge.metrics import TELEGRAM_POOL_TIMEOUTS, TELEGRAM_POOL_WAIT, InstrumentedRequest
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def shared_ssl_context() -> ssl.SSLContext:
+    """One SSL context for every client; loading the CA bundle takes tens of milliseconds each time"""
+    return httpx.create_ssl_context()
+
+
+class PooledRequest(InstrumentedRequest):
+    """InstrumentedRequest with keep-alive tuning and a measured wait for pool connections
+
+    A semaphore sized to the pool admits requests, so httpx never queues internally
+    and the time spent waiting for a connection shows up in telegram_pool_wait_seconds.
+    """
+
+    def __init__(self, pool: str, connection_pool_size: int = 1, keepalive_connections: Optional[int] = None,
+                 keepalive_expiry: Optional[float] = 5.0, **kwargs):
+        super().__init__(connection_pool_size=connection_pool_size, **kwargs)
+        self.pool = pool
+        self.pool_size = connection_pool_size
+        self._client_kwargs['limits'] = httpx.Limits(
+            max_connections=connection_pool_size,
+            max_keepalive_connections=connection_pool_size if keepalive_connections is None else keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._client = self._build_client()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        self._client_kwargs.setdefault('verify', shared_ssl_context())
+        return super()._build_client()
+
+    async def initialize(self) -> None:
+        await super().initialize()
+        # Created here so it belongs to the loop the application runs on
+        self._slots = asyncio.Semaphore(self.pool_size)
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: RequestData = None,
+        read_timeout=BaseRequest.DEFAULT_NONE,
+        write_timeout=BaseRequest.DEFAULT_NONE,
+        connect_timeout=BaseRequest.DEFAULT_NONE,
+        pool_timeout=BaseRequest.DEFAULT_NONE,
+    ) -> Tuple[int, bytes]:
+        if self._slots is None:
+            raise RuntimeError(f"The {self.pool} request pool is not initialized!")
+        if isinstance(pool_timeout, DefaultValue):
+            pool_timeout = self._client.timeout.pool
+        left = remaining()
+        if left is not None:
+            # Requests made by a handler share its deadline
+            if left <= 0:
+                raise TimedOut("Handler deadline exceeded. Request was *not* sent to Telegram.")
+            timeouts = self._client.timeout
+            read_timeout = cap_timeout(timeouts.read if isinstance(read_timeout, DefaultValue) else read_timeout)
+            write_timeout = cap_timeout(timeouts.write if isinstance(write_timeout, DefaultValue) else write_timeout)
+            connect_timeout = cap_timeout(
+                timeouts.connect if isinstance(connect_timeout, DefaultValue) else connect_timeout
+            )
+            pool_timeout = cap_timeout(pool_timeout)
+
+        start_time = time.perf_counter()
+        try:
+            if self._slots.locked():
+                await asyncio.wait_for(self._slots.acquire(), pool_timeout)
+            else:
+                await self._slots.acquire()
+        except asyncio.TimeoutError:
+            TELEGRAM_POOL_TIMEOUTS.inc(pool=self.pool)
+            raise TimedOut(
+                f"Pool timeout: all {self.pool_size} connections of the {self.pool} pool are occupied. "
+                "Request was *not* sent to Telegram."
+            ) from None
+        finally:
+            TELEGRAM_POOL_WAIT.observe(time.perf_counter() - start_time, pool=self.pool)
+
+        try:
+            return await super().do_request(
+                url, method, request_data,
+                read_timeout=read_timeout,
+                write_timeout=write_timeout,
+                connect_timeout=connect_timeout,
+                pool_timeout=pool_timeout
+            )
+        finally:
+            self._slots.release()
+
+
+def build_request(pool: str, http_version: str = '1.1', **kwargs) -> PooledRequest:
+    """PooledRequest that falls back to HTTP/1.1 when HTTP/2 support is not installed"""
+    try:
+        return PooledRequest(pool, http_version=http_version, **kwargs)
+    except RuntimeError as e:
+        if http_version == '1.1':
+            raise
+        logger.warning(f"HTTP/2 is unavailable for the {pool} pool, using HTTP/1.1: {str(e)}")
+        return PooledRequest(pool, http_version='1.1', **kwargs)
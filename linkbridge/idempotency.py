@@ -0,0 +1,38 @@
+import collections
+import logging
+
+from telegram import Update
+from telegram.ext import ApplicationHandlerStop, CallbackContext
+
+from linkbridge.metrics import DUPLICATE_UPDATES
+
+logger = logging.getLogger(__name__)
+
+
+class RecentUpdateIds:
+    """Bounded set of the most recently processed update ids"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._ids = collections.OrderedDict()
+
+    def seen(self, update_id: int) -> bool:
+        """Record the id and report whether it had been recorded before"""
+        if update_id in self._ids:
+            self._ids.move_to_end(update_id)
+            return True
+        self._ids[update_id] = None
+        if len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+        return False
+
+
+recent_updates = RecentUpdateIds()
+
+
+async def drop_duplicate_updates(update: Update, context: CallbackContext) -> None:
+    """Stop redelivered updates before any handler runs; register in group -2"""
+    if recent_updates.seen(update.update_id):
+        DUPLICATE_UPDATES.inc()
+        logger.info(f"Dropping duplicate update {update.update_id}")
+        raise ApplicationHandlerStop
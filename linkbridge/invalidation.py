@@ -0,0 +1,114 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from linkbridge.metrics import CHANGE_LISTENER_UP, CHANGE_NOTIFICATIONS
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'linkbridge_profile_changes'
+
+# Tags this process's notifications; it has already applied its own writes locally
+ORIGIN = uuid.uuid4().hex
+
+
+def notify_profile_change(conn, event_type: str, telegram_user_id: Optional[int], community_id: int) -> None:
+    """Tell the other bot processes about a profile write; sent when conn's transaction commits"""
+    if conn.dialect.name != 'postgresql':
+        return
+    payload = json.dumps({
+        'origin': ORIGIN, 'event': event_type, 'user': telegram_user_id, 'community': community_id
+    })
+    conn.execute(text("SELECT pg_notify(:channel, :payload)"), {'channel': CHANNEL, 'payload': payload})
+
+
+class ChangeListener:
+    """LISTENs for profile changes made by other processes on a dedicated Postgres connection
+
+    on_change(event_type, telegram_user_id, community_id) runs on the event loop for every
+    change another process committed. Notifications sent while the connection was down
+    are lost, so on_reconnect() runs whenever listening (re)starts.
+    """
+
+    def __init__(self, engine, on_change: Callable[[str, Optional[int], Optional[int]], None],
+                 on_reconnect: Callable[[], None], retry_delay: float = 5):
+        self.engine = engine
+        self.on_change = on_change
+        self.on_reconnect = on_reconnect
+        self.retry_delay = retry_delay
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _connect(self):
+        """Blocking: a connection of its own, taken out of the pool for good"""
+        connection = self.engine.raw_connection()
+        connection.detach()
+        dbapi_connection = connection.dbapi_connection
+        dbapi_connection.autocommit = True
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return dbapi_connection
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            connection = None
+            try:
+                connection = await loop.run_in_executor(None, self._connect)
+                logger.info(f"Listening for profile changes on {CHANNEL}")
+                CHANGE_LISTENER_UP.set(1)
+                self.on_reconnect()
+                lost = loop.create_future()
+                loop.add_reader(connection.fileno(), self._receive, connection, lost)
+                try:
+                    await lost
+                finally:
+                    loop.remove_reader(connection.fileno())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Profile change listener disconnected, retrying in {self.retry_delay}s: {str(e)}")
+            finally:
+                CHANGE_LISTENER_UP.set(0)
+                if connection is not None:
+                    connection.close()
+            await asyncio.sleep(self.retry_delay)
+
+    def _receive(self, connection, lost: asyncio.Future) -> None:
+        try:
+            connection.poll()
+        except Exception as e:
+            if not lost.done():
+                lost.set_exception(e)
+            return
+        while connection.notifies:
+            self._dispatch(connection.notifies.pop(0).payload)
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed profile change notification: {payload[:100]}")
+            return
+        if change.get('origin') == ORIGIN:
+            return
+        CHANGE_NOTIFICATIONS.inc(event=change.get('event'))
+        try:
+            self.on_change(change.get('event'), change.get('user'), change.get('community'))
+        except Exception as e:
+            logger.error(f"Error applying profile change notification: {str(e)}", exc_info=True)
@@ -0,0 +1,187 @@
+import asyncio
+import contextlib
+import logging
+import signal
+from datetime import datetime
+from typing import List, Optional
+
+import telegram.error
+from sqlalchemy import select
+from telegram.ext import Application
+
+from linkbridge.database import dialect_insert
+from linkbridge.schema import bot_state_table
+
+logger = logging.getLogger(__name__)
+
+UPDATE_OFFSET_KEY = 'telegram_update_offset'
+
+MIN_STOP_TIMEOUT = 1.0
+
+
+class UpdateOffsetStore:
+    """Persists the id of the last update whose handlers have all returned"""
+
+    def __init__(self, engine, name: str = UPDATE_OFFSET_KEY):
+        self.engine = engine
+        self.name = name
+
+    def load(self) -> Optional[int]:
+        with self.engine.connect() as conn:
+            value = conn.execute(
+                select(bot_state_table.c.value).where(bot_state_table.c.name == self.name)
+            ).scalar()
+        return int(value) if value is not None else None
+
+    def save(self, update_id: int) -> None:
+        statement = dialect_insert(self.engine, bot_state_table).values(
+            name=self.name, value=str(update_id), updated_at=datetime.utcnow()
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[bot_state_table.c.name],
+            set_={'value': statement.excluded.value, 'updated_at': statement.excluded.updated_at}
+        )
+        with self.engine.begin() as conn:
+            conn.execute(statement)
+
+
+class UpdatePoller:
+    """Long-polls getUpdates and only confirms a batch once every update in it was handled
+
+    Telegram keeps everything after the last confirmed offset, so updates that were
+    fetched but not handled before a restart are delivered again, and the persisted
+    offset confirms handled ones that Telegram had not been told about yet.
+    """
+
+    def __init__(self, application: Application, store: UpdateOffsetStore,
+                 allowed_updates: Optional[List[str]] = None, timeout: int = 10, retry_delay: float = 5):
+        self.application = application
+        self.store = store
+        self.allowed_updates = allowed_updates
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        # Created here, so the poller must be built inside the running loop
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stop fetching; the batch being handled still completes"""
+        self._stopping.set()
+
+    async def wait_stopping(self) -> None:
+        await self._stopping.wait()
+
+    async def _sleep(self, seconds: float) -> None:
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        bot = self.application.bot
+        last_update_id = await loop.run_in_executor(None, self.store.load)
+        offset = last_update_id + 1 if last_update_id is not None else None
+        if offset:
+            logger.info(f"Resuming polling after update {last_update_id}")
+
+        # getUpdates is refused while a webhook is set; keep whatever is pending
+        with contextlib.suppress(telegram.error.TelegramError):
+            await bot.delete_webhook(drop_pending_updates=False)
+
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        try:
+            while not self._stopping.is_set():
+                fetch = asyncio.ensure_future(bot.get_updates(
+                    offset=offset, timeout=self.timeout, allowed_updates=self.allowed_updates
+                ))
+                await asyncio.wait({fetch, stopping}, return_when=asyncio.FIRST_COMPLETED)
+                if not fetch.done():
+                    # Nothing was confirmed by this request, so nothing is lost by abandoning it
+                    fetch.cancel()
+                    with contextlib.suppress(asyncio.CancelledError, telegram.error.TelegramError):
+                        await fetch
+                    break
+
+                try:
+                    updates = fetch.result()
+                except telegram.error.RetryAfter as e:
+                    await self._sleep(e.retry_after)
+                    continue
+                except telegram.error.Conflict as e:
+                    logger.error(f"Another instance is polling: {str(e)}")
+                    await self._sleep(self.retry_delay * 2)
+                    continue
+                except telegram.error.InvalidToken:
+                    raise
+                except telegram.error.TelegramError as e:
+                    logger.warning(f"Fetching updates failed, retrying in {self.retry_delay}s: {str(e)}")
+                    await self._sleep(self.retry_delay)
+                    continue
+
+                if not updates:
+                    continue
+                for update in updates:
+                    await self.application.update_queue.put(update)
+                # Handlers have returned for every update once the queue is joined
+                await self.application.update_queue.join()
+
+                offset = updates[-1].update_id + 1
+                try:
+                    await loop.run_in_executor(None, self.store.save, updates[-1].update_id)
+                except Exception as e:
+                    logger.error(f"Could not persist update offset {updates[-1].update_id}: {str(e)}")
+        finally:
+            stopping.cancel()
+
+
+async def run_until_signalled(application: Application, store: UpdateOffsetStore, drain_timeout: float,
+                              allowed_updates: Optional[List[str]] = None, poll_timeout: int = 10) -> None:
+    """Run the application until SIGTERM or SIGINT, then drain in-flight work
+
+    On a signal, intake stops at once; the batch being handled, running jobs and
+    tasks started with create_task get drain_timeout seconds to finish before the
+    application shuts down regardless.
+    """
+    loop = asyncio.get_running_loop()
+    poller = UpdatePoller(application, store, allowed_updates, poll_timeout)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, poller.stop)
+        except NotImplementedError:
+            # Windows event loops do not support signal handlers
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(poller.stop))
+
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+
+        polling = asyncio.ensure_future(poller.run())
+        stopping = asyncio.ensure_future(poller.wait_stopping())
+        try:
+            await asyncio.wait({polling, stopping}, return_when=asyncio.FIRST_COMPLETED)
+            if polling.done():
+                # The poller only returns on its own by raising
+                polling.result()
+            logger.info(f"Stop requested, draining in-flight work for up to {drain_timeout:.0f}s")
+        finally:
+            stopping.cancel()
+            deadline = loop.time() + drain_timeout
+            if not polling.done():
+                try:
+                    await asyncio.wait_for(polling, deadline - loop.time())
+                except asyncio.TimeoutError:
+                    logger.warning("Drain deadline reached while handling the last batch of updates")
+                except Exception as e:
+                    logger.error(f"Polling failed while draining: {str(e)}", exc_info=True)
+            try:
+                # stop() must get to run its first step, which marks the application as stopped
+                await asyncio.wait_for(application.stop(), max(deadline - loop.time(), MIN_STOP_TIMEOUT))
+                logger.info("Drained all in-flight work")
+            except asyncio.TimeoutError:
+                logger.warning("Drain deadline reached, abandoning unfinished jobs and tasks")
+            if application.post_stop:
+                await application.post_stop(application)
+    finally:
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from linkbridge.deadlines import remaining, run_in_executor
+
+logger = logging.getLogger(__name__)
+
+# After a failed login, wait this long before trying again so LinkedIn does not lock the account
+LOGIN_RETRY_INTERVAL = 15 * 60
+
+CHALLENGE_HELP = """
+LinkedIn requires additional verification. To fix this:
+1. Log in to LinkedIn in your browser with the same account
+2. Complete any security verification steps
+3. Make sure 2FA is disabled for this account
+4. Wait 15-30 minutes before trying again
+5. Consider using a different LinkedIn account
+Bot will continue without LinkedIn API features.
+"""
+
+
+class LinkedInClient:
+    """LinkedIn API session that logs in on first use, off the event loop
+
+    Importing linkedin_api and logging in both cost seconds, so neither happens
+    until a handler actually needs the API.
+    """
+
+    def __init__(self, username: Optional[str], password: Optional[str],
+                 max_retries: int = 3, retry_delay: float = 5):
+        self.username = username
+        self.password = password
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._api = None
+        self._failed_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.username and self.password)
+
+    def describe(self) -> str:
+        if not self.configured:
+            return 'Not configured'
+        if self._api is not None:
+            return 'Connected'
+        if self._failed_at is not None:
+            return 'Disconnected'
+        return 'Not logged in yet'
+
+    def _login(self):
+        """Blocking login with exponential backoff"""
+        from linkedin_api import Linkedin
+
+        logger.info("Initializing LinkedIn API...")
+        retry_delay = self.retry_delay
+        for attempt in range(self.max_retries):
+            try:
+                api = Linkedin(self.username, self.password)
+                logger.info("LinkedIn API initialized successfully")
+                return api
+            except Exception:
+                if attempt == self.max_retries - 1:
+                    raise
+                logger.warning(f"LinkedIn API initialization attempt {attempt + 1} failed, retrying in {retry_delay}s")
+                time.sleep(retry_delay)
+                retry_delay *= 2  # Exponential backoff
+
+    async def get(self):
+        """The logged-in API, or None when it is not configured or the login failed recently"""
+        if self._api is not None or not self.configured:
+            return self._api
+        if self._failed_at is not None and time.monotonic() - self._failed_at < LOGIN_RETRY_INTERVAL:
+            return None
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._api is None:
+                try:
+                    self._api = await asyncio.get_running_loop().run_in_executor(None, self._login)
+                    self._failed_at = None
+                except Exception as e:
+                    self._failed_at = time.monotonic()
+                    if "CHALLENGE" in str(e):
+                        logger.warning(CHALLENGE_HELP)
+                    else:
+                        logger.error(f"LinkedIn API initialization failed: {str(e)}", exc_info=True)
+        return self._api
+
+    async def call(self, method: Callable[..., Any], *args, max_retries: int = 3, **kwargs) -> Optional[Any]:
+        """Run a blocking API method in an executor, retrying with exponential backoff
+
+        Inside a handler, no retry is scheduled past the handler's deadline, and the
+        method runs with that deadline in its context.
+        """
+        for attempt in range(max_retries):
+            try:
+                return await run_in_executor(lambda: method(*args, **kwargs))
+            except Exception as e:
+                wait_time = (2 ** attempt) * 1  # Exponential backoff: 1, 2, 4 seconds
+                left = remaining()
+                # Last attempt, or no time left for another
+                if attempt == max_retries - 1 or (left is not None and left <= wait_time):
+                    raise
+                logger.warning(f"LinkedIn API call failed, retrying in {wait_time}s: {str(e)}")
+                await asyncio.sleep(wait_time)
@@ -0,0 +1,435 @@
+import asyncio
+import bisect
+import functools
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from telegram.request import HTTPXRequest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    """Render a Prometheus label set"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for labelled metrics"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(self._values.values())
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(self._values.values())
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Bucketed latency histogram"""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # Per label set: [bucket counts..., sum, count]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def _merged(self, key: Optional[LabelKey] = None) -> List[float]:
+        """Bucket counts, sum and count for one label set or all of them"""
+        with self._lock:
+            if key is not None:
+                return list(self._values.get(key, [0] * (len(self.buckets) + 2)))
+            merged = [0] * (len(self.buckets) + 2)
+            for state in self._values.values():
+                for i, value in enumerate(state):
+                    merged[i] += value
+            return merged
+
+    def count(self, **labels: Any) -> int:
+        key = self._key(labels) if labels else None
+        return int(self._merged(key)[-1])
+
+    def mean(self, **labels: Any) -> Optional[float]:
+        key = self._key(labels) if labels else None
+        state = self._merged(key)
+        return state[-2] / state[-1] if state[-1] else None
+
+    def quantile(self, q: float, **labels: Any) -> Optional[float]:
+        """Estimate a quantile by linear interpolation inside the matching bucket"""
+        key = self._key(labels) if labels else None
+        state = self._merged(key)
+        total = state[-1]
+        if not total:
+            return None
+        rank = q * total
+        cumulative = 0
+        lower = 0.0
+        for bound, bucket_count in zip(self.buckets, state):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if bound == float('inf'):
+                    return lower
+                return lower + (bound - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            if bound != float('inf'):
+                lower = bound
+        return lower
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, state):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {_format_value(cumulative)}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(state[-2])}"
+            yield f"{self.name}_count{labels} {_format_value(state[-1])}"
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in the text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self.started_at = time.time()
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+HANDLER_LATENCY = REGISTRY.histogram(
+    'bot_handler_duration_seconds', 'Time spent processing an update per handler', ('handler',)
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    'bot_handler_errors_total', 'Exceptions raised by handlers', ('handler', 'exception')
+)
+HANDLER_IN_FLIGHT = REGISTRY.gauge(
+    'bot_handlers_in_flight', 'Updates currently being processed per handler', ('handler',)
+)
+TELEGRAM_API_LATENCY = REGISTRY.histogram(
+    'telegram_api_request_duration_seconds', 'Latency of Telegram Bot API requests', ('method',)
+)
+TELEGRAM_API_ERRORS = REGISTRY.counter(
+    'telegram_api_errors_total', 'Failed Telegram Bot API requests', ('method', 'exception')
+)
+TELEGRAM_API_IN_FLIGHT = REGISTRY.gauge(
+    'telegram_api_requests_in_flight', 'Telegram Bot API requests currently in flight'
+)
+TELEGRAM_POOL_WAIT = REGISTRY.histogram(
+    'telegram_pool_wait_seconds', 'Time Bot API requests waited for a free connection', ('pool',)
+)
+TELEGRAM_POOL_TIMEOUTS = REGISTRY.counter(
+    'telegram_pool_timeouts_total', 'Bot API requests abandoned because no connection became free', ('pool',)
+)
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    'db_query_duration_seconds', 'Latency of database statements', ('operation',)
+)
+DB_ERRORS = REGISTRY.counter(
+    'db_errors_total', 'Failed database statements', ('exception',)
+)
+DB_IN_FLIGHT = REGISTRY.gauge(
+    'db_queries_in_flight', 'Database statements currently executing'
+)
+DB_PROBE_LATENCY = REGISTRY.gauge(
+    'db_probe_latency_seconds', 'Round-trip time of the last database health probe', ('target',)
+)
+DB_UP = REGISTRY.gauge(
+    'db_up', 'Whether the last database health probe succeeded', ('target',)
+)
+DB_POOL_CHECKED_OUT = REGISTRY.gauge(
+    'db_pool_checked_out_connections', 'Connections checked out of the pool at the last probe', ('target',)
+)
+DUPLICATE_UPDATES = REGISTRY.counter(
+    'bot_duplicate_updates_total', 'Redelivered updates dropped before reaching a handler'
+)
+SUGGEST_INDEX_PROFILES = REGISTRY.gauge(
+    'suggest_index_profiles', 'Profiles held in the similarity index'
+)
+RATE_LIMIT_REJECTIONS = REGISTRY.counter(
+    'bot_rate_limit_rejections_total', 'Messages rejected by the per-user rate limit'
+)
+BROADCAST_QUEUE_DEPTH = REGISTRY.gauge(
+    'bot_broadcast_queue_depth', 'Notifications still waiting to be sent by running broadcasts'
+)
+BROADCAST_DELIVERIES = REGISTRY.counter(
+    'bot_broadcast_deliveries_total', 'Broadcast sends by outcome: delivered, failed or unreachable', ('outcome',)
+)
+EVENT_LOOP_LAG = REGISTRY.gauge(
+    'bot_event_loop_lag_seconds', 'How late the overload controller\'s last sampling timer fired'
+)
+OVERLOAD_LEVEL = REGISTRY.gauge(
+    'bot_overload_level', 'Load shedding level: 0 normal, 1 degraded, 2 overloaded'
+)
+LOAD_SHED = REGISTRY.counter(
+    'bot_load_shed_total', 'Work skipped, reduced or postponed because of overload', ('action',)
+)
+EVENT_LOOP_STALLS = REGISTRY.counter(
+    'bot_event_loop_stalls_total', 'Callbacks that blocked the event loop beyond the stall threshold'
+)
+HANDLER_TIMEOUTS = REGISTRY.counter(
+    'bot_handler_timeouts_total', 'Handlers cancelled for exceeding their deadline', ('handler',)
+)
+PROFILE_EVENTS_WRITTEN = REGISTRY.counter(
+    'bot_profile_events_written_total', 'Profile events appended to the event log', ('event_type',)
+)
+CHANGE_NOTIFICATIONS = REGISTRY.counter(
+    'bot_change_notifications_total', 'Profile changes made by other bot processes and applied here', ('event',)
+)
+CHANGE_LISTENER_UP = REGISTRY.gauge(
+    'bot_change_listener_up', 'Whether this process is listening for other processes\' profile changes'
+)
+QUERY_CACHE_REQUESTS = REGISTRY.counter(
+    'bot_query_cache_requests_total', 'Query result cache lookups by query and result: hit or miss',
+    ('namespace', 'result')
+)
+QUERY_CACHE_ENTRIES = REGISTRY.gauge(
+    'bot_query_cache_entries', 'Results held in the query result cache, including stale ones not yet evicted'
+)
+OUTBOUND_QUEUE_WAIT = REGISTRY.histogram(
+    'bot_outbound_queue_wait_seconds', 'Time Bot API requests waited for the shared send budget, by priority class',
+    ('priority',), buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+OUTBOUND_QUEUED = REGISTRY.gauge(
+    'bot_outbound_queued', 'Bot API requests waiting for the shared send budget, by priority class', ('priority',)
+)
+OUTBOUND_FLOOD_WAITS = REGISTRY.counter(
+    'bot_outbound_flood_waits_total', 'RetryAfter responses that paused all outbound requests', ('priority',)
+)
+TRAFFIC_RECORDED = REGISTRY.counter(
+    'bot_traffic_updates_recorded_total', 'Incoming updates captured for replay while TRAFFIC_RECORD_FILE is set'
+)
+PROFILES_ARCHIVED = REGISTRY.counter(
+    'bot_profiles_archived_total', 'Profiles moved to the archive, by reason: inactive or unreachable', ('reason',)
+)
+PROFILES_RESTORED = REGISTRY.counter(
+    'bot_profiles_restored_total', 'Archived profiles moved back because their owner returned'
+)
+PROFILES_STORED = REGISTRY.gauge(
+    'bot_profiles_stored', 'Profiles in user_linkedin (hot) and in the archive after the last archive run', ('tier',)
+)
+
+
+def instrument_handler(callback: Callable, name: Optional[str] = None) -> Callable:
+    """Wrap a handler callback to record latency, errors and in-flight count"""
+    handler_name = name or callback.__name__
+
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        HANDLER_IN_FLIGHT.inc(handler=handler_name)
+        start_time = time.perf_counter()
+        try:
+            return await callback(update, context)
+        except Exception as e:
+            HANDLER_ERRORS.inc(handler=handler_name, exception=type(e).__name__)
+            raise
+        finally:
+            HANDLER_LATENCY.observe(time.perf_counter() - start_time, handler=handler_name)
+            HANDLER_IN_FLIGHT.dec(handler=handler_name)
+
+    return wrapper
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """HTTPXRequest that records per-method Bot API latency and errors"""
+
+    async def do_request(self, url: str, method: str, *args, **kwargs) -> Tuple[int, bytes]:
+        api_method = url.rsplit('/', 1)[-1]
+        TELEGRAM_API_IN_FLIGHT.inc()
+        start_time = time.perf_counter()
+        try:
+            return await super().do_request(url, method, *args, **kwargs)
+        except Exception as e:
+            TELEGRAM_API_ERRORS.inc(method=api_method, exception=type(e).__name__)
+            raise
+        finally:
+            TELEGRAM_API_LATENCY.observe(time.perf_counter() - start_time, method=api_method)
+            TELEGRAM_API_IN_FLIGHT.dec()
+
+
+def instrument_engine(engine) -> None:
+    """Attach statement timing and error counting to a SQLAlchemy engine"""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+        DB_IN_FLIGHT.inc()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start_time = conn.info['query_start_time'].pop()
+        operation = statement.split(None, 1)[0].upper() if statement else 'UNKNOWN'
+        DB_QUERY_LATENCY.observe(time.perf_counter() - start_time, operation=operation)
+        DB_IN_FLIGHT.dec()
+
+    @event.listens_for(engine, 'handle_error')
+    def _handle_error(exception_context):
+        DB_ERRORS.inc(exception=type(exception_context.original_exception).__name__)
+        starts = exception_context.connection.info.get('query_start_time') if exception_context.connection else None
+        if starts:
+            starts.pop()
+            DB_IN_FLIGHT.dec()
+
+
+async def start_metrics_server(host: str, port: int):
+    """Serve the registry at /metrics; returns the runner to clean up on shutdown"""
+    # aiohttp is only needed here; import it in a thread rather than blocking the event loop
+    web = await asyncio.get_running_loop().run_in_executor(None, importlib.import_module, 'aiohttp.web')
+
+    async def metrics_view(request):
+        return web.Response(
+            text=REGISTRY.render(),
+            content_type='text/plain',
+            headers={'X-Content-Type-Options': 'nosniff'}
+        )
+
+    app = web.Application()
+    app.router.add_get('/metrics', metrics_view)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+    return runner
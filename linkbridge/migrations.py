@@ -0,0 +1,281 @@
+import logging
+from collections import namedtuple
+from datetime import datetime
+from typing import Callable, List
+
+from sqlalchemy import BigInteger, inspect, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex
+
+from linkbridge.schema import (
+    bot_state_table, daily_rollups_table, daily_value_deltas_table, event_consumers_table, linkedin_table,
+    profile_archive_table, profile_events_table, schema_migrations_table
+)
+from linkbridge.urls import canonical_slug
+
+logger = logging.getLogger(__name__)
+
+# Each migration is applied at most once, in version order, and never drops data
+Migration = namedtuple('Migration', ['version', 'description', 'apply'])
+
+MIGRATION_LOCK_ID = 724_301_117
+
+# Columns /search matches with lower(column) LIKE '%term%'
+SEARCH_COLUMNS = ('full_name', 'headline', 'current_company', 'location')
+
+
+def _column_names(conn, table_name: str) -> set:
+    return {column['name'] for column in inspect(conn).get_columns(table_name)}
+
+
+def _create_profile_table(conn) -> None:
+    linkedin_table.create(conn, checkfirst=True)
+
+
+def _create_bot_state_table(conn) -> None:
+    bot_state_table.create(conn, checkfirst=True)
+
+
+def _create_event_log_tables(conn) -> None:
+    profile_events_table.create(conn, checkfirst=True)
+    event_consumers_table.create(conn, checkfirst=True)
+
+
+def _create_rollup_tables(conn) -> None:
+    daily_rollups_table.create(conn, checkfirst=True)
+    daily_value_deltas_table.create(conn, checkfirst=True)
+
+
+def _add_profile_picture_url(conn) -> None:
+    if 'profile_picture_url' not in _column_names(conn, 'user_linkedin'):
+        conn.execute(text("ALTER TABLE user_linkedin ADD COLUMN profile_picture_url VARCHAR"))
+
+
+def _widen_telegram_user_id(conn) -> None:
+    """Telegram ids no longer fit in 32 bits; SQLite integers are already 64-bit"""
+    if conn.dialect.name != 'postgresql':
+        return
+    column = next(c for c in inspect(conn).get_columns('user_linkedin') if c['name'] == 'telegram_user_id')
+    if not isinstance(column['type'], BigInteger):
+        conn.execute(text("ALTER TABLE user_linkedin ALTER COLUMN telegram_user_id TYPE BIGINT"))
+
+
+def _check_unique_telegram_user_id(conn) -> None:
+    duplicates = conn.execute(text(
+        "SELECT telegram_user_id FROM user_linkedin "
+        "GROUP BY telegram_user_id HAVING count(*) > 1 LIMIT 10"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "Cannot add a unique index on telegram_user_id, these users have several profiles: "
+            f"{', '.join(map(str, duplicates))}. Remove the extra rows and run the migrations again."
+        )
+
+
+def _drop_invalid_index(conn, name: str) -> None:
+    """An interrupted CREATE INDEX CONCURRENTLY leaves an invalid index behind (PostgreSQL only)"""
+    invalid = conn.execute(text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {'name': name}).first()
+    if invalid:
+        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+
+def _create_index(index) -> Callable:
+    def apply(conn) -> None:
+        if conn.dialect.name == 'postgresql':
+            _drop_invalid_index(conn, index.name)
+        if index.unique and 'telegram_user_id' in index.columns:
+            _check_unique_telegram_user_id(conn)
+        conn.execute(CreateIndex(index, if_not_exists=True))
+    return apply
+
+
+def _superseded(conn) -> None:
+    """Replaced by a later migration; kept so that version numbers stay stable"""
+
+
+def _create_trigram_indexes(conn) -> None:
+    """Replace the lower() btree indexes, which cannot serve LIKE '%term%', with pg_trgm GIN indexes
+
+    SQLite searches through FTS5 and only loses the unused btree indexes.
+    """
+    is_postgres = conn.dialect.name == 'postgresql'
+    concurrently = 'CONCURRENTLY ' if is_postgres else ''
+    for column in SEARCH_COLUMNS:
+        conn.execute(text(f'DROP INDEX {concurrently}IF EXISTS "ix_user_linkedin_lower_{column}"'))
+    if not is_postgres:
+        return
+    try:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except DBAPIError as e:
+        raise RuntimeError(
+            "Cannot create the pg_trgm extension that /search indexes need. Have a superuser or the "
+            "database owner run CREATE EXTENSION pg_trgm, then run the migrations again."
+        ) from e
+    for column in SEARCH_COLUMNS:
+        name = f'ix_user_linkedin_{column}_trgm'
+        _drop_invalid_index(conn, name)
+        conn.execute(text(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+            f'ON user_linkedin USING gin (lower({column}) gin_trgm_ops)'
+        ))
+
+
+def _create_sqlite_search_index(conn) -> None:
+    """FTS5 index over the searchable columns, kept in sync by triggers (SQLite only)"""
+    if conn.dialect.name != 'sqlite':
+        return
+    columns = 'full_name, headline, current_company, location'
+    new_values = ', '.join(f'new.{column}' for column in columns.split(', '))
+    old_values = ', '.join(f'old.{column}' for column in columns.split(', '))
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS user_linkedin_fts USING fts5("
+        f"{columns}, content='user_linkedin', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS user_linkedin_fts_insert AFTER INSERT ON user_linkedin BEGIN "
+        f"INSERT INTO user_linkedin_fts (rowid, {columns}) VALUES (new.id, {new_values}); END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS user_linkedin_fts_delete AFTER DELETE ON user_linkedin BEGIN "
+        f"INSERT INTO user_linkedin_fts (user_linkedin_fts, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values}); END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS user_linkedin_fts_update AFTER UPDATE ON user_linkedin BEGIN "
+        f"INSERT INTO user_linkedin_fts (user_linkedin_fts, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO user_linkedin_fts (rowid, {columns}) VALUES (new.id, {new_values}); END"
+    ))
+    conn.execute(text("INSERT INTO user_linkedin_fts (user_linkedin_fts) VALUES ('rebuild')"))
+
+
+def _add_linkedin_slug(conn) -> None:
+    """Add and backfill the canonical slug; later variants of an already seen slug stay NULL"""
+    if 'linkedin_slug' not in _column_names(conn, 'user_linkedin'):
+        conn.execute(text("ALTER TABLE user_linkedin ADD COLUMN linkedin_slug VARCHAR"))
+
+    seen = set(conn.execute(text(
+        "SELECT linkedin_slug FROM user_linkedin WHERE linkedin_slug IS NOT NULL"
+    )).scalars())
+    rows = conn.execute(text(
+        "SELECT id, linkedin_url FROM user_linkedin WHERE linkedin_slug IS NULL ORDER BY id"
+    )).fetchall()
+    updates = []
+    for row_id, url in rows:
+        slug = canonical_slug(url)
+        if not slug:
+            continue
+        if slug in seen:
+            logger.warning(f"Profile {row_id} duplicates slug '{slug}' and is left without one")
+            continue
+        seen.add(slug)
+        updates.append({'id': row_id, 'slug': slug})
+    if updates:
+        conn.execute(text("UPDATE user_linkedin SET linkedin_slug = :slug WHERE id = :id"), updates)
+
+
+def _add_community_id(conn) -> None:
+    """Existing profiles join the default community 0"""
+    if 'community_id' not in _column_names(conn, 'user_linkedin'):
+        conn.execute(text("ALTER TABLE user_linkedin ADD COLUMN community_id BIGINT NOT NULL DEFAULT 0"))
+
+
+def _add_delivery_tracking(conn) -> None:
+    columns = _column_names(conn, 'user_linkedin')
+    if 'unreachable_since' not in columns:
+        timestamp = 'TIMESTAMP' if conn.dialect.name == 'postgresql' else 'DATETIME'
+        conn.execute(text(f"ALTER TABLE user_linkedin ADD COLUMN unreachable_since {timestamp}"))
+    if 'delivery_failures' not in columns:
+        conn.execute(text("ALTER TABLE user_linkedin ADD COLUMN delivery_failures INTEGER NOT NULL DEFAULT 0"))
+
+
+def _add_profile_archive(conn) -> None:
+    """Activity was not tracked before, so every existing profile counts as seen when this runs"""
+    if 'last_seen_at' not in _column_names(conn, 'user_linkedin'):
+        timestamp = 'TIMESTAMP' if conn.dialect.name == 'postgresql' else 'DATETIME'
+        conn.execute(text(f"ALTER TABLE user_linkedin ADD COLUMN last_seen_at {timestamp}"))
+    conn.execute(
+        text("UPDATE user_linkedin SET last_seen_at = :now WHERE last_seen_at IS NULL"), {'now': datetime.utcnow()}
+    )
+    profile_archive_table.create(conn, checkfirst=True)
+
+
+def _index(name: str):
+    return next(index for index in linkedin_table.indexes if index.name == name)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'create user_linkedin', _create_profile_table),
+    Migration(2, 'add user_linkedin.profile_picture_url', _add_profile_picture_url),
+    Migration(3, 'widen user_linkedin.telegram_user_id to BIGINT', _widen_telegram_user_id),
+    Migration(4, 'unique index on telegram_user_id',
+              _create_index(_index('ix_user_linkedin_telegram_user_id'))),
+    Migration(5, 'index on (created_at, id)',
+              _create_index(_index('ix_user_linkedin_created_at_id'))),
+    Migration(6, 'index on lower(full_name), superseded by 23', _superseded),
+    Migration(7, 'index on lower(headline), superseded by 23', _superseded),
+    Migration(8, 'index on lower(current_company), superseded by 23', _superseded),
+    Migration(9, 'index on lower(location), superseded by 23', _superseded),
+    Migration(10, 'full-text search index (SQLite)', _create_sqlite_search_index),
+    Migration(11, 'add and backfill user_linkedin.linkedin_slug', _add_linkedin_slug),
+    Migration(12, 'unique index on linkedin_slug',
+              _create_index(_index('ix_user_linkedin_linkedin_slug'))),
+    Migration(13, 'add user_linkedin.community_id', _add_community_id),
+    Migration(14, 'index on (community_id, created_at, id)',
+              _create_index(_index('ix_user_linkedin_community_created_at_id'))),
+    Migration(15, 'index on (community_id, telegram_user_id)',
+              _create_index(_index('ix_user_linkedin_community_telegram_user_id'))),
+    Migration(16, 'index on (community_id, current_company)',
+              _create_index(_index('ix_user_linkedin_community_current_company'))),
+    Migration(17, 'index on (community_id, location)',
+              _create_index(_index('ix_user_linkedin_community_location'))),
+    Migration(18, 'create bot_state', _create_bot_state_table),
+    Migration(19, 'add user_linkedin.unreachable_since and delivery_failures', _add_delivery_tracking),
+    Migration(20, 'create profile_events and event_consumers', _create_event_log_tables),
+    Migration(21, 'create daily_rollups and daily_value_deltas', _create_rollup_tables),
+    Migration(22, 'add user_linkedin.last_seen_at and create user_linkedin_archive', _add_profile_archive),
+    Migration(23, 'trigram search indexes (PostgreSQL), drop the lower() indexes', _create_trigram_indexes),
+]
+
+
+def pending_migrations(engine) -> List[Migration]:
+    """Migrations that have not been applied to the database yet"""
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(schema_migrations_table.name):
+            return list(MIGRATIONS)
+        applied = set(conn.execute(select(schema_migrations_table.c.version)).scalars())
+    return [migration for migration in MIGRATIONS if migration.version not in applied]
+
+
+def run_migrations(engine) -> List[int]:
+    """Apply pending migrations and return the versions that were applied"""
+    # Autocommit so every DDL statement, including CREATE INDEX CONCURRENTLY, runs on its own
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        is_postgres = conn.dialect.name == 'postgresql'
+        if is_postgres:
+            # Keep several processes starting at once from migrating concurrently
+            conn.execute(text("SELECT pg_advisory_lock(:id)"), {'id': MIGRATION_LOCK_ID})
+        try:
+            schema_migrations_table.create(conn, checkfirst=True)
+            applied = set(conn.execute(select(schema_migrations_table.c.version)).scalars())
+            done = []
+            for migration in MIGRATIONS:
+                if migration.version in applied:
+                    continue
+                logger.info(f"Applying migration {migration.version}: {migration.description}")
+                migration.apply(conn)
+                conn.execute(schema_migrations_table.insert(), {
+                    'version': migration.version,
+                    'description': migration.description,
+                    'applied_at': datetime.utcnow()
+                })
+                done.append(migration.version)
+            if done:
+                logger.info(f"Applied {len(done)} migration(s), schema is at version {MIGRATIONS[-1].version}")
+            return done
+        finally:
+            if is_postgres:
+                conn.execute(text("SELECT pg_advisory_unlock(:id)"), {'id': MIGRATION_LOCK_ID})
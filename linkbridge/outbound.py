@@ -0,0 +1,171 @@
+import asyncio
+import collections
+import contextlib
+import contextvars
+import logging
+import time
+from typing import Any, Callable, Coroutine, Deque, Dict, Optional, Sequence
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from linkbridge.deadlines import remaining
+from linkbridge.metrics import OUTBOUND_FLOOD_WAITS, OUTBOUND_QUEUE_WAIT, OUTBOUND_QUEUED
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+TRANSACTIONAL = 'transactional'
+BULK = 'bulk'
+PRIORITY_CLASSES = (INTERACTIVE, TRANSACTIONAL, BULK)
+
+# Priority class of the Bot API requests made in the current context; tasks inherit it
+_priority: contextvars.ContextVar = contextvars.ContextVar('outbound_priority', default=None)
+
+
+@contextlib.contextmanager
+def priority(name: str):
+    """Send the requests made inside, and by tasks created inside, with the given priority class"""
+    if name not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown priority class {name!r}, expected one of {PRIORITY_CLASSES}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority(endpoint: str) -> str:
+    """The explicit class, else interactive within a handler's deadline and transactional elsewhere"""
+    explicit = _priority.get()
+    if explicit is not None:
+        return explicit
+    if endpoint == 'answerCallbackQuery' or remaining() is not None:
+        return INTERACTIVE
+    return TRANSACTIONAL
+
+
+class OutboundScheduler(BaseRateLimiter):
+    """Rate limiter sharing the bot's send budget between priority classes
+
+    Requests take tokens from one bucket refilled at `rate` per second and holding
+    `burst` at most. While tokens last they go straight through; once requests queue,
+    each class waits in its own FIFO and a dispatcher hands out tokens by smooth
+    weighted round-robin among the classes with waiting requests, so interactive
+    replies overtake a broadcast without starving it. A RetryAfter from Telegram
+    pauses the whole budget for the time it asks, and the request is queued again up
+    to max_retries times. rate_limit_args={'priority': ...} overrides the class.
+    """
+
+    def __init__(self, rate: float = 30, weights: Sequence[int] = (8, 3, 1), max_retries: int = 1,
+                 burst: Optional[float] = None):
+        if len(weights) != len(PRIORITY_CLASSES):
+            raise ValueError(f"Expected {len(PRIORITY_CLASSES)} weights, got {len(weights)}")
+        self.rate = rate
+        # A tenth of a second's worth by default, so no second ever sees much more than `rate` requests
+        self.capacity = burst if burst is not None else max(rate / 10, 1.0)
+        self.weights = dict(zip(PRIORITY_CLASSES, weights))
+        self.max_retries = max_retries
+        self._tokens = self.capacity
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {name: collections.deque() for name in PRIORITY_CLASSES}
+        self._credit = {name: 0 for name in PRIORITY_CLASSES}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def initialize(self) -> None:
+        # Created here so they belong to the loop the application runs on
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def shutdown(self) -> None:
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        for name, queue in self._queues.items():
+            while queue:
+                queue.popleft().cancel()
+            OUTBOUND_QUEUED.set(0, priority=name)
+
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _delay(self) -> float:
+        """Seconds until a token is available, refilling the bucket on the way"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if now < self._paused_until:
+            return self._paused_until - now
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def _next_class(self) -> str:
+        """Smooth weighted round-robin over the classes that have requests waiting"""
+        waiting = [name for name in PRIORITY_CLASSES if self._queues[name]]
+        for name in waiting:
+            self._credit[name] += self.weights[name]
+        chosen = max(waiting, key=lambda name: self._credit[name])
+        self._credit[chosen] -= sum(self.weights[name] for name in waiting)
+        return chosen
+
+    async def _dispatch(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self.queued():
+                delay = self._delay()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                name = self._next_class()
+                waiter = self._queues[name].popleft()
+                OUTBOUND_QUEUED.dec(priority=name)
+                if waiter.done():
+                    # Its request was cancelled while waiting, e.g. by the handler deadline
+                    continue
+                self._tokens -= 1
+                waiter.set_result(None)
+            # Classes idle since the last backlog start even
+            self._credit = dict.fromkeys(PRIORITY_CLASSES, 0)
+
+    async def _acquire(self, name: str) -> None:
+        start = time.perf_counter()
+        if not self.queued() and self._delay() == 0:
+            self._tokens -= 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._queues[name].append(waiter)
+            OUTBOUND_QUEUED.inc(priority=name)
+            self._wakeup.set()
+            await waiter
+        OUTBOUND_QUEUE_WAIT.observe(time.perf_counter() - start, priority=name)
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[Dict[str, Any]],
+    ) -> Any:
+        name = (rate_limit_args or {}).get('priority') or current_priority(endpoint)
+        if name not in self.weights:
+            raise ValueError(f"Unknown priority class {name!r}, expected one of {PRIORITY_CLASSES}")
+        if self._dispatcher is None:
+            raise RuntimeError("The outbound scheduler is not initialized!")
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(name)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                OUTBOUND_FLOOD_WAITS.inc(priority=name)
+                self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Telegram flood control on {endpoint}, pausing all sends for {e.retry_after}s")
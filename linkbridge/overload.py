@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from typing import Callable, Optional, Tuple
+
+from linkbridge.metrics import EVENT_LOOP_LAG, OVERLOAD_LEVEL
+
+logger = logging.getLogger(__name__)
+
+NORMAL, DEGRADED, OVERLOADED = 0, 1, 2
+LEVEL_NAMES = {NORMAL: 'normal', DEGRADED: 'degraded', OVERLOADED: 'overloaded'}
+
+LAG_SMOOTHING = 0.3
+
+
+class OverloadController:
+    """Picks a load level from the update backlog and event-loop lag
+
+    Escalation is immediate; stepping down one level takes recovery_samples
+    consecutive calmer samples so the bot does not flap around a threshold.
+    """
+
+    def __init__(self, backlog_thresholds: Tuple[int, int] = (20, 60),
+                 lag_thresholds: Tuple[float, float] = (0.1, 0.5),
+                 interval: float = 0.5, recovery_samples: int = 10):
+        self.backlog_thresholds = backlog_thresholds
+        self.lag_thresholds = lag_thresholds
+        self.interval = interval
+        self.recovery_samples = recovery_samples
+        self.level = NORMAL
+        self.backlog = 0
+        self.lag = 0.0
+        self._calm_samples = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def degraded(self) -> bool:
+        return self.level >= DEGRADED
+
+    @property
+    def overloaded(self) -> bool:
+        return self.level >= OVERLOADED
+
+    def describe(self) -> str:
+        return LEVEL_NAMES[self.level]
+
+    @staticmethod
+    def _level_for(value: float, thresholds) -> int:
+        return sum(1 for threshold in thresholds if value >= threshold)
+
+    def observe(self, backlog: int, lag: float) -> int:
+        """Feed one sample and return the resulting level"""
+        self.backlog = backlog
+        self.lag = lag
+        target = max(self._level_for(backlog, self.backlog_thresholds), self._level_for(lag, self.lag_thresholds))
+        if target > self.level:
+            self._set_level(target)
+        elif target < self.level:
+            self._calm_samples += 1
+            if self._calm_samples >= self.recovery_samples:
+                self._set_level(self.level - 1)
+        else:
+            self._calm_samples = 0
+        return self.level
+
+    def _set_level(self, level: int) -> None:
+        logger.warning(
+            f"Load level {LEVEL_NAMES[self.level]} -> {LEVEL_NAMES[level]} "
+            f"(backlog {self.backlog}, loop lag {self.lag * 1000:.0f} ms)"
+        )
+        self.level = level
+        self._calm_samples = 0
+        OVERLOAD_LEVEL.set(level)
+
+    def start(self, backlog: Callable[[], int]) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._sample(backlog))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _sample(self, backlog: Callable[[], int]) -> None:
+        loop = asyncio.get_running_loop()
+        smoothed = 0.0
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            # A busy loop runs the wake-up late; the delay is the lag every callback sees
+            lag = max(loop.time() - scheduled, 0.0)
+            EVENT_LOOP_LAG.set(lag)
+            # Smooth out one-off spikes such as a garbage collection pause
+            smoothed = LAG_SMOOTHING * lag + (1 - LAG_SMOOTHING) * smoothed
+            self.observe(backlog(), smoothed)
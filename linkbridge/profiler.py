@@ -0,0 +1,160 @@
+import asyncio
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Counter, List, Optional, Tuple
+
+from linkbridge.metrics import EVENT_LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+Stack = Tuple[str, ...]
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _stack_of(frame) -> Stack:
+    """Frames of a stack from the outermost caller to the innermost one"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return tuple(labels)
+
+
+class SamplingProfiler:
+    """Statistical profiler that periodically snapshots every thread's stack"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: Counter[Stack] = collections.Counter()
+        self.sample_count = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        self.stopped_at = time.monotonic()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = (f"thread {names.get(thread_id, thread_id)}",) + _stack_of(frame)
+                self.samples[stack] += 1
+            self.sample_count += 1
+
+    def top_functions(self, limit: int = 15) -> List[Tuple[str, int, int]]:
+        """(function, self samples, total samples) ordered by self samples"""
+        own: Counter[str] = collections.Counter()
+        total: Counter[str] = collections.Counter()
+        for stack, count in self.samples.items():
+            own[stack[-1]] += count
+            for label in set(stack[1:]):
+                total[label] += count
+        return [(label, count, total[label]) for label, count in own.most_common(limit)]
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format consumed by flamegraph.pl and speedscope"""
+        lines = [
+            ';'.join(label.replace(';', ':') for label in stack) + f" {count}"
+            for stack, count in sorted(self.samples.items())
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def report(self, limit: int = 15) -> str:
+        duration = (self.stopped_at or time.monotonic()) - (self.started_at or time.monotonic())
+        lines = [f"Profiled {duration:.1f}s, {self.sample_count} samples every {self.interval * 1000:.0f} ms", ""]
+        lines.append(f"{'self':>6} {'total':>6}  function")
+        for label, own, total in self.top_functions(limit):
+            lines.append(f"{own:>6} {total:>6}  {label}")
+        return '\n'.join(lines)
+
+
+async def profile_for(seconds: float, interval: float = 0.01) -> SamplingProfiler:
+    """Sample all threads for the given number of seconds"""
+    profiler = SamplingProfiler(interval)
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+    return profiler
+
+
+class LoopStallMonitor:
+    """Watchdog that logs the event loop's stack whenever a callback blocks it too long"""
+
+    def __init__(self, threshold: float = 0.25):
+        self.threshold = threshold
+        self.stall_count = 0
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._reported_beat: Optional[float] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._stop_event = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._heartbeat_task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-stall-monitor', daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop_event.set()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog:
+            self._watchdog.join()
+
+    async def _heartbeat(self) -> None:
+        interval = self.threshold / 2
+        while True:
+            beat = time.monotonic()
+            if self._reported_beat is not None and self._reported_beat == self._last_beat:
+                logger.warning(f"Event loop unblocked after {beat - self._last_beat:.3f}s")
+            self._last_beat = beat
+            await asyncio.sleep(interval)
+
+    def _watch(self) -> None:
+        interval = self.threshold / 2
+        while not self._stop_event.wait(interval):
+            last_beat = self._last_beat
+            blocked_for = time.monotonic() - last_beat
+            # The heartbeat sleeps for threshold/2, so anything beyond a full threshold is a stall
+            if blocked_for < self.threshold + interval or self._reported_beat == last_beat:
+                continue
+            self._reported_beat = last_beat
+            self.stall_count += 1
+            EVENT_LOOP_STALLS.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame else 'unavailable'
+            logger.warning(
+                f"Event loop blocked for more than {blocked_for:.3f}s; current stack:\n{stack}"
+            )
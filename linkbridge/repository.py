@@ -0,0 +1,149 @@
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, or_, select, text
+
+from linkbridge.database import fts_match_query
+from linkbridge.schema import linkedin_table
+
+# Projections; the field names are the user_linkedin columns they are read from
+ProfileCard = namedtuple('ProfileCard', [
+    'full_name', 'headline', 'current_company', 'location', 'linkedin_url', 'profile_picture_url'
+])
+ProfileListItem = namedtuple('ProfileListItem', ProfileCard._fields + ('summary',))
+SearchHit = namedtuple('SearchHit', ['full_name', 'headline', 'linkedin_url'])
+ExportRow = namedtuple('ExportRow', ['full_name', 'linkedin_url', 'headline', 'current_company', 'location'])
+SimilarityDocument = namedtuple('SimilarityDocument', [
+    'telegram_user_id', 'community_id', 'headline', 'current_company', 'location', 'summary'
+])
+Profile = namedtuple('Profile', [column.name for column in linkedin_table.columns])
+
+
+def _select(record_type):
+    return select(*(linkedin_table.c[field] for field in record_type._fields))
+
+
+def _fetch(conn, record_type, query) -> list:
+    return [record_type(*row) for row in conn.execute(query)]
+
+
+def has_profile(conn, user_id: int) -> bool:
+    return conn.execute(
+        select(linkedin_table.c.id).where(linkedin_table.c.telegram_user_id == user_id)
+    ).first() is not None
+
+
+def get_card(conn, user_id: int) -> Optional[ProfileCard]:
+    cards = _fetch(conn, ProfileCard, _select(ProfileCard).where(linkedin_table.c.telegram_user_id == user_id))
+    return cards[0] if cards else None
+
+
+def get_profile(conn, user_id: int) -> Optional[Profile]:
+    profiles = _fetch(conn, Profile, _select(Profile).where(linkedin_table.c.telegram_user_id == user_id))
+    return profiles[0] if profiles else None
+
+
+def other_cards(conn, community_id: int, user_id: int) -> List[ProfileCard]:
+    """Cards of every profile in the community except the user's own"""
+    return _fetch(conn, ProfileCard, _select(ProfileCard).where(
+        linkedin_table.c.community_id == community_id,
+        linkedin_table.c.telegram_user_id != user_id
+    ))
+
+
+def cards_by_user(conn, user_ids: List[int]) -> Dict[int, ProfileCard]:
+    query = select(linkedin_table.c.telegram_user_id, *_select(ProfileCard).selected_columns).where(
+        linkedin_table.c.telegram_user_id.in_(user_ids)
+    )
+    return {row[0]: ProfileCard(*row[1:]) for row in conn.execute(query)}
+
+
+def similarity_documents(conn) -> List[SimilarityDocument]:
+    """Every profile's text fields, for a full similarity index rebuild"""
+    return _fetch(conn, SimilarityDocument, _select(SimilarityDocument))
+
+
+def similarity_document(conn, user_id: int) -> Optional[SimilarityDocument]:
+    documents = _fetch(conn, SimilarityDocument, _select(SimilarityDocument).where(
+        linkedin_table.c.telegram_user_id == user_id
+    ))
+    return documents[0] if documents else None
+
+
+def get_community(conn, user_id: int) -> Optional[int]:
+    return conn.execute(
+        select(linkedin_table.c.community_id).where(linkedin_table.c.telegram_user_id == user_id)
+    ).scalar()
+
+
+def other_user_ids(conn, community_id: int, user_id: int) -> List[int]:
+    """Broadcast recipients: the community's other users that are still reachable"""
+    return list(conn.execute(
+        select(linkedin_table.c.telegram_user_id).where(
+            linkedin_table.c.community_id == community_id,
+            linkedin_table.c.telegram_user_id != user_id,
+            linkedin_table.c.unreachable_since.is_(None)
+        )
+    ).scalars())
+
+
+def count_profiles(conn, community_id: Optional[int] = None) -> int:
+    """Profiles in one community, or in all of them when community_id is None"""
+    query = select(func.count()).select_from(linkedin_table)
+    if community_id is not None:
+        query = query.where(linkedin_table.c.community_id == community_id)
+    return conn.execute(query).scalar()
+
+
+def count_unreachable(conn) -> int:
+    return conn.execute(
+        select(func.count()).select_from(linkedin_table).where(linkedin_table.c.unreachable_since.isnot(None))
+    ).scalar()
+
+
+def top_values(conn, community_id: int, column_name: str, limit: int = 3) -> List[tuple]:
+    """(value, count) of the most common values of a column in the community"""
+    column = linkedin_table.c[column_name]
+    query = select(column, func.count(column).label('count')).where(
+        linkedin_table.c.community_id == community_id
+    ).group_by(column).order_by(text('count DESC')).limit(limit)
+    return [tuple(row) for row in conn.execute(query)]
+
+
+def list_page(conn, community_id: int, offset: int, limit: int) -> List[ProfileListItem]:
+    """Newest profiles of the community first, as shown by the user list"""
+    query = _select(ProfileListItem).where(
+        linkedin_table.c.community_id == community_id
+    ).order_by(
+        linkedin_table.c.created_at.desc(),
+        linkedin_table.c.id.desc()
+    ).offset(offset).limit(limit)
+    return _fetch(conn, ProfileListItem, query)
+
+
+def search(conn, community_id: int, search_query: str) -> List[SearchHit]:
+    """Profiles of the community whose name, headline, company or location match the lower-cased query"""
+    match_query = fts_match_query(search_query) if conn.dialect.name == 'sqlite' else None
+    if match_query:
+        # SQLite: FTS5 index lookup, best matches first
+        columns = ', '.join(f'u.{field}' for field in SearchHit._fields)
+        query = text(
+            f"SELECT {columns} FROM user_linkedin_fts f JOIN user_linkedin u ON u.id = f.rowid "
+            "WHERE user_linkedin_fts MATCH :match AND u.community_id = :community_id ORDER BY f.rank"
+        ).bindparams(match=match_query, community_id=community_id)
+    else:
+        # PostgreSQL: substring matches served by the pg_trgm indexes on lower(column)
+        query = _select(SearchHit).where(
+            linkedin_table.c.community_id == community_id,
+            or_(
+                func.lower(linkedin_table.c.full_name).contains(search_query),
+                func.lower(linkedin_table.c.headline).contains(search_query),
+                func.lower(linkedin_table.c.current_company).contains(search_query),
+                func.lower(linkedin_table.c.location).contains(search_query)
+            )
+        )
+    return _fetch(conn, SearchHit, query)
+
+
+def export_rows(conn) -> List[ExportRow]:
+    return _fetch(conn, ExportRow, _select(ExportRow))
@@ -0,0 +1,217 @@
+import itertools
+import logging
+from collections import Counter, defaultdict, namedtuple
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, select, text
+
+from linkbridge.database import dialect_insert
+from linkbridge.events import ARCHIVED, CREATED, DELETED, RESTORED, EventConsumer
+from linkbridge.schema import (
+    daily_rollups_table, daily_value_deltas_table, linkedin_table, profile_archive_table, schema_migrations_table
+)
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_CONSUMER = 'daily_rollups'
+DIMENSIONS = ('current_company', 'location')
+# Profiles created before this migration have no events; the first rollup counts them from user_linkedin
+EVENT_LOG_MIGRATION = 20
+# Keeps two processes from folding the same events twice
+ROLLUP_LOCK_ID = 724_301_119
+SPARK_BARS = '▁▂▃▄▅▆▇█'
+# Archiving takes a profile out of user_linkedin and restoring puts it back, so they count as deleted and new
+ADDED_EVENTS = (CREATED, RESTORED)
+REMOVED_EVENTS = (DELETED, ARCHIVED)
+
+DayRollup = namedtuple('DayRollup', ['day', 'new_profiles', 'deleted_profiles', 'active_profiles'])
+
+
+class _Tally:
+    """Per-day counts and company/location deltas of a batch of profile changes"""
+
+    def __init__(self):
+        self.counts: Dict[Tuple[date, int], List[int]] = defaultdict(lambda: [0, 0])
+        self.deltas: Counter = Counter()
+
+    def __bool__(self) -> bool:
+        return bool(self.counts)
+
+    def add(self, day: date, community_id: int, created: bool, fields: Mapping[str, Any]) -> None:
+        self.counts[(day, community_id)][0 if created else 1] += 1
+        for dimension in DIMENSIONS:
+            value = fields.get(dimension)
+            if value:
+                self.deltas[(day, community_id, dimension, value)] += 1 if created else -1
+
+
+def _backfill(conn, tally: _Tally) -> None:
+    """Count the profiles registered before the event log existed
+
+    Archived ones count too: their archived events follow and take them out again.
+    """
+    cutoff = conn.execute(
+        select(schema_migrations_table.c.applied_at).where(schema_migrations_table.c.version == EVENT_LOG_MIGRATION)
+    ).scalar()
+    for table in (linkedin_table, profile_archive_table):
+        query = select(
+            table.c.created_at, table.c.community_id, table.c.current_company, table.c.location
+        ).where(table.c.created_at.is_not(None))
+        if cutoff is not None:
+            query = query.where(table.c.created_at < cutoff)
+        for row in conn.execute(query):
+            tally.add(row.created_at.date(), row.community_id, True, row._mapping)
+
+
+def _write(conn, tally: _Tally) -> None:
+    """Add the tally to the rollup tables, oldest day first so active counts carry forward"""
+    columns = daily_rollups_table.c
+    for (day, community_id), (new, deleted) in sorted(tally.counts.items()):
+        previous = conn.execute(
+            select(columns.active_profiles)
+            .where(columns.community_id == community_id, columns.day < day)
+            .order_by(columns.day.desc())
+            .limit(1)
+        ).scalar() or 0
+        statement = dialect_insert(conn.engine, daily_rollups_table).values(
+            day=day, community_id=community_id, new_profiles=new, deleted_profiles=deleted,
+            active_profiles=previous + new - deleted
+        )
+        conn.execute(statement.on_conflict_do_update(
+            index_elements=[columns.day, columns.community_id],
+            set_={
+                'new_profiles': columns.new_profiles + statement.excluded.new_profiles,
+                'deleted_profiles': columns.deleted_profiles + statement.excluded.deleted_profiles,
+                'active_profiles': (columns.active_profiles + statement.excluded.new_profiles
+                                    - statement.excluded.deleted_profiles)
+            }
+        ))
+    deltas = [
+        {'day': day, 'community_id': community_id, 'dimension': dimension, 'value': value, 'delta': delta}
+        for (day, community_id, dimension, value), delta in tally.deltas.items() if delta
+    ]
+    if deltas:
+        statement = dialect_insert(conn.engine, daily_value_deltas_table)
+        conn.execute(statement.on_conflict_do_update(
+            index_elements=[
+                daily_value_deltas_table.c.day, daily_value_deltas_table.c.community_id,
+                daily_value_deltas_table.c.dimension, daily_value_deltas_table.c.value
+            ],
+            set_={'delta': daily_value_deltas_table.c.delta + statement.excluded.delta}
+        ), deltas)
+
+
+def roll_up(engine, today: Optional[date] = None, batch_size: int = 1000) -> int:
+    """Fold the profile events of completed days into the rollup tables; blocking
+
+    Returns the number of events folded. The consumer offset is committed in the same
+    transaction as the rollup rows, so every event is counted exactly once.
+    """
+    midnight = datetime.combine(today or datetime.utcnow().date(), time.min)
+    consumer = EventConsumer(engine, ROLLUP_CONSUMER)
+    position = last_id = consumer.position()
+    tally = _Tally()
+    with engine.connect() as conn:
+        backfill = position == 0 and conn.execute(select(func.count()).select_from(daily_rollups_table)).scalar() == 0
+        if backfill:
+            _backfill(conn, tally)
+
+    folded = 0
+    while True:
+        batch = consumer.poll(batch_size, after=last_id)
+        # Ids follow time, so the first event of today ends the completed days
+        done = list(itertools.takewhile(lambda event: event.created_at < midnight, batch))
+        for event in done:
+            if event.event_type in ADDED_EVENTS + REMOVED_EVENTS:
+                tally.add(event.created_at.date(), event.community_id, event.event_type in ADDED_EVENTS, event.data)
+        if done:
+            last_id = done[-1].id
+            folded += len(done)
+        if len(done) < batch_size:
+            break
+
+    if last_id == position and not tally:
+        return 0
+    with engine.begin() as conn:
+        if conn.dialect.name == 'postgresql':
+            conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {'id': ROLLUP_LOCK_ID})
+        already_rolled = conn.execute(select(func.count()).select_from(daily_rollups_table)).scalar() > 0
+        if consumer.position(conn) != position or (backfill and already_rolled):
+            logger.info("Daily rollup already done by another process")
+            return 0
+        _write(conn, tally)
+        consumer.commit(last_id, conn)
+    logger.info(f"Rolled {folded} profile events up into {len(tally.counts)} daily rows")
+    return folded
+
+
+def daily_series(conn, community_id: Optional[int], days: int, today: Optional[date] = None) -> List[DayRollup]:
+    """The last `days` completed days, oldest first, for one community or all of them
+
+    Days without a rollup row carry the previous active count forward.
+    """
+    today = today or datetime.utcnow().date()
+    start = today - timedelta(days=days)
+    columns = daily_rollups_table.c
+    scope = [] if community_id is None else [columns.community_id == community_id]
+
+    # Each community's last active count before the window
+    earlier = daily_rollups_table.alias('earlier')
+    latest_before = select(func.max(earlier.c.day)).where(
+        earlier.c.community_id == columns.community_id, earlier.c.day < start
+    ).scalar_subquery()
+    baseline = conn.execute(
+        select(columns.community_id, columns.active_profiles).where(columns.day == latest_before, *scope)
+    ).all()
+    active: Dict[int, int] = {row.community_id: row.active_profiles for row in baseline}
+
+    rows = conn.execute(
+        select(columns).where(and_(columns.day >= start, columns.day < today, *scope)).order_by(columns.day)
+    ).all()
+    by_day = defaultdict(list)
+    for row in rows:
+        by_day[row.day].append(row)
+
+    series = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        new = deleted = 0
+        for row in by_day.get(day, ()):
+            new += row.new_profiles
+            deleted += row.deleted_profiles
+            active[row.community_id] = row.active_profiles
+        series.append(DayRollup(day, new, deleted, sum(active.values())))
+    return series
+
+
+def top_changes(conn, community_id: Optional[int], dimension: str, since: date, limit: int = 3) -> List[tuple]:
+    """(value, net change) of the companies or locations that grew most since the given day"""
+    columns = daily_value_deltas_table.c
+    total = func.sum(columns.delta).label('total')
+    query = select(columns.value, total).where(columns.dimension == dimension, columns.day >= since)
+    if community_id is not None:
+        query = query.where(columns.community_id == community_id)
+    query = query.group_by(columns.value).having(func.sum(columns.delta) > 0).order_by(total.desc()).limit(limit)
+    return [tuple(row) for row in conn.execute(query)]
+
+
+def sparkline(values: Sequence[float]) -> str:
+    if not values:
+        return ''
+    low, high = min(values), max(values)
+    if high == low:
+        return SPARK_BARS[0] * len(values)
+    scale = (len(SPARK_BARS) - 1) / (high - low)
+    return ''.join(SPARK_BARS[round((value - low) * scale)] for value in values)
+
+
+def net_growth(series: Sequence[DayRollup]) -> int:
+    return sum(day.new_profiles - day.deleted_profiles for day in series)
+
+
+def format_change(current: int, previous: int) -> str:
+    """'+12 (+50%)' style week-over-week change"""
+    if previous:
+        return f"{current:+d} ({(current - previous) / abs(previous):+.0%} vs {previous:+d})"
+    return f"{current:+d}"
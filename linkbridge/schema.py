@@ -0,0 +1,135 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, Date, DateTime, Index, Integer, MetaData, String, Table, Text
+
+# Single source of truth for the database schema, shared by the bot and scripts/
+meta = MetaData()
+
+# Define the LinkedIn user table
+linkedin_table = Table(
+    'user_linkedin', meta,
+    Column('id', Integer, primary_key=True),
+    Column('linkedin_url', String, unique=True, nullable=False),
+    # Canonical profile handle, see linkbridge.urls.canonical_slug
+    Column('linkedin_slug', String),
+    Column('telegram_user_id', BigInteger, nullable=False),
+    # Telegram chat id of the group the profile belongs to; 0 is the default community
+    Column('community_id', BigInteger, nullable=False, default=0, server_default='0'),
+    Column('full_name', String),
+    Column('headline', String),
+    Column('location', String),
+    Column('current_company', String),
+    Column('summary', Text),
+    Column('profile_picture_url', String),
+    # Set when a broadcast failed permanently (bot blocked, account deleted); such users are skipped
+    Column('unreachable_since', DateTime),
+    Column('delivery_failures', Integer, nullable=False, default=0, server_default='0'),
+    # Last day the user talked to the bot, written in batches; see linkbridge.archive
+    Column('last_seen_at', DateTime, default=datetime.utcnow),
+    Column('created_at', DateTime, default=datetime.utcnow),
+    Column('updated_at', DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+)
+
+# Indexes backing the hot queries: per-user lookups and newest-first listing. Search uses FTS5 on
+# SQLite and pg_trgm indexes on PostgreSQL, created by linkbridge.migrations outside this metadata
+Index('ix_user_linkedin_telegram_user_id', linkedin_table.c.telegram_user_id,
+      unique=True, postgresql_concurrently=True)
+Index('ix_user_linkedin_linkedin_slug', linkedin_table.c.linkedin_slug,
+      unique=True, postgresql_concurrently=True)
+Index('ix_user_linkedin_created_at_id', linkedin_table.c.created_at, linkedin_table.c.id,
+      postgresql_concurrently=True)
+# Every listing, search, stats and broadcast query filters on community_id first
+Index('ix_user_linkedin_community_created_at_id',
+      linkedin_table.c.community_id, linkedin_table.c.created_at, linkedin_table.c.id,
+      postgresql_concurrently=True)
+Index('ix_user_linkedin_community_telegram_user_id',
+      linkedin_table.c.community_id, linkedin_table.c.telegram_user_id,
+      postgresql_concurrently=True)
+Index('ix_user_linkedin_community_current_company',
+      linkedin_table.c.community_id, linkedin_table.c.current_company,
+      postgresql_concurrently=True)
+Index('ix_user_linkedin_community_location',
+      linkedin_table.c.community_id, linkedin_table.c.location,
+      postgresql_concurrently=True)
+
+# Profiles moved out of user_linkedin after a long time inactive or unreachable; restored when the owner returns
+profile_archive_table = Table(
+    'user_linkedin_archive', meta,
+    Column('telegram_user_id', BigInteger, primary_key=True),
+    Column('linkedin_url', String, nullable=False),
+    Column('linkedin_slug', String),
+    Column('community_id', BigInteger, nullable=False),
+    Column('full_name', String),
+    Column('headline', String),
+    Column('location', String),
+    Column('current_company', String),
+    Column('summary', Text),
+    Column('profile_picture_url', String),
+    Column('unreachable_since', DateTime),
+    Column('delivery_failures', Integer, nullable=False, default=0),
+    Column('last_seen_at', DateTime),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+    # inactive or unreachable, see linkbridge.archive
+    Column('archive_reason', String, nullable=False),
+    Column('archived_at', DateTime, nullable=False, default=datetime.utcnow)
+)
+
+# Small named values the bot keeps across restarts, e.g. the last processed update
+bot_state_table = Table(
+    'bot_state', meta,
+    Column('name', String, primary_key=True),
+    Column('value', String, nullable=False),
+    Column('updated_at', DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+)
+
+# Append-only log of profile changes; the id orders it and is the offset consumers read from
+profile_events_table = Table(
+    'profile_events', meta,
+    Column('id', BigInteger().with_variant(Integer, 'sqlite'), primary_key=True),
+    # created, updated, deleted, enriched, archived or restored, see linkbridge.events
+    Column('event_type', String, nullable=False),
+    Column('telegram_user_id', BigInteger, nullable=False),
+    Column('community_id', BigInteger, nullable=False),
+    # JSON object of the profile fields the event set
+    Column('data', Text),
+    Column('created_at', DateTime, nullable=False, default=datetime.utcnow)
+)
+
+# Last profile event each named consumer of the log has processed
+event_consumers_table = Table(
+    'event_consumers', meta,
+    Column('name', String, primary_key=True),
+    Column('last_event_id', BigInteger, nullable=False),
+    Column('updated_at', DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+)
+
+# Daily growth of each community, rolled up nightly from profile_events
+daily_rollups_table = Table(
+    'daily_rollups', meta,
+    Column('day', Date, primary_key=True),
+    Column('community_id', BigInteger, primary_key=True),
+    Column('new_profiles', Integer, nullable=False, default=0),
+    Column('deleted_profiles', Integer, nullable=False, default=0),
+    # Profiles registered at the end of the day
+    Column('active_profiles', Integer, nullable=False, default=0)
+)
+
+# Daily net change in profiles per company or location value
+daily_value_deltas_table = Table(
+    'daily_value_deltas', meta,
+    Column('day', Date, primary_key=True),
+    Column('community_id', BigInteger, primary_key=True),
+    # current_company or location
+    Column('dimension', String, primary_key=True),
+    Column('value', String, primary_key=True),
+    Column('delta', Integer, nullable=False)
+)
+
+# Applied schema versions
+schema_migrations_table = Table(
+    'schema_migrations', meta,
+    Column('version', Integer, primary_key=True),
+    Column('description', String, nullable=False),
+    Column('applied_at', DateTime, default=datetime.utcnow)
+)
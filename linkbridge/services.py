@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional, Set
+
+from linkbridge import repository, settings
+from linkbridge.archive import ProfileArchive
+from linkbridge.cache import ResultCache
+from linkbridge.database import LatencyProbe, create_engines, is_sqlite
+from linkbridge.events import ARCHIVED, CREATED, DELETED, RESTORED
+from linkbridge.invalidation import ChangeListener
+from linkbridge.lifecycle import UpdateOffsetStore
+from linkbridge.linkedin import LinkedInClient
+from linkbridge.overload import OverloadController
+from linkbridge.traffic import TrafficRecorder
+
+logger = logging.getLogger(__name__)
+
+# Shared runtime objects; handlers read them as services.<name> once init() has run
+engine = None
+read_engine = None
+db_probes: Dict[str, LatencyProbe] = {}
+update_offsets: Optional[UpdateOffsetStore] = None
+profile_archive: Optional[ProfileArchive] = None
+# Only with PostgreSQL, where several bot processes may share the database
+change_listener: Optional[ChangeListener] = None
+# Only while TRAFFIC_RECORD_FILE is set
+traffic_recorder: Optional[TrafficRecorder] = None
+
+linkedin = LinkedInClient(settings.LINKEDIN_USERNAME, settings.LINKEDIN_PASSWORD)
+overload = OverloadController(
+    settings.OVERLOAD_BACKLOG_THRESHOLDS, tuple(ms / 1000 for ms in settings.OVERLOAD_LAG_THRESHOLDS_MS)
+)
+query_cache = ResultCache(settings.QUERY_CACHE_SIZE, settings.QUERY_CACHE_MAX_AGE or None)
+
+_similarity_index = None
+_similarity_lock = threading.Lock()
+# Strong references to the similarity index updates apply_remote_change started
+_remote_index_updates: Set[asyncio.Task] = set()
+
+
+def init() -> None:
+    """Create the database engines; connections are only opened when first used"""
+    global engine, read_engine, update_offsets, profile_archive, change_listener, traffic_recorder
+    engine, read_engine = create_engines(settings.DATABASE_URL, settings.DATABASE_REPLICA_URL)
+    db_probes['primary'] = LatencyProbe(engine, 'primary')
+    if settings.DATABASE_REPLICA_URL and not is_sqlite(engine):
+        db_probes['replica'] = LatencyProbe(read_engine, 'replica')
+    # Updates are confirmed to Telegram only once handled, and the last handled one survives restarts
+    update_offsets = UpdateOffsetStore(engine)
+    profile_archive = ProfileArchive(
+        engine, settings.ARCHIVE_INACTIVE_DAYS, settings.ARCHIVE_UNREACHABLE_DAYS, settings.ARCHIVE_BATCH_SIZE,
+        read_engine
+    )
+    if not is_sqlite(engine):
+        change_listener = ChangeListener(engine, apply_remote_change, query_cache.bump)
+    if settings.TRAFFIC_RECORD_FILE:
+        traffic_recorder = TrafficRecorder(
+            settings.TRAFFIC_RECORD_FILE, settings.TRAFFIC_RECORD_SALT, settings.ADMIN_IDS
+        )
+        logger.info(f"Recording anonymized updates to {settings.TRAFFIC_RECORD_FILE}")
+
+
+def similarity_index():
+    """The /suggest index; numpy is imported on first use rather than at startup"""
+    global _similarity_index
+    if _similarity_index is None:
+        # The first rebuild creates it in an executor thread while handlers may ask for it too
+        with _similarity_lock:
+            if _similarity_index is None:
+                from linkbridge.similarity import SimilarityIndex
+                _similarity_index = SimilarityIndex(settings.SUGGEST_FEATURE_DIM)
+    return _similarity_index
+
+
+async def _index_remote_profile(telegram_user_id: int) -> None:
+    """Add a profile another process wrote to this process's similarity index"""
+    def load():
+        # The primary: a replica may not have the row yet
+        with engine.connect() as conn:
+            return repository.similarity_document(conn, telegram_user_id)
+
+    try:
+        document = await asyncio.get_running_loop().run_in_executor(None, load)
+    except Exception as e:
+        logger.error(f"Could not load profile {telegram_user_id} for the similarity index: {str(e)}")
+        return
+    if document is not None:
+        _similarity_index.upsert(document)
+
+
+def apply_remote_change(event_type: str, telegram_user_id: Optional[int], community_id: Optional[int]) -> None:
+    """Bring this process up to date with another process's profile write; runs on the event loop"""
+    query_cache.bump(community_id)
+    # Before the first rebuild there is no index to update, the rebuild reads every profile
+    if telegram_user_id is None or _similarity_index is None:
+        return
+    if event_type in (DELETED, ARCHIVED):
+        _similarity_index.remove(telegram_user_id)
+    elif event_type in (CREATED, RESTORED):
+        task = asyncio.get_running_loop().create_task(_index_remote_profile(telegram_user_id))
+        _remote_index_updates.add(task)
+        task.add_done_callback(_remote_index_updates.discard)
@@ -0,0 +1,135 @@
+import os
+
+from dotenv import load_dotenv
+
+# Environment configuration, read once at import; nothing here touches the network or the database
+load_dotenv()
+
+TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
+# Bot API server; point it at a local telegram-bot-api server or a test double
+TELEGRAM_API_BASE_URL = os.getenv('TELEGRAM_API_BASE_URL', 'https://api.telegram.org/bot')
+TELEGRAM_API_BASE_FILE_URL = os.getenv('TELEGRAM_API_BASE_FILE_URL', 'https://api.telegram.org/file/bot')
+DB_HOST = os.getenv('DB_HOST')
+DB_PORT = os.getenv('DB_PORT')
+DB_NAME = os.getenv('DB_NAME')
+DB_USER = os.getenv('DB_USER')
+DB_PASSWORD = os.getenv('DB_PASSWORD')
+
+# Database connection string; DATABASE_URL may also point at SQLite, e.g. sqlite:///data/linkedin_profiles.db
+DATABASE_URL = os.getenv('DATABASE_URL')
+if not DATABASE_URL and all([DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD]):
+    # Fallback to constructing URL from individual credentials
+    DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# Read-only paths use the replica when one is configured
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+AUTO_MIGRATE = os.getenv('AUTO_MIGRATE', 'true').lower() == 'true'
+
+# Periodic round-trip probes feeding /status and the metrics endpoint
+DB_PROBE_INTERVAL = int(os.getenv('DB_PROBE_INTERVAL', '30'))
+
+# Seconds a SIGTERM leaves in-flight handlers, jobs and broadcasts to finish (Render allows 30)
+SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv('SHUTDOWN_DRAIN_TIMEOUT', '25'))
+
+# Local Prometheus-style metrics endpoint (set METRICS_PORT=0 to disable)
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9100'))
+
+# Event-loop stall detection and on-demand profiling (LOOP_STALL_THRESHOLD_MS=0 disables the watchdog)
+LOOP_STALL_THRESHOLD_MS = int(os.getenv('LOOP_STALL_THRESHOLD_MS', '250'))
+PROFILER_INTERVAL_MS = int(os.getenv('PROFILER_INTERVAL_MS', '10'))
+MAX_PROFILE_SECONDS = 120
+
+# /suggest similarity index, rebuilt in full periodically and updated on every registration or deletion
+SUGGEST_FEATURE_DIM = int(os.getenv('SUGGEST_FEATURE_DIM', '1024'))
+SUGGEST_REBUILD_INTERVAL = int(os.getenv('SUGGEST_REBUILD_INTERVAL', '3600'))
+MAX_SUGGESTIONS = 10
+
+# Community for private chats that neither followed an invite link nor registered yet
+DEFAULT_COMMUNITY_ID = int(os.getenv('DEFAULT_COMMUNITY_ID', '0'))
+
+# Load shedding: past the first update-backlog or event-loop-lag threshold replies get cheaper,
+# past the second non-urgent notifications are postponed and /export is refused
+OVERLOAD_BACKLOG_THRESHOLDS = tuple(int(v) for v in os.getenv('OVERLOAD_BACKLOG_THRESHOLDS', '20,60').split(','))
+OVERLOAD_LAG_THRESHOLDS_MS = tuple(int(v) for v in os.getenv('OVERLOAD_LAG_THRESHOLDS_MS', '100,500').split(','))
+NOTIFY_POSTPONE_SECONDS = int(os.getenv('NOTIFY_POSTPONE_SECONDS', '60'))
+USERS_PER_PAGE = 4
+DEGRADED_USERS_PER_PAGE = 2
+MAX_SEARCH_RESULTS = 20
+DEGRADED_SEARCH_RESULTS = 5
+DEGRADED_PROFILE_CARDS = 10
+
+# Query result cache for /search, /stats and user list pages; every profile write invalidates it
+QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', '1024'))
+QUERY_CACHE_MAX_AGE = float(os.getenv('QUERY_CACHE_MAX_AGE', '300'))
+
+# Growth rollups are computed from the event log daily at this UTC time (HH:MM);
+# /stats shows the last STATS_TREND_DAYS days of them, /trend up to MAX_TREND_DAYS
+ROLLUP_TIME = os.getenv('ROLLUP_TIME', '00:15')
+STATS_TREND_DAYS = 14
+MAX_TREND_DAYS = 90
+
+# Profiles whose owner was not seen for ARCHIVE_INACTIVE_DAYS, or was unreachable for ARCHIVE_UNREACHABLE_DAYS,
+# move to user_linkedin_archive daily at ARCHIVE_TIME (UTC) and come back when the owner returns; 0 days disables a rule
+ARCHIVE_INACTIVE_DAYS = int(os.getenv('ARCHIVE_INACTIVE_DAYS', '365'))
+ARCHIVE_UNREACHABLE_DAYS = int(os.getenv('ARCHIVE_UNREACHABLE_DAYS', '90'))
+ARCHIVE_TIME = os.getenv('ARCHIVE_TIME', '00:45')
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+# Users seen are written to last_seen_at in one statement per interval
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv('ACTIVITY_FLUSH_INTERVAL', '60'))
+
+# Seconds a handler may run before it is cancelled and the user asked to try again;
+# its database statements and Bot API requests time out with it
+HANDLER_DEADLINE = float(os.getenv('HANDLER_DEADLINE', '20'))
+
+# Opt-in capture of anonymized incoming updates for scripts/replay_traffic.py, as gzip-compressed JSON lines;
+# without TRAFFIC_RECORD_SALT every process start picks new pseudonyms
+TRAFFIC_RECORD_FILE = os.getenv('TRAFFIC_RECORD_FILE')
+TRAFFIC_RECORD_SALT = os.getenv('TRAFFIC_RECORD_SALT')
+TRAFFIC_FLUSH_INTERVAL = float(os.getenv('TRAFFIC_FLUSH_INTERVAL', '10'))
+
+ADMIN_IDS = [int(id_) for id_ in os.getenv('ADMIN_IDS', '').split(',') if id_]
+
+# LinkedIn API; the login happens on first use, not at startup
+LINKEDIN_USERNAME = os.getenv('LINKEDIN_USERNAME')
+LINKEDIN_PASSWORD = os.getenv('LINKEDIN_PASSWORD')
+
+CONNECT_TIMEOUT = float(os.getenv('TELEGRAM_CONNECT_TIMEOUT', '30'))  # seconds
+READ_TIMEOUT = float(os.getenv('TELEGRAM_READ_TIMEOUT', '30'))        # seconds
+WRITE_TIMEOUT = float(os.getenv('TELEGRAM_WRITE_TIMEOUT', '30'))      # seconds, uploads need more than the default 5
+
+# Outbound Bot API connections; sends and the getUpdates long-poll use separate pools
+TELEGRAM_POOL_SIZE = int(os.getenv('TELEGRAM_POOL_SIZE', '256'))
+TELEGRAM_POOL_TIMEOUT = float(os.getenv('TELEGRAM_POOL_TIMEOUT', '10'))
+TELEGRAM_HTTP_VERSION = os.getenv('TELEGRAM_HTTP_VERSION', '1.1')
+TELEGRAM_KEEPALIVE_CONNECTIONS = int(os.getenv('TELEGRAM_KEEPALIVE_CONNECTIONS', str(TELEGRAM_POOL_SIZE)))
+TELEGRAM_KEEPALIVE_EXPIRY = float(os.getenv('TELEGRAM_KEEPALIVE_EXPIRY', '60'))
+
+# Bot API requests per second shared by all sends (OUTBOUND_RATE=0 disables the scheduler); when they queue,
+# interactive replies, transactional messages and bulk notifications are served in OUTBOUND_WEIGHTS proportion
+OUTBOUND_RATE = float(os.getenv('OUTBOUND_RATE', '30'))
+OUTBOUND_WEIGHTS = tuple(int(v) for v in os.getenv('OUTBOUND_WEIGHTS', '8,3,1').split(','))
+OUTBOUND_MAX_RETRIES = int(os.getenv('OUTBOUND_MAX_RETRIES', '1'))
+
+
+def validate() -> None:
+    """Raise ValueError when a setting the bot cannot start without is missing"""
+    if not TELEGRAM_BOT_TOKEN:
+        raise ValueError("Some environment variables are missing.")
+    if not DATABASE_URL:
+        raise ValueError("Database configuration is missing")
+
+
+def summary() -> dict:
+    """Which of the main environment variables are set, safe to log"""
+    return {
+        'TELEGRAM_BOT_TOKEN': bool(TELEGRAM_BOT_TOKEN),
+        'DATABASE_URL': bool(os.getenv('DATABASE_URL')),
+        'DB_HOST': bool(DB_HOST),
+        'DB_PORT': bool(DB_PORT),
+        'DB_NAME': bool(DB_NAME),
+        'DB_USER': bool(DB_USER),
+        'DB_PASSWORD': bool(DB_PASSWORD),
+        'LINKEDIN_USERNAME': bool(LINKEDIN_USERNAME),
+        'LINKEDIN_PASSWORD': bool(LINKEDIN_PASSWORD)
+    }
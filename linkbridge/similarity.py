@@ -0,0 +1,215 @@
+import logging
+import math
+import re
+import time
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from linkbridge.deadlines import run_in_executor
+from linkbridge.metrics import SUGGEST_INDEX_PROFILES
+
+logger = logging.getLogger(__name__)
+
+STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'at', 'by', 'for', 'from', 'in', 'is', 'of', 'on', 'or', 'the', 'to', 'with',
+    'i', 'im', 'my', 'we', 'our', 'you', 'your', 'am', 'are', 'be', 'as', 'it', 'this', 'that',
+})
+
+# (field, weight, whole value as one feature); an exact company or location match counts extra
+FIELDS = (
+    ('headline', 1.0, False),
+    ('current_company', 1.0, False),
+    ('current_company', 2.0, True),
+    ('location', 1.0, True),
+    ('summary', 0.5, False),
+)
+
+MAX_SUMMARY_CHARS = 2000
+
+
+def _tokens(value: str) -> List[str]:
+    return [token for token in re.findall(r'\w+', value.casefold())
+            if len(token) > 1 and token not in STOP_WORDS]
+
+
+def _bucket(feature: str, dim: int) -> int:
+    # crc32 rather than hash(), which is salted per process
+    return zlib.crc32(feature.encode('utf-8')) % dim
+
+
+class SimilarityIndex:
+    """Hashed-feature TF-IDF vectors of every profile with cosine top-k lookups
+
+    Rows are L2-normalized, so a single matrix-vector product scores every profile;
+    the matrix keeps spare rows beyond len(self) for cheap appends. Matches are
+    limited to the profile's own community.
+    Profiles are upserted and removed incrementally using the IDF weights of the last
+    full rebuild; rebuild() recomputes the weights off the event loop.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.built_at: Optional[float] = None
+        self._idf = np.ones(dim, dtype=np.float32)
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._communities = np.zeros(0, dtype=np.int64)
+        self._user_ids: List[int] = []
+        self._rows: Dict[int, int] = {}
+        self._journal: Optional[list] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.built_at is not None
+
+    def __len__(self) -> int:
+        return len(self._user_ids)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._rows
+
+    def _features(self, profile) -> List[Tuple[int, float]]:
+        """(bucket, weight) pairs of a profile with the attributes named in FIELDS"""
+        features = []
+        for field, weight, whole in FIELDS:
+            value = getattr(profile, field, None)
+            if not value:
+                continue
+            if field == 'summary':
+                value = value[:MAX_SUMMARY_CHARS]
+            if whole:
+                features.append((_bucket(f"{field}={' '.join(_tokens(value))}", self.dim), weight))
+            else:
+                features.extend((_bucket(token, self.dim), weight) for token in _tokens(value))
+        return features
+
+    def _term_frequencies(self, profile) -> np.ndarray:
+        """Log-scaled weighted feature counts of one profile"""
+        counts = np.zeros(self.dim, dtype=np.float32)
+        for bucket, weight in self._features(profile):
+            counts[bucket] += weight
+        return np.log1p(counts)
+
+    def _vectorize(self, term_frequencies: np.ndarray, idf: np.ndarray) -> np.ndarray:
+        vector = term_frequencies * idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _build(self, profiles: Iterable) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[int]]:
+        """Full rebuild; blocking and independent of the live state"""
+        user_ids = []
+        communities = []
+        rows, buckets, weights = [], [], []
+        for profile in profiles:
+            row = len(user_ids)
+            user_ids.append(profile.telegram_user_id)
+            communities.append(profile.community_id)
+            for bucket, weight in self._features(profile):
+                rows.append(row)
+                buckets.append(bucket)
+                weights.append(weight)
+        if not user_ids:
+            return (np.ones(self.dim, dtype=np.float32), np.zeros((0, self.dim), dtype=np.float32),
+                    np.zeros(0, dtype=np.int64), [])
+
+        matrix = np.zeros((len(user_ids), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(buckets, dtype=np.intp)),
+                  np.array(weights, dtype=np.float32))
+        np.log1p(matrix, out=matrix)
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = (np.log((1 + len(user_ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        matrix /= norms
+        return idf, matrix, np.array(communities, dtype=np.int64), user_ids
+
+    async def rebuild(self, load_profiles: Callable[[], Iterable]) -> int:
+        """Reload every profile in an executor and swap the new matrix in
+
+        Upserts and removals made while the rebuild runs are replayed on top of it.
+        """
+        if self._journal is not None:
+            logger.info("Similarity index rebuild already in progress")
+            return len(self)
+        self._journal = []
+        start_time = time.perf_counter()
+        try:
+            idf, matrix, communities, user_ids = await run_in_executor(lambda: self._build(load_profiles()))
+            journal = self._journal
+            self._idf, self._matrix, self._communities, self._user_ids = idf, matrix, communities, user_ids
+            self._rows = {user_id: row for row, user_id in enumerate(user_ids)}
+        finally:
+            self._journal = None
+
+        for user_id, profile in journal:
+            if profile is None:
+                self.remove(user_id)
+            else:
+                self.upsert(profile)
+        self.built_at = time.time()
+        SUGGEST_INDEX_PROFILES.set(len(self))
+        logger.info(f"Rebuilt similarity index with {len(self)} profiles "
+                    f"in {time.perf_counter() - start_time:.2f}s")
+        return len(self)
+
+    def upsert(self, profile) -> None:
+        """Add or replace one profile, which needs telegram_user_id, community_id and the FIELDS attributes"""
+        user_id = profile.telegram_user_id
+        if self._journal is not None:
+            self._journal.append((user_id, profile))
+        vector = self._vectorize(self._term_frequencies(profile), self._idf)
+        row = self._rows.get(user_id)
+        if row is None:
+            row = len(self._user_ids)
+            if row == len(self._matrix):
+                # Grow geometrically so appends stay amortized O(dim)
+                grown = np.zeros((max(16, 2 * row), self.dim), dtype=np.float32)
+                grown[:row] = self._matrix[:row]
+                self._matrix = grown
+                grown_communities = np.zeros(len(grown), dtype=np.int64)
+                grown_communities[:row] = self._communities[:row]
+                self._communities = grown_communities
+            self._matrix[row] = vector
+            self._communities[row] = profile.community_id
+            self._rows[user_id] = row
+            self._user_ids.append(user_id)
+        else:
+            self._matrix[row] = vector
+            self._communities[row] = profile.community_id
+        SUGGEST_INDEX_PROFILES.set(len(self))
+
+    def remove(self, user_id: int) -> None:
+        if self._journal is not None:
+            self._journal.append((user_id, None))
+        row = self._rows.pop(user_id, None)
+        if row is None:
+            return
+        # Move the last row into the gap so the matrix stays dense
+        last = len(self._user_ids) - 1
+        if row != last:
+            moved_user_id = self._user_ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._communities[row] = self._communities[last]
+            self._user_ids[row] = moved_user_id
+            self._rows[moved_user_id] = row
+        self._user_ids.pop()
+        self._matrix[last] = 0
+        SUGGEST_INDEX_PROFILES.set(len(self))
+
+    def most_similar(self, user_id: int, limit: int = 5) -> List[Tuple[int, float]]:
+        """(user id, cosine similarity) of the closest other profiles in the same community, best first"""
+        row = self._rows.get(user_id)
+        if row is None or limit <= 0:
+            return []
+        size = len(self._user_ids)
+        scores = self._matrix[:size] @ self._matrix[row]
+        scores[self._communities[:size] != self._communities[row]] = -math.inf
+        scores[row] = -math.inf
+        limit = min(limit, len(scores) - 1)
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(self._user_ids[i], float(scores[i])) for i in top if scores[i] > 0]
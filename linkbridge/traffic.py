@@ -0,0 +1,164 @@
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from telegram import Update
+from telegram.ext import CallbackContext
+
+from linkbridge.communities import DEEP_LINK_PREFIX, community_from_start_args
+from linkbridge.metrics import TRAFFIC_RECORDED
+
+logger = logging.getLogger(__name__)
+
+# Replies the bot offers as keyboard buttons; they decide which handler runs, so they are kept as sent
+KEPT_TEXTS = frozenset({
+    "➕ Add Profile", "📚 Help", "ℹ️ Status", "❌ Delete Profile", "🔄 Update Profile", "👥 View Users",
+    "✅ Yes, delete my profile", "❌ No, keep my profile", "yes", "no",
+})
+# Replaced by a pseudonym of the original
+NAME_FIELDS = frozenset({'first_name', 'last_name', 'username', 'title', 'bio', 'description', 'invite_link'})
+ID_FIELDS = frozenset({'user_id', 'user_chat_id', 'chat_id', 'migrate_to_chat_id', 'migrate_from_chat_id'})
+# Typed by users: text_link entity URLs and inline (and chosen inline) queries
+FREE_TEXT_FIELDS = frozenset({'text', 'caption', 'url', 'query'})
+# Contact details are never recorded
+DROPPED_FIELDS = frozenset({'phone_number', 'contact', 'location', 'venue', 'vcard', 'email', 'active_usernames'})
+LINKEDIN_PROFILE = re.compile(r'((?:https?://)?(?:www\.)?linkedin\.com/in/)([\w\-%]+)', re.IGNORECASE)
+
+
+class TrafficRecorder:
+    """Records anonymized incoming updates with their arrival time for scripts/replay_traffic.py
+
+    User and chat ids become keyed pseudonyms, consistent within a recording, and names
+    become tokens. Free text, text_link URLs and inline queries keep their shape but not
+    their letters and digits, except commands, keyboard replies and the layout of
+    LinkedIn profile URLs. Command arguments keep numbers; community deep links get the
+    group's pseudonym and other words (search terms) are hashed like URL slugs, so a
+    searched slug still matches.
+
+    record() only queues; flush() appends the queue to the file as one gzip member, so
+    a crash loses at most the last interval and a file written across restarts stays
+    readable. Each process starts a new session line naming the admins' pseudonyms;
+    pass the same salt to keep pseudonyms stable across restarts.
+    """
+
+    def __init__(self, path: str, salt: Optional[str] = None, admin_ids: Iterable[int] = ()):
+        self.path = path
+        self._key = (salt or os.urandom(16).hex()).encode()
+        self._lock = threading.Lock()
+        self._pending: List[str] = [json.dumps({
+            'session': round(time.time(), 3), 'admins': [self.pseudonym(admin_id) for admin_id in admin_ids]
+        })]
+
+    def _digest(self, value: Any) -> str:
+        return hmac.new(self._key, str(value).encode(), hashlib.sha256).hexdigest()
+
+    def pseudonym(self, value: int) -> int:
+        """Same sign as the id, so group chats stay negative, and the same for the same id"""
+        number = int(self._digest(value)[:12], 16) % 10 ** 10 + 1
+        return -number if value < 0 else number
+
+    def _slug(self, slug: str) -> str:
+        digest = self._digest(slug.casefold())
+        return (digest * (len(slug) // len(digest) + 1))[:len(slug)]
+
+    @staticmethod
+    def _mask(text: str) -> str:
+        return ''.join('0' if char.isdigit() else 'x' if char.isalnum() else char for char in text)
+
+    def anonymize_command(self, text: str) -> str:
+        """The command as sent; its entity only covers the command, so arguments may change length"""
+        parts = re.split(r'(\s+)', text)
+        is_start = parts[0].split('@')[0] == '/start'
+        for index in range(2, len(parts), 2):
+            word = parts[index]
+            community_id = community_from_start_args([word]) if is_start else None
+            if community_id is not None:
+                parts[index] = f"{DEEP_LINK_PREFIX}{self.pseudonym(community_id)}"
+            elif word and not word.isdigit():
+                parts[index] = self._slug(word)
+        return ''.join(parts)
+
+    def anonymize_text(self, text: str) -> str:
+        """Same length and layout, so message entities still line up"""
+        if text in KEPT_TEXTS or text.lower() in KEPT_TEXTS:
+            return text
+        if text.startswith('/'):
+            return self.anonymize_command(text)
+        parts, last = [], 0
+        for match in LINKEDIN_PROFILE.finditer(text):
+            parts.append(self._mask(text[last:match.start()]))
+            parts.append(match.group(1) + self._slug(match.group(2)))
+            last = match.end()
+        parts.append(self._mask(text[last:]))
+        return ''.join(parts)
+
+    def anonymize(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self.anonymize(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        # Users carry is_bot and chats a type; other objects' ids (callback queries) are not personal
+        identifies = 'is_bot' in value or 'type' in value
+        result = {}
+        for key, item in value.items():
+            if key in DROPPED_FIELDS:
+                continue
+            if key in NAME_FIELDS and isinstance(item, str):
+                result[key] = f"{key[0]}{self._digest(item)[:8]}"
+            elif isinstance(item, int) and (key in ID_FIELDS or (key == 'id' and identifies)):
+                result[key] = self.pseudonym(item)
+            elif key in FREE_TEXT_FIELDS and isinstance(item, str):
+                result[key] = self.anonymize_text(item)
+            elif key == 'file_name' and isinstance(item, str):
+                stem, extension = os.path.splitext(item)
+                result[key] = self._mask(stem) + extension
+            else:
+                result[key] = self.anonymize(item)
+        return result
+
+    async def record(self, update: Update, context: CallbackContext) -> None:
+        """Queue every incoming update, duplicates included; register in group -3"""
+        line = json.dumps({'t': round(time.time(), 3), 'update': self.anonymize(update.to_dict())})
+        with self._lock:
+            self._pending.append(line)
+        TRAFFIC_RECORDED.inc()
+
+    def flush(self) -> int:
+        """Append the queued lines to the recording; blocking, returns how many were written"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with gzip.open(self.path, 'ab') as file:
+                file.write(('\n'.join(batch) + '\n').encode())
+        except Exception:
+            with self._lock:
+                self._pending[:0] = batch
+            raise
+        return len(batch)
+
+
+def read_traffic(path: str) -> Iterator[Dict[str, Any]]:
+    """Lines of a recording, gzip-compressed or plain; a member cut short by a crash ends it"""
+    with open(path, 'rb') as file:
+        compressed = file.read(2) == b'\x1f\x8b'
+    opener = gzip.open if compressed else open
+    with opener(path, 'rt', encoding='utf-8') as file:
+        try:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        except (EOFError, zlib.error, ValueError) as e:
+            logger.warning(f"Recording {path} is truncated, stopping at the last complete line: {str(e)}")
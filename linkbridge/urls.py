@@ -0,0 +1,26 @@
+import re
+from typing import Optional
+from urllib.parse import unquote
+
+LINKEDIN_URL_PATTERN = re.compile(r'^https?:\/\/(www\.)?linkedin\.com\/in\/([\w\-\_\%]+)\/?$')
+
+
+def is_valid_linkedin_url(url: str) -> bool:
+    """Validate LinkedIn URL format"""
+    return bool(LINKEDIN_URL_PATTERN.match(url))
+
+
+def normalize_linkedin_url(url: str) -> Optional[str]:
+    """Rewrite a valid profile URL to https://www.linkedin.com/in/<handle>, or None if invalid"""
+    match = LINKEDIN_URL_PATTERN.match(url.strip())
+    if not match:
+        return None
+    return f"https://www.linkedin.com/in/{match.group(2)}"
+
+
+def canonical_slug(url: str) -> Optional[str]:
+    """Case-folded, percent-decoded profile handle identifying a profile across URL variants"""
+    match = LINKEDIN_URL_PATTERN.match(url.strip())
+    if not match:
+        return None
+    return unquote(match.group(2)).casefold()
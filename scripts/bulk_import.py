@@ -0,0 +1,55 @@
+import argparse
+import asyncio
+import os
+import sys
+import logging
+from dotenv import load_dotenv
+from telegram import Bot
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from linkbridge.database import create_engines
+from linkbridge.bulk_import import import_profiles, send_import_digest
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+DB_HOST = os.getenv('DB_HOST')
+DB_PORT = os.getenv('DB_PORT')
+DB_NAME = os.getenv('DB_NAME')
+DB_USER = os.getenv('DB_USER')
+DB_PASSWORD = os.getenv('DB_PASSWORD')
+
+# Database connection string
+DATABASE_URL = os.getenv('DATABASE_URL') or f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+parser = argparse.ArgumentParser(description="Bulk import LinkedIn profiles from a CSV or JSONL file")
+parser.add_argument('path', help="CSV with a header row, or JSONL with one object per line")
+parser.add_argument('--community', type=int, default=int(os.getenv('DEFAULT_COMMUNITY_ID', '0')),
+                    help="community for rows without a community_id column")
+parser.add_argument('--notify', action='store_true', help="send one digest message to existing users")
+args = parser.parse_args()
+
+
+async def notify(engine, inserted):
+    async with Bot(os.getenv('TELEGRAM_BOT_TOKEN')) as bot:
+        await send_import_digest(bot, engine, inserted)
+
+
+try:
+    engine, _ = create_engines(DATABASE_URL)
+
+    with open(args.path, 'rb') as f:
+        data = f.read()
+
+    report = import_profiles(engine, data, args.path, args.community)
+    print(report.summary())
+
+    if args.notify and report.inserted:
+        asyncio.run(notify(engine, report.inserted))
+
+except Exception as e:
+    logger.error(f"Error importing profiles: {str(e)}")
+    raise
@@ -1,9 +1,12 @@
-from sqlalchemy import create_engine, Table, Column, Integer, String, MetaData, BigInteger, DateTime, Text
 import os
+import sys
 from dotenv import load_dotenv
-from datetime import datetime
 import logging
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from linkbridge.database import create_engines
+from linkbridge.migrations import run_migrations
+
 # Configure logging
 logging.basicConfig(
     filename='logs/db_setup.log',
@@ -21,47 +24,29 @@ DB_NAME = os.getenv('DB_NAME')
 DB_USER = os.getenv('DB_USER')
 DB_PASSWORD = os.getenv('DB_PASSWORD')
 
-# Validate environment variables
-if not all([DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD]):
-    logger.error("Missing required database environment variables")
-    raise ValueError("Missing required database environment variables")
+# Database connection string; DATABASE_URL may also point at SQLite
+DATABASE_URL = os.getenv('DATABASE_URL')
+if not DATABASE_URL:
+    # Validate environment variables
+    if not all([DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD]):
+        logger.error("Missing required database environment variables")
+        raise ValueError("Missing required database environment variables")
 
-# Database connection string
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 try:
     # Initialize SQLAlchemy engine
     logger.info("Initializing database engine...")
-    engine = create_engine(DATABASE_URL)
+    engine, _ = create_engines(DATABASE_URL)
     
     # Test connection
     with engine.connect() as conn:
         logger.info("Database connection successful")
     
-    # Initialize metadata
-    meta = MetaData()
-    
-    # Define the LinkedIn user table
-    logger.info("Creating table definition...")
-    linkedin_table = Table(
-        'user_linkedin', meta,
-        Column('id', Integer, primary_key=True),
-        Column('linkedin_url', String, unique=True, nullable=False),
-        Column('telegram_user_id', BigInteger, nullable=False),
-        Column('full_name', String),
-        Column('headline', String),
-        Column('location', String),
-        Column('current_company', String),
-        Column('summary', Text),
-        Column('profile_picture_url', String),
-        Column('created_at', DateTime, default=datetime.utcnow),
-        Column('updated_at', DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    )
-    
-    # Create the table in the database
+    # Create the tables and indexes from the shared schema definition
     logger.info("Creating tables in database...")
-    meta.create_all(engine)
-    logger.info("Database tables created successfully")
+    applied = run_migrations(engine)
+    logger.info(f"Database tables created successfully ({len(applied)} migration(s) applied)")
     print("✓ Database and tables created successfully!")
 
 except Exception as e:
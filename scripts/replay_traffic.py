@@ -0,0 +1,376 @@
+"""Replay a traffic recording against the bot and compare it with a baseline
+
+Runs `python bot.py` against a local stand-in for the Bot API that hands the
+recorded updates out through getUpdates on their original schedule, sped up by
+--speed (0 delivers everything at once), on a throwaway SQLite database unless
+--database-url is given. Recordings come from TRAFFIC_RECORD_FILE.
+
+    python scripts/replay_traffic.py traffic.jsonl.gz [--speed 10] [--runs 3] [--save-baseline base.json]
+    python scripts/replay_traffic.py traffic.jsonl.gz [--speed 10] [--runs 3] --baseline base.json [--tolerance 0.25]
+
+Per update it measures the time from its scheduled arrival until the bot confirmed
+it (its handlers returned) and until the first Bot API call answering its chat, and
+it counts the Bot API calls made by method; latencies are the median over --runs
+replays. Against a baseline, a different call count or a latency percentile more
+than --tolerance slower exits with status 1. Compare runs at the same speed; a
+baseline records the speed it was taken at.
+"""
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import os
+import signal
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from linkbridge.traffic import read_traffic  # noqa: E402
+
+TOKEN = '123456:traffic-replay'
+# Polling and startup calls depend on timing, not on the traffic
+IGNORED_METHODS = ('getUpdates', 'getMe', 'deleteWebhook')
+# Below this, a latency change is noise rather than a regression
+LATENCY_SLACK_MS = 5
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded updates against the bot and compare with a baseline")
+    parser.add_argument('recording', help="traffic recording written while TRAFFIC_RECORD_FILE was set")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay speed-up; 0 delivers all updates at once")
+    parser.add_argument('--baseline', help="baseline JSON to compare the run with")
+    parser.add_argument('--save-baseline', help="write the run's results to this baseline JSON")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative latency increase")
+    parser.add_argument('--database-url', help="database to run against instead of a fresh SQLite one")
+    parser.add_argument('--runs', type=int, default=3,
+                        help="replays, each with a fresh bot and database, to take the median of")
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help="seconds to wait after the last update for the work it started in the background")
+    args = parser.parse_args(argv)
+    if args.database_url and args.runs > 1:
+        parser.error("--database-url keeps the state of one replay for the next; use it with --runs 1")
+    return args
+
+
+def update_kind(update: Dict[str, Any]) -> str:
+    """'/search', 'text', 'callback', 'document'..., to group latencies by"""
+    message = update.get('message') or update.get('edited_message')
+    if message:
+        text = message.get('text') or message.get('caption') or ''
+        if text.startswith('/'):
+            return text.split()[0].split('@')[0]
+        if 'document' in message:
+            return 'document'
+        return 'text' if 'text' in message else 'message'
+    if 'callback_query' in update:
+        return 'callback'
+    return next((key for key in update if key != 'update_id'), 'unknown')
+
+
+def reply_keys(update: Dict[str, Any]) -> List[tuple]:
+    """Bot API call parameters that identify an answer to the update"""
+    keys = []
+    callback_query = update.get('callback_query')
+    if callback_query:
+        keys.append(('callback_query_id', str(callback_query['id'])))
+    for field in ('message', 'edited_message', 'my_chat_member', 'chat_member'):
+        chat = (update.get(field) or {}).get('chat')
+        if chat:
+            keys.append(('chat_id', str(chat['id'])))
+    if callback_query and callback_query.get('message'):
+        keys.append(('chat_id', str(callback_query['message']['chat']['id'])))
+    return keys
+
+
+def percentile(values: Sequence[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def latency_summary(seconds: Sequence[float]) -> Dict[str, Optional[float]]:
+    return {
+        'p50': _ms(percentile(seconds, 0.5)),
+        'p95': _ms(percentile(seconds, 0.95)),
+        'max': _ms(max(seconds, default=None))
+    }
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value * 1000, 1)
+
+
+class FakeBotApi:
+    """Hands the recorded updates out through getUpdates on schedule and counts every other call"""
+
+    def __init__(self, updates: List[tuple], speed: float):
+        self.updates = updates
+        self.speed = speed
+        self.calls: collections.Counter = collections.Counter()
+        self.started: Optional[float] = None
+        self.handled: Dict[int, float] = {}
+        self.first_reply: Dict[int, float] = {}
+        self.finished = asyncio.Event()
+        self._next = 0
+        self._delivered: List[int] = []
+        self._awaiting_reply: Dict[tuple, collections.deque] = collections.defaultdict(collections.deque)
+        self._message_ids = itertools.count(1)
+
+    def due(self, index: int) -> float:
+        offset = self.updates[index][0]
+        return self.started + (offset / self.speed if self.speed else 0)
+
+    async def handle(self, request):
+        method = request.match_info['method']
+        self.calls[method] += 1
+        params = {}
+        for name, value in (await request.post()).items():
+            if isinstance(value, str):
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass
+            params[name] = value
+        now = time.perf_counter()
+
+        if method == 'getUpdates':
+            return web.json_response({'ok': True, 'result': await self.get_updates(params)})
+        for key in (('chat_id', str(params.get('chat_id'))),
+                    ('callback_query_id', str(params.get('callback_query_id')))):
+            waiting = self._awaiting_reply.get(key)
+            while waiting:
+                index = waiting.popleft()
+                if index not in self.first_reply:
+                    self.first_reply[index] = now - self.due(index)
+                    break
+
+        if method == 'getMe':
+            result = {'id': 123456, 'is_bot': True, 'first_name': 'LinkBridge', 'username': 'linkbridge_bot'}
+        elif method == 'getChatMember':
+            user = {'id': params.get('user_id'), 'is_bot': False, 'first_name': 'Replay'}
+            result = {'status': 'member', 'user': user}
+        elif method == 'getFile':
+            result = {'file_id': params.get('file_id'), 'file_unique_id': 'replay', 'file_path': 'documents/replay'}
+        elif method.startswith(('send', 'edit')) and 'chat_id' in params:
+            result = {
+                'message_id': next(self._message_ids), 'date': int(time.time()),
+                'chat': {'id': params['chat_id'], 'type': 'private'}, 'text': params.get('text', '')
+            }
+        else:
+            result = True
+        return web.json_response({'ok': True, 'result': result})
+
+    async def get_updates(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        now = time.perf_counter()
+        if self.started is None:
+            self.started = now
+        # The bot only asks again once every update it was given has been handled
+        for index in self._delivered:
+            self.handled[index] = now - self.due(index)
+        self._delivered = []
+        if self._next == len(self.updates):
+            if not self.finished.is_set():
+                self.finished.set()
+            await asyncio.sleep(min(params.get('timeout') or 0, 1))
+            return []
+
+        wait = self.due(self._next) - now
+        if wait > 0:
+            await asyncio.sleep(min(wait, params.get('timeout') or 0))
+        batch = []
+        while (self._next < len(self.updates) and len(batch) < (params.get('limit') or 100)
+               and self.due(self._next) <= time.perf_counter()):
+            update = self.updates[self._next][1]
+            for key in reply_keys(update):
+                self._awaiting_reply[key].append(self._next)
+            self._delivered.append(self._next)
+            batch.append(update)
+            self._next += 1
+        return batch
+
+    async def download(self, request):
+        self.calls['download'] += 1
+        return web.Response(body=b'')
+
+    def results(self) -> Dict[str, Any]:
+        kinds = collections.defaultdict(list)
+        for index, latency in self.handled.items():
+            kinds[update_kind(self.updates[index][1])].append(latency)
+        return {
+            'updates': len(self.updates),
+            'handled': len(self.handled),
+            'speed': self.speed,
+            'api_calls': {
+                method: count for method, count in sorted(self.calls.items()) if method not in IGNORED_METHODS
+            },
+            'handled_ms': latency_summary(list(self.handled.values())),
+            'first_reply_ms': latency_summary(list(self.first_reply.values())),
+            'by_kind': {
+                kind: dict(count=len(latencies), **latency_summary(latencies))
+                for kind, latencies in sorted(kinds.items())
+            },
+        }
+
+
+def load_recording(path: str) -> tuple:
+    """(offset from the first update in seconds, update) pairs in arrival order, and the admins' pseudonyms"""
+    admins, records = set(), []
+    for line in read_traffic(path):
+        if 'update' in line:
+            records.append((line['t'], line['update']))
+        else:
+            admins.update(line.get('admins', ()))
+    records.sort(key=lambda record: record[0])
+    start = records[0][0] if records else 0
+    return [(t - start, update) for t, update in records], sorted(admins)
+
+
+def child_env(port: int, database_url: str, log_file: str, admins: List[int]) -> dict:
+    env = dict(os.environ)
+    for name in ('DATABASE_REPLICA_URL', 'LINKEDIN_USERNAME', 'LINKEDIN_PASSWORD', 'TRAFFIC_RECORD_FILE'):
+        env.pop(name, None)
+    env.update({
+        'TELEGRAM_BOT_TOKEN': TOKEN,
+        'TELEGRAM_API_BASE_URL': f'http://127.0.0.1:{port}/bot',
+        'TELEGRAM_API_BASE_FILE_URL': f'http://127.0.0.1:{port}/file/bot',
+        'DATABASE_URL': database_url,
+        'METRICS_PORT': '0',
+        'LOG_FILE': log_file,
+        'ADMIN_IDS': ','.join(str(admin) for admin in admins),
+    })
+    return env
+
+
+async def replay(api: FakeBotApi, env: dict, settle: float) -> None:
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, 'bot.py', cwd=ROOT, env=env,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+    )
+    try:
+        finished = asyncio.ensure_future(api.finished.wait())
+        exited = asyncio.ensure_future(process.wait())
+        await asyncio.wait({finished, exited}, return_when=asyncio.FIRST_COMPLETED)
+        finished.cancel()
+        if process.returncode is not None:
+            raise RuntimeError(f"bot.py exited with status {process.returncode} during the replay")
+        await asyncio.sleep(settle)
+    finally:
+        if process.returncode is None:
+            process.send_signal(signal.SIGTERM)
+            try:
+                await asyncio.wait_for(process.wait(), 60)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of the results against the baseline, one line each"""
+    regressions = []
+    if baseline.get('updates') != results['updates']:
+        print(f"! baseline was taken from {baseline.get('updates')} updates, this recording has {results['updates']}")
+    if baseline.get('speed') != results['speed']:
+        print(f"! baseline was taken at speed {baseline.get('speed')}, this run used {results['speed']}")
+    if baseline.get('handled') != results['handled']:
+        regressions.append(f"handled {results['handled']} updates, baseline {baseline.get('handled')}")
+    for method in sorted(set(baseline.get('api_calls', {})) | set(results['api_calls'])):
+        before, after = baseline.get('api_calls', {}).get(method, 0), results['api_calls'].get(method, 0)
+        if before != after:
+            regressions.append(f"{method}: {after} calls, baseline {before}")
+    for measure in ('handled_ms', 'first_reply_ms'):
+        for stat in ('p50', 'p95'):
+            before, after = baseline.get(measure, {}).get(stat), results[measure][stat]
+            if before is not None and after is not None and after > before * (1 + tolerance) + LATENCY_SLACK_MS:
+                regressions.append(f"{measure} {stat}: {after:.1f} ms, baseline {before:.1f} ms")
+    return regressions
+
+
+def report(results: Dict[str, Any]) -> None:
+    print(f"Replayed {results['handled']}/{results['updates']} updates at speed {results['speed']}, "
+          f"median of {results['runs']} run(s)")
+    for measure in ('handled_ms', 'first_reply_ms'):
+        summary = results[measure]
+        print(f"  {measure[:-3].replace('_', ' ')}: p50 {summary['p50']} ms, p95 {summary['p95']} ms, "
+              f"max {summary['max']} ms")
+    for kind, summary in results['by_kind'].items():
+        print(f"  {kind}: {summary['count']} updates, p50 {summary['p50']} ms, p95 {summary['p95']} ms")
+    print("  Bot API calls: " + (', '.join(f"{method} {count}" for method, count in results['api_calls'].items())
+                                 or 'none'))
+
+
+async def replay_once(args: argparse.Namespace, updates: List[tuple], admins: List[int]) -> Dict[str, Any]:
+    api = FakeBotApi(updates, args.speed)
+    app = web.Application()
+    app.router.add_post(f'/bot{TOKEN}/{{method}}', api.handle)
+    app.router.add_get(f'/file/bot{TOKEN}/{{path:.*}}', api.download)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url or f"sqlite:///{os.path.join(directory, 'replay.db')}"
+        try:
+            env = child_env(port, database_url, os.path.join(directory, 'bot.log'), admins)
+            await replay(api, env, args.settle)
+        finally:
+            await runner.cleanup()
+    return api.results()
+
+
+def combine(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The first run's counts with the median of every latency statistic across runs"""
+    def median_of(values):
+        values = [value for value in values if value is not None]
+        return statistics.median(values) if values else None
+
+    results = dict(runs[0], runs=len(runs))
+    if any(run['api_calls'] != results['api_calls'] or run['handled'] != results['handled'] for run in runs):
+        print("! Bot API calls differ between runs; the replay is not deterministic: "
+              + '; '.join(str(run['api_calls']) for run in runs))
+    for measure in ('handled_ms', 'first_reply_ms'):
+        results[measure] = {stat: median_of(run[measure][stat] for run in runs) for stat in results[measure]}
+    results['by_kind'] = {
+        kind: {stat: median_of(run['by_kind'].get(kind, {}).get(stat) for run in runs) for stat in summary}
+        for kind, summary in results['by_kind'].items()
+    }
+    return results
+
+
+async def run(args: argparse.Namespace) -> int:
+    updates, admins = load_recording(args.recording)
+    if not updates:
+        print(f"No updates in {args.recording}")
+        return 1
+    results = combine([await replay_once(args, updates, admins) for _ in range(args.runs)])
+    report(results)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Saved baseline to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(json.load(file), results, args.tolerance)
+        for regression in regressions:
+            print(f"✗ {regression}")
+        if regressions:
+            return 1
+        print(f"✓ within {args.tolerance:.0%} of {args.baseline}")
+    return 0
+
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    return asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Check the admin commands against a throwaway SQLite database
+
+Runs each handler with a stand-in for the Telegram update and checks what it
+sends back. Runs under pytest too.
+
+    python scripts/test_admin.py
+"""
+import asyncio
+import csv
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from linkbridge import services  # noqa: E402
+from linkbridge.handlers import admin  # noqa: E402
+from linkbridge.migrations import run_migrations  # noqa: E402
+from linkbridge.schema import linkedin_table  # noqa: E402
+
+ADMIN_ID = 42
+
+PROFILES = [
+    {'telegram_user_id': 1, 'linkedin_url': 'https://www.linkedin.com/in/ada', 'linkedin_slug': 'ada',
+     'full_name': 'Ada Lovelace', 'headline': 'Analyst', 'current_company': 'Engines', 'location': 'London'},
+    {'telegram_user_id': 2, 'linkedin_url': 'https://www.linkedin.com/in/jose', 'linkedin_slug': 'jose',
+     'full_name': 'José Müller', 'headline': 'Engineer, "platform"', 'current_company': None, 'location': 'Zürich'},
+]
+
+
+class FakeMessage:
+    """Records the replies a handler sends"""
+
+    def __init__(self, user_id: int):
+        self.from_user = SimpleNamespace(id=user_id)
+        self.texts = []
+        self.documents = []
+
+    async def reply_text(self, text, **kwargs):
+        self.texts.append(text)
+
+    async def reply_document(self, document, **kwargs):
+        self.documents.append(document)
+
+
+def run_command(handler, profiles) -> FakeMessage:
+    """Run handler as an admin against a fresh database holding profiles"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'admin.db')}")
+        run_migrations(engine)
+        with engine.begin() as conn:
+            for profile in profiles:
+                conn.execute(linkedin_table.insert().values(**profile, created_at=datetime.utcnow()))
+        saved = services.engine, services.read_engine, admin.ADMIN_IDS
+        services.engine = services.read_engine = engine
+        admin.ADMIN_IDS = [ADMIN_ID]
+        try:
+            message = FakeMessage(ADMIN_ID)
+            asyncio.run(handler(SimpleNamespace(message=message), SimpleNamespace(args=[])))
+            return message
+        finally:
+            services.engine, services.read_engine, admin.ADMIN_IDS = saved
+            engine.dispose()
+
+
+def test_export_sends_every_profile_as_utf8_csv():
+    message = run_command(admin.export_profiles, PROFILES)
+    assert not message.texts, message.texts
+    [document] = message.documents
+    assert document.filename == 'linkedin_profiles.csv'
+    rows = list(csv.reader(io.StringIO(document.input_file_content.decode('utf-8'))))
+    assert rows[0] == ['Full Name', 'LinkedIn URL', 'Headline', 'Company', 'Location']
+    assert sorted(rows[1:]) == sorted(
+        [profile['full_name'], profile['linkedin_url'], profile['headline'],
+         profile['current_company'] or '', profile['location']]
+        for profile in PROFILES
+    )
+
+
+def test_export_without_profiles():
+    message = run_command(admin.export_profiles, [])
+    assert message.texts == ["No profiles to export."]
+    assert not message.documents
+
+
+
+def test_admin_stats_counts_unreachable_users():
+    profiles = [dict(PROFILES[0], unreachable_since=datetime.utcnow(), delivery_failures=1), PROFILES[1]]
+    message = run_command(admin.admin_stats, profiles)
+    assert message.texts == ["Total registered users: 2\nUnreachable (skipped by broadcasts): 1"]
+
+
+def test_admin_stats_is_registered():
+    from telegram.ext import CommandHandler
+    from linkbridge.handlers import register_handlers
+
+    class FakeApplication:
+        def __init__(self):
+            self.handlers = []
+
+        def add_handler(self, handler, group=0):
+            self.handlers.append(handler)
+
+        def add_error_handler(self, callback):
+            pass
+
+    application = FakeApplication()
+    register_handlers(application)
+    assert any(isinstance(handler, CommandHandler) and 'admin_stats' in handler.commands
+               for handler in application.handlers)
+
+
+if __name__ == '__main__':
+    failed = False
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            try:
+                test()
+                print(f"✓ {name}")
+            except Exception as e:
+                failed = True
+                print(f"✗ {name}: {e!r}")
+    sys.exit(1 if failed else 0)
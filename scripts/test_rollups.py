@@ -0,0 +1,85 @@
+"""Check the daily rollups against a throwaway SQLite database
+
+Plays profile changes, moves their events to past days and checks what the
+rollup makes of them. Runs under pytest too.
+
+    python scripts/test_rollups.py
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import create_engine, select
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from linkbridge import repository, rollups  # noqa: E402
+from linkbridge.archive import ProfileArchive  # noqa: E402
+from linkbridge.events import CREATED, event_row, write_events  # noqa: E402
+from linkbridge.migrations import run_migrations  # noqa: E402
+from linkbridge.schema import linkedin_table, profile_events_table  # noqa: E402
+
+COMMUNITY_ID = -100
+PROFILE = {
+    'telegram_user_id': 7, 'linkedin_url': 'https://www.linkedin.com/in/grace', 'linkedin_slug': 'grace',
+    'community_id': COMMUNITY_ID, 'full_name': 'Grace Hopper', 'current_company': 'Navy', 'location': 'Arlington'
+}
+
+
+def test_archive_and_restore_keep_active_profiles_in_step():
+    today = datetime.utcnow().date()
+    # Created three days ago, archived two days ago, restored yesterday
+    days = [today - timedelta(days=3), today - timedelta(days=2), today - timedelta(days=1)]
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'rollups.db')}")
+        try:
+            run_migrations(engine)
+            with engine.begin() as conn:
+                conn.execute(linkedin_table.insert().values(
+                    **PROFILE, created_at=datetime.utcnow(), last_seen_at=datetime.utcnow() - timedelta(days=400)
+                ))
+                write_events(conn, [event_row(
+                    CREATED, PROFILE['telegram_user_id'], COMMUNITY_ID,
+                    current_company=PROFILE['current_company'], location=PROFILE['location']
+                )])
+            archive = ProfileArchive(engine, inactive_days=365, unreachable_days=0)
+            assert archive.archive().archived == {'inactive': 1, 'unreachable': 0}
+            assert archive.restore(PROFILE['telegram_user_id']) is not None
+
+            with engine.begin() as conn:
+                ids = conn.execute(
+                    select(profile_events_table.c.id).order_by(profile_events_table.c.id)
+                ).scalars().all()
+                assert len(ids) == len(days)
+                for event_id, day in zip(ids, days):
+                    conn.execute(profile_events_table.update().where(profile_events_table.c.id == event_id).values(
+                        created_at=datetime.combine(day, time(12))
+                    ))
+
+            assert rollups.roll_up(engine, today) == 3
+            with engine.connect() as conn:
+                series = rollups.daily_series(conn, COMMUNITY_ID, 3, today)
+                active = repository.count_profiles(conn, COMMUNITY_ID)
+                companies = rollups.top_changes(conn, COMMUNITY_ID, 'current_company', days[0])
+            assert [(day.new_profiles, day.deleted_profiles, day.active_profiles) for day in series] == [
+                (1, 0, 1), (0, 1, 0), (1, 0, 1)
+            ]
+            assert series[-1].active_profiles == active == 1
+            assert rollups.net_growth(series) == 1
+            assert companies == [('Navy', 1)]
+        finally:
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    failed = False
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            try:
+                test()
+                print(f"✓ {name}")
+            except Exception as e:
+                failed = True
+                print(f"✗ {name}: {e!r}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,143 @@
+"""Check that the bot starts within its startup-time budget
+
+Times `import bot` and the time from launching `python bot.py` until its first
+getUpdates request, against a local stand-in for the Bot API and a throwaway
+SQLite database, then stops it with SIGTERM like a redeploy would.
+
+    python scripts/test_startup.py [--budget 1.0] [--runs 3]
+
+Exits with status 1 when the median of either measurement exceeds the budget.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from linkbridge.migrations import run_migrations  # noqa: E402
+
+TOKEN = '123456:startup-check'
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import bot; print(time.perf_counter() - start)"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-first-poll of the bot")
+    parser.add_argument('--budget', type=float, default=1.0, help="seconds allowed for each measurement")
+    parser.add_argument('--runs', type=int, default=3, help="measurements to take the median of")
+    return parser.parse_args(argv)
+
+
+class FakeBotApi:
+    """Answers the calls made during startup and notes when getUpdates first arrives"""
+
+    def __init__(self):
+        self.first_poll = None
+
+    async def handle(self, request):
+        method = request.match_info['method']
+        if method == 'getMe':
+            result = {'id': 123456, 'is_bot': True, 'first_name': 'LinkBridge', 'username': 'linkbridge_bot'}
+        elif method == 'getUpdates':
+            if self.first_poll is None:
+                self.first_poll = time.perf_counter()
+            await asyncio.sleep(0.5)
+            result = []
+        else:
+            result = True
+        return web.json_response({'ok': True, 'result': result})
+
+
+def child_env(port: int, database_url: str, log_file: str) -> dict:
+    env = dict(os.environ)
+    for name in ('DATABASE_REPLICA_URL', 'LINKEDIN_USERNAME', 'LINKEDIN_PASSWORD'):
+        env.pop(name, None)
+    env.update({
+        'TELEGRAM_BOT_TOKEN': TOKEN,
+        'TELEGRAM_API_BASE_URL': f'http://127.0.0.1:{port}/bot',
+        'DATABASE_URL': database_url,
+        'METRICS_PORT': '0',
+        'LOG_FILE': log_file,
+    })
+    return env
+
+
+async def time_import(env: dict) -> float:
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, '-c', IMPORT_SNIPPET, cwd=ROOT, env=env, stdout=asyncio.subprocess.PIPE
+    )
+    stdout, _ = await process.communicate()
+    if process.returncode:
+        raise RuntimeError("import bot failed")
+    return float(stdout.decode().strip().splitlines()[-1])
+
+
+async def time_first_poll(api: FakeBotApi, env: dict) -> float:
+    api.first_poll = None
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, 'bot.py', cwd=ROOT, env=env,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+    )
+    try:
+        while api.first_poll is None:
+            if process.returncode is not None:
+                raise RuntimeError(f"bot.py exited with status {process.returncode} before polling")
+            await asyncio.sleep(0.005)
+        return api.first_poll - start
+    finally:
+        if process.returncode is None:
+            process.send_signal(signal.SIGTERM)
+            try:
+                await asyncio.wait_for(process.wait(), 30)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+
+
+async def run(args: argparse.Namespace) -> int:
+    api = FakeBotApi()
+    app = web.Application()
+    app.router.add_post(f'/bot{TOKEN}/{{method}}', api.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite:///{os.path.join(directory, 'startup.db')}"
+        # A restart finds the schema already migrated
+        from sqlalchemy import create_engine
+        run_migrations(create_engine(database_url))
+        env = child_env(port, database_url, os.path.join(directory, 'bot.log'))
+        try:
+            import_times = [await time_import(env) for _ in range(args.runs)]
+            poll_times = [await time_first_poll(api, env) for _ in range(args.runs)]
+        finally:
+            await runner.cleanup()
+
+    failed = False
+    for label, times in (('import bot', import_times), ('time to first poll', poll_times)):
+        median = statistics.median(times)
+        within = median <= args.budget
+        failed = failed or not within
+        print(f"{'✓' if within else '✗'} {label}: median {median * 1000:.0f} ms "
+              f"(runs: {', '.join(f'{t * 1000:.0f}' for t in times)} ms, budget {args.budget * 1000:.0f} ms)")
+    return 1 if failed else 0
+
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    return asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,11 @@
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, DateTime, Text, BigInteger
-from dotenv import load_dotenv
 import os
-from datetime import datetime
+import sys
 import logging
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from linkbridge.database import create_engines
+from linkbridge.migrations import pending_migrations, run_migrations
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -17,39 +20,22 @@ DB_USER = os.getenv('DB_USER')
 DB_PASSWORD = os.getenv('DB_PASSWORD')
 
 # Database connection string
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DATABASE_URL = os.getenv('DATABASE_URL') or f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 try:
     # Initialize SQLAlchemy engine
-    engine = create_engine(DATABASE_URL)
-    meta = MetaData()
-
-    # Drop existing table
-    logger.info("Dropping existing table...")
-    with engine.connect() as conn:
-        conn.execute("DROP TABLE IF EXISTS user_linkedin")
-        conn.commit()
-
-    # Create new table with profile_picture_url column
-    linkedin_table = Table(
-        'user_linkedin', meta,
-        Column('id', Integer, primary_key=True),
-        Column('linkedin_url', String, unique=True, nullable=False),
-        Column('telegram_user_id', BigInteger, nullable=False),
-        Column('full_name', String),
-        Column('headline', String),
-        Column('location', String),
-        Column('current_company', String),
-        Column('summary', Text),
-        Column('profile_picture_url', String),
-        Column('created_at', DateTime, default=datetime.utcnow),
-        Column('updated_at', DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    )
-
-    # Create the table
-    meta.create_all(engine)
-    logger.info("Database table updated successfully!")
+    engine, _ = create_engines(DATABASE_URL)
+
+    pending = pending_migrations(engine)
+    if not pending:
+        logger.info("Database schema is up to date")
+    for migration in pending:
+        logger.info(f"Pending migration {migration.version}: {migration.description}")
+
+    # Apply pending migrations without touching existing rows
+    applied = run_migrations(engine)
+    logger.info(f"Database updated successfully, {len(applied)} migration(s) applied")
 
 except Exception as e:
     logger.error(f"Error updating database: {str(e)}")
-    raise 
\ No newline at end of file
+    raise